@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""EXPLAIN plans and latency of the shift lookup and org queries before and after 0005_lookup_indexes.
+
+    $ cd tests && python ../benchmarks/lookup_indexes.py --shifts 1000000
+
+Runs against the database configured in tests/conf/settings.py (in-memory SQLite by default).
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+from time import perf_counter
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(BASE_DIR), str(BASE_DIR / 'tests')]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from django_org import models, synthetic  # noqa: E402
+from django_org.synthetic import Shape  # noqa: E402
+
+
+BEFORE, AFTER = '0004_calendar_exception', '0005_lookup_indexes'
+
+
+def populate(shifts: int, departments: int, people: int, seed: int):
+    # An average work mode of the synthetic templates has three shifts
+    shape = Shape(enterprises=1, departments=departments, people=people, work_modes=max(shifts // 3, 1))
+    counts = synthetic.generate(shape, seed=seed, prefix='Benchmark')
+    print(', '.join(f'{label}: {count}' for label, count in counts.items()))
+
+    enterprise = models.Enterprise.objects.get(name=f'Benchmark{seed}-1')
+    wm_ids = list(models.WorkMode.objects.filter(enterprise=enterprise).values_list('id', flat=True))
+    ids = list(models.Department.objects.filter(enterprise=enterprise).values_list('id', flat=True))
+    return enterprise, wm_ids, ids
+
+
+def queries(enterprise, wm_ids, department_ids):
+    wm = models.WorkMode.objects.get(pk=wm_ids[0])
+    at = datetime(2024, 1, 1, 13, tzinfo=timezone.utc)
+    seconds = 13 * 3600
+
+    def shift_lookup():
+        wm.pk = random.choice(wm_ids)
+        return models.WorkShift.objects.filter(wm._lookup(at.date(), seconds), work_mode=wm).order_by('number')[:1]
+
+    return {
+        'get_shift': shift_lookup,
+        'department tree': lambda: models.Department.objects.filter(
+            enterprise=enterprise).values_list('id', 'parent_id').order_by(),
+        'people page': lambda: models.Person.objects.all()[:50],
+        'department staff': lambda: models.Employee.objects.filter(
+            department_id=random.choice(department_ids)).order_by('post')[:50],
+    }
+
+
+def measure(title, cases, repeat: int):
+    print(f'\n=== {title} ===')
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    for name, make in cases.items():
+        print(f'\n-- {name}\n{make().explain()}')
+        timings = []
+        for _ in range(repeat):
+            qs = make()
+            started = perf_counter()
+            list(qs)
+            timings.append(perf_counter() - started)
+        print(f'mean {mean(timings) * 1000:.3f} ms, max {max(timings) * 1000:.3f} ms over {repeat} runs')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shifts', type=int, default=1000000)
+    parser.add_argument('--departments', type=int, default=100000)
+    parser.add_argument('--people', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    call_command('migrate', verbosity=0)
+    call_command('migrate', 'django_org', BEFORE, verbosity=0)
+
+    started = perf_counter()
+    data = populate(args.shifts, args.departments, args.people, args.seed)
+    print(f'Populated in {perf_counter() - started:.1f} s')
+
+    cases = queries(*data)
+    measure(f'before ({BEFORE})', cases, args.repeat)
+    call_command('migrate', 'django_org', AFTER, verbosity=0)
+    measure(f'after ({AFTER})', cases, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
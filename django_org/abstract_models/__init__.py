@@ -2,6 +2,11 @@ from .org import __all__ as models_org
 from .dept import __all__ as models_dept
 from .shift import __all__ as models_shift
 from .people import __all__ as models_people
+from .roster import __all__ as models_roster
+from .calendar import __all__ as models_calendar
+from .history import __all__ as models_history
+from .outbox import __all__ as models_outbox
 
 
-__all__ = models_org + models_dept + models_shift + models_people
+__all__ = models_org + models_dept + models_shift + models_people + models_roster + models_calendar + models_history \
+    + models_outbox
@@ -0,0 +1,64 @@
+from django.db import models, router
+from django.utils.translation import gettext_lazy as _
+
+from django_org.exceptions import IDMismatchError, ShiftOverrideError
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_MODE, DJANGO_ORG_WORK_SHIFT
+from django_org.sharding import EnterpriseManager, related
+
+
+__all__ = (
+    'AbstractCalendarException',
+)
+
+
+class AbstractCalendarException(models.Model):
+    """A day off or a one-off shift override.
+
+    Without a work mode the exception applies to every work mode of the enterprise,
+    without a shift to every shift of the day. `start`/`end` override the shift borders for that day.
+    """
+    enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'), on_delete=models.PROTECT)
+    work_mode = models.ForeignKey(DJANGO_ORG_WORK_MODE, verbose_name=_('Work mode'),
+                                  blank=True, null=True, on_delete=models.PROTECT)
+    work_shift = models.ForeignKey(DJANGO_ORG_WORK_SHIFT, verbose_name=_('Work shift'),
+                                   blank=True, null=True, on_delete=models.PROTECT)
+    day = models.DateField(_('Shift day'))
+    name = models.CharField(_('Name'), max_length=64, blank=True, default='')
+    start = models.PositiveIntegerField(_('Shift start indent, sec.'), blank=True, null=True)
+    end = models.PositiveIntegerField(_('Shift end indent, sec.'), blank=True, null=True)
+
+    objects = EnterpriseManager()
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Calendar exception')
+        verbose_name_plural = _('Calendar exceptions')
+        ordering = ORDERING['AbstractCalendarException']
+        indexes = [
+            models.Index(fields=('enterprise', 'day'), name='%(class)s_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.enterprise.name}/{self.day}'
+
+    @property
+    def is_override(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    @instrument('calendar_exception.save')
+    def save(self, **kwargs):
+        if self.is_override and (self.work_shift_id is None or self.start is None or self.end is None):
+            raise ShiftOverrideError('A shift override requires the shift, its start and end')
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        if self.work_shift_id is not None and self.work_mode_id is None:
+            self.work_mode_id = related(self, 'work_shift', using).work_mode_id
+        if self.work_mode_id is not None:
+            enterprise_id = related(self, 'work_mode', using).enterprise_id
+            if self.enterprise_id is None:
+                self.enterprise_id = enterprise_id
+            elif self.enterprise_id != enterprise_id:
+                raise IDMismatchError('Mismatch of enterprises identifiers')
+
+        super().save(**kwargs)
@@ -1,7 +1,14 @@
-from django.db import models
+from collections import defaultdict
+from typing import List, Optional
+
+from django.db import models, router
 from django.utils.translation import gettext_lazy as _
 
+from django_org import cache, reorg
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
 from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_DEPARTMENT_TYPE
+from django_org.sharding import EnterpriseManager, related
 
 
 __all__ = (
@@ -14,12 +21,14 @@ class AbstractDepartmentType(models.Model):
     enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'), on_delete=models.PROTECT)
     name = models.CharField(_('Name'), max_length=64)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Department type')
         verbose_name_plural = _('Department types')
         unique_together = ('enterprise', 'name')
-        ordering = ('enterprise', 'name')
+        ordering = ORDERING['AbstractDepartmentType']
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.name}'
@@ -34,18 +43,47 @@ class AbstractDepartment(models.Model):
                                blank=True, null=True, on_delete=models.PROTECT)
     name = models.CharField(_('Name'), max_length=64)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Department')
         verbose_name_plural = _('Departments')
         unique_together = ('parent', 'department_type', 'name')
-        ordering = ('enterprise__name', 'parent__name', 'department_type__name', 'name')
+        ordering = ORDERING['AbstractDepartment']
+        indexes = [
+            models.Index(fields=('enterprise', 'parent')),
+        ]
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.department_type.name}/{self.name}'
 
+    def subtree_ids(self) -> List[int]:
+        """Ids of the department and all its descendants, resolved with a single query or from the cache."""
+        if cache.is_enabled():
+            children = cache.department_tree(self.enterprise_id)
+        else:
+            children = defaultdict(list)
+            for pk, parent_id in self.__class__.objects.for_enterprise(self.enterprise_id).values_list('id', 'parent_id'):
+                children[parent_id].append(pk)
+
+        ids = [self.pk]
+        for pk in ids:
+            ids.extend(children.get(pk, ()))
+        return ids
+
+    def move_subtree(
+            self,
+            parent: Optional['AbstractDepartment'] = None,
+            department_type: Optional[AbstractDepartmentType] = None
+    ) -> List[int]:
+        """Re-parent the department with all its descendants, see `django_org.reorg.move_subtree`."""
+        return reorg.move_subtree(self, parent, department_type)
+
+    @instrument('department.save')
     def save(self, **kwargs):
         if self.enterprise_id is None:
-            self.enterprise_id = self.department_type.enterprise_id
+            using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+            self.enterprise_id = related(self, 'department_type', using).enterprise_id
 
         super().save(**kwargs)
@@ -0,0 +1,79 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from django_org import clock
+from django_org.exceptions import ChangeLogError
+from django_org.ordering import ORDERING
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+from django_org.sharding import EnterpriseManager
+
+
+__all__ = (
+    'AbstractChangeLogEntry',
+    'AbstractChangeLogSnapshot',
+)
+
+
+class AbstractChangeLogEntry(models.Model):
+    """An append-only record of a change of a django_org object, `data` is its state after the change."""
+
+    class Action(models.IntegerChoices):
+        CREATE = 1, _('Create')
+        UPDATE = 2, _('Update')
+        DELETE = 3, _('Delete')
+
+    enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'), null=True,
+                                   related_name='+', on_delete=models.DO_NOTHING, db_constraint=False, editable=False)
+    changed_at = models.DateTimeField(_('Changed at'), default=clock.now, editable=False)
+    model = models.CharField(_('Model'), max_length=100, editable=False)
+    object_id = models.BigIntegerField(_('Object id'), editable=False)
+    action = models.PositiveSmallIntegerField(_('Action'), choices=Action.choices, editable=False)
+    data = models.JSONField(_('Data'), null=True, encoder=DjangoJSONEncoder, editable=False)
+
+    objects = EnterpriseManager()
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Change log entry')
+        verbose_name_plural = _('Change log')
+        ordering = ORDERING['AbstractChangeLogEntry']
+        indexes = [
+            models.Index(fields=('enterprise', 'id'), name='%(class)s_ent_idx'),
+            models.Index(fields=('model', 'object_id'), name='%(class)s_obj_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}/{self.object_id}/{self.get_action_display()}'
+
+    def save(self, **kwargs):
+        if not self._state.adding:
+            raise ChangeLogError('The change log is append-only')
+
+        super().save(**kwargs)
+
+    def delete(self, **kwargs):
+        raise ChangeLogError('The change log is append-only')
+
+
+class AbstractChangeLogSnapshot(models.Model):
+    """State of an enterprise after the change log entry `last_change_id`."""
+    enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'),
+                                   related_name='+', on_delete=models.DO_NOTHING, db_constraint=False)
+    taken_at = models.DateTimeField(_('Taken at'))
+    last_change_id = models.BigIntegerField(_('Last change'), default=0)
+    data = models.JSONField(_('Data'), encoder=DjangoJSONEncoder)
+
+    objects = EnterpriseManager()
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Change log snapshot')
+        verbose_name_plural = _('Change log snapshots')
+        ordering = ORDERING['AbstractChangeLogSnapshot']
+        indexes = [
+            models.Index(fields=('enterprise', 'taken_at'), name='%(class)s_ent_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.enterprise_id}/{self.taken_at}'
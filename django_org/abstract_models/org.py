@@ -8,8 +8,13 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from django_org.exceptions import NaiveTimeSettingError
+from django_org import cache, clock
+from django_org.calendar_index import CalendarIndex
+from django_org.exceptions import NaiveTimeSettingError, ShardingError
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
 from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_MODE
+from django_org.sharding import EnterpriseManager, is_sharded
 
 
 __all__ = (
@@ -25,11 +30,13 @@ class AbstractEnterprise(models.Model):
     name = models.CharField(_('Name'), max_length=64, unique=True)
     time_zone = models.CharField(_('Time zone'), max_length=36, choices=TIME_ZONES, default='UTC')
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Enterprise')
         verbose_name_plural = _('Enterprises')
-        ordering = ('name',)
+        ordering = ORDERING['AbstractEnterprise']
 
     def __str__(self):
         return self.name
@@ -38,15 +45,27 @@ class AbstractEnterprise(models.Model):
     def tz(self):
         return ZoneInfo(self.time_zone)
 
+    @instrument('enterprise.save')
+    def save(self, **kwargs):
+        # The shard follows from the id, a database assigned id would be taken on the wrong shard
+        if self.pk is None and is_sharded():
+            raise ShardingError('An enterprise must be created with an explicit id when sharding is enabled')
+
+        super().save(**kwargs)
+
+    @instrument('enterprise.get_shifts')
+    @clock.frozen()
     def get_shifts(self, shift_time: datetime, limit: Union[datetime, int] = 0) -> List[ForwardRef('WorkShift')]:
         WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
         if timezone.is_naive(shift_time):
             raise NaiveTimeSettingError('The time must be specified with a time zone')
 
-        shifts = [
-            wm.get_shift(shift_time, limit=limit)
-            for wm in WorkMode.objects.filter(enterprise=self)
-        ]
+        work_modes = list(WorkMode.objects.for_enterprise(self))
+        for wm in work_modes:
+            wm.enterprise = self
+        if not cache.is_enabled():
+            CalendarIndex.prefetch(work_modes)
+        shifts = [wm.get_shift(shift_time, limit=limit) for wm in work_modes]
         if isinstance(limit, int) and -1 <= limit <= 1:
             return shifts
 
@@ -58,12 +77,14 @@ class AbstractPost(models.Model):
                                    related_name='posts', on_delete=models.PROTECT)
     name = models.CharField(_('Name'), max_length=64)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Post')
         verbose_name_plural = _('Posts')
         unique_together = ('enterprise', 'name')
-        ordering = ('enterprise', 'name')
+        ordering = ORDERING['AbstractPost']
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.name}'
@@ -0,0 +1,59 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from django_org import clock
+from django_org.ordering import ORDERING
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+from django_org.sharding import EnterpriseManager
+
+
+__all__ = (
+    'AbstractOutboxMessage',
+    'AbstractOutboxOffset',
+)
+
+
+class AbstractOutboxMessage(models.Model):
+    """A change of a django_org object to deliver downstream, `data` is its state after the change."""
+
+    class Action(models.IntegerChoices):
+        CREATE = 1, _('Create')
+        UPDATE = 2, _('Update')
+        DELETE = 3, _('Delete')
+
+    id = models.BigAutoField(primary_key=True)
+    enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'), null=True,
+                                   related_name='+', on_delete=models.DO_NOTHING, db_constraint=False, editable=False)
+    created_at = models.DateTimeField(_('Created at'), default=clock.now, editable=False)
+    model = models.CharField(_('Model'), max_length=100, editable=False)
+    object_id = models.BigIntegerField(_('Object id'), editable=False)
+    action = models.PositiveSmallIntegerField(_('Action'), choices=Action.choices, editable=False)
+    data = models.JSONField(_('Data'), null=True, encoder=DjangoJSONEncoder, editable=False)
+
+    objects = EnterpriseManager()
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Outbox message')
+        verbose_name_plural = _('Outbox')
+        ordering = ORDERING['AbstractOutboxMessage']
+
+    def __str__(self):
+        return f'{self.id}/{self.model}/{self.object_id}/{self.get_action_display()}'
+
+
+class AbstractOutboxOffset(models.Model):
+    """The last outbox message delivered to a consumer."""
+    consumer = models.CharField(_('Consumer'), max_length=64, unique=True)
+    position = models.BigIntegerField(_('Position'), default=0)
+    updated_at = models.DateTimeField(_('Updated at'), auto_now=True)
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Outbox offset')
+        verbose_name_plural = _('Outbox offsets')
+        ordering = ORDERING['AbstractOutboxOffset']
+
+    def __str__(self):
+        return f'{self.consumer}/{self.position}'
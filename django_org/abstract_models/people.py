@@ -1,9 +1,13 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router
 from django.utils.translation import gettext_lazy as _
 
 from django_org.exceptions import IDMismatchError
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
 from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_POST, DJANGO_ORG_DEPARTMENT, DJANGO_ORG_PERSON
+from django_org.replicas import primary_of
+from django_org.sharding import EnterpriseManager, is_sharded, related
 
 
 __all__ = (
@@ -24,11 +28,16 @@ class AbstractPerson(models.Model):
     short_name = models.CharField(_('Short name'), max_length=70, blank=True, default='', editable=False)
     full_name = models.CharField(_('Full name'), max_length=192, blank=True, default='', editable=False)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Person')
         verbose_name_plural = _('People')
-        ordering = ('last_name', 'middle_name', 'first_name')
+        ordering = ORDERING['AbstractPerson']
+        indexes = [
+            models.Index(fields=('last_name', 'middle_name', 'first_name')),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -49,6 +58,7 @@ class AbstractPerson(models.Model):
     def url_for_admin_site(self):
         return f'/admin/{self._meta.app_label}/{self._meta.model_name}/{self.pk}/'
 
+    @instrument('person.save')
     def save(self, **kwargs):
         self.first_name = self.first_name.strip()
         self.middle_name = self.middle_name.strip()
@@ -65,20 +75,39 @@ class AbstractEmployee(models.Model):
     post = models.ForeignKey(DJANGO_ORG_POST, verbose_name=_('Post'), on_delete=models.PROTECT)
     person = models.OneToOneField(DJANGO_ORG_PERSON, verbose_name=_('Person'), on_delete=models.PROTECT)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Employee')
         verbose_name_plural = _('Employees')
         unique_together = ('enterprise', 'department', 'post', 'person')
-        ordering = ('enterprise', 'department', 'post', 'person')
+        ordering = ORDERING['AbstractEmployee']
+        indexes = [
+            models.Index(fields=('department', 'post')),
+        ]
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.person.full_name}'
 
+    @instrument('employee.save')
     def save(self, **kwargs):
         if self.enterprise_id is None:
-            if self.post.enterprise_id != self.department.enterprise_id:
+            using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+            enterprise_id = related(self, 'post', using).enterprise_id
+            if enterprise_id != related(self, 'department', using).enterprise_id:
                 raise IDMismatchError('Mismatch of enterprises identifiers')
-            self.enterprise_id = self.post.enterprise_id
+            self.enterprise_id = enterprise_id
+        if is_sharded():
+            self._check_person(kwargs.get('using') or router.db_for_write(self.__class__, instance=self))
 
         super().save(**kwargs)
+
+    def _check_person(self, using: str):
+        # The person lives on the shard of its employee's enterprise
+        field = self._meta.get_field('person')
+        person = field.get_cached_value(self) if field.is_cached(self) else None
+        if person is not None and person._state.db and primary_of(person._state.db) != primary_of(using):
+            raise IDMismatchError('The person is on another shard than the employee')
+        if person is None and not field.related_model._base_manager.using(using).filter(pk=self.person_id).exists():
+            raise IDMismatchError('The person is on another shard than the employee')
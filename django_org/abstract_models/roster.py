@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import ForwardRef, List, Optional, Tuple
+
+from django.db import models, router
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from django_org import cache, clock
+from django_org.calendar_index import CalendarIndex
+from django_org.const import DAY1
+from django_org.exceptions import IDMismatchError, NaiveTimeSettingError
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_EMPLOYEE, DJANGO_ORG_WORK_MODE
+from django_org.sharding import EnterpriseManager, related
+
+
+__all__ = (
+    'AbstractWorkModeAssignment',
+)
+
+
+class AbstractWorkModeAssignment(models.Model):
+    enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'),
+                                   on_delete=models.PROTECT, editable=False)
+    employee = models.ForeignKey(DJANGO_ORG_EMPLOYEE, verbose_name=_('Employee'),
+                                 related_name='work_mode_assignments', on_delete=models.PROTECT)
+    work_mode = models.ForeignKey(DJANGO_ORG_WORK_MODE, verbose_name=_('Work mode'),
+                                  related_name='assignments', on_delete=models.PROTECT)
+    date_from = models.DateField(_('Effective from'))
+    date_to = models.DateField(_('Effective to'), null=True, blank=True)
+
+    objects = EnterpriseManager()
+
+    class Meta:
+        abstract = True
+        verbose_name = _('Work mode assignment')
+        verbose_name_plural = _('Work mode assignments')
+        unique_together = ('employee', 'date_from')
+        ordering = ORDERING['AbstractWorkModeAssignment']
+        indexes = [
+            models.Index(fields=('enterprise', 'date_from', 'date_to'), name='%(class)s_ent_idx'),
+            models.Index(fields=('work_mode', 'date_from'), name='%(class)s_wm_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.employee}/{self.work_mode.name}'
+
+    @instrument('work_mode_assignment.save')
+    def save(self, **kwargs):
+        if self.enterprise_id is None:
+            using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+            enterprise_id = related(self, 'employee', using).enterprise_id
+            if enterprise_id != related(self, 'work_mode', using).enterprise_id:
+                raise IDMismatchError('Mismatch of enterprises identifiers')
+            self.enterprise_id = enterprise_id
+
+        super().save(**kwargs)
+
+    def is_effective(self, day) -> bool:
+        return self.date_from <= day and (self.date_to is None or day <= self.date_to)
+
+    @classmethod
+    @instrument('work_mode_assignment.on_shift')
+    @clock.frozen()
+    def on_shift(
+            cls,
+            shift_time: datetime,
+            enterprise: Optional[ForwardRef('Enterprise')] = None,
+            department: Optional[ForwardRef('Department')] = None
+    ) -> List[Tuple[ForwardRef('Employee'), ForwardRef('WorkShift')]]:
+        """Employees on shift at `shift_time` paired with their current shift.
+
+        The shift is resolved once per work mode, not once per employee.
+        """
+        if timezone.is_naive(shift_time):
+            raise NaiveTimeSettingError('The time must be specified with a time zone')
+        if department is not None:
+            enterprise = department.enterprise
+        if enterprise is None:
+            raise ValueError('Either enterprise or department must be specified')
+
+        # An overnight shift may belong to the previous or the next day
+        day = shift_time.astimezone(enterprise.tz).date()
+        assignments = cls.objects.for_enterprise(enterprise).filter(
+            Q(date_to__isnull=True) | Q(date_to__gte=day - DAY1),
+            date_from__lte=day + DAY1,
+        ).select_related('employee__person', 'work_mode__enterprise').order_by()
+        if department is not None:
+            assignments = assignments.filter(employee__department_id__in=department.subtree_ids())
+
+        assignments = list(assignments)
+        work_modes = {}
+        for assignment in assignments:
+            work_modes.setdefault(assignment.work_mode_id, assignment.work_mode)
+        if not cache.is_enabled():
+            CalendarIndex.prefetch(work_modes.values())
+        shifts = {pk: wm.get_shift(shift_time) for pk, wm in work_modes.items()}
+
+        result = []
+        for assignment in assignments:
+            shift = shifts[assignment.work_mode_id]
+            if shift is not None and assignment.is_effective(shift.shift_day):
+                result.append((assignment.employee, shift))
+        return result
@@ -1,19 +1,24 @@
 from datetime import date, datetime, timedelta
 from enum import Enum
 from itertools import chain
-from operator import attrgetter
 from typing import List, ForwardRef, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
-from django.apps import apps
-from django.db import models
+from django.core.validators import MinValueValidator
+from django.db import models, router
 from django.db.models import F, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from django_org.exceptions import NaiveTimeSettingError
-from django_org.const import SEC1, SECONDS_IN_DAY
-from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_MODE, DJANGO_ORG_WORK_SHIFT
-from django_org.utils import _day_start, _datetime
+from django_org import cache, clock
+from django_org.calendar_index import CalendarIndex
+from django_org.exceptions import CycleDayError, DayOffError, NaiveTimeSettingError
+from django_org.const import CYCLE_START, DAY1, SEC1
+from django_org.instrumentation import instrument
+from django_org.ordering import ORDERING
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_MODE
+from django_org.sharding import EnterpriseManager, related
+from django_org.utils import _day_start, _datetime, _shift_offsets, _cycle_day, _nearest_cycle_day
 
 
 __all__ = (
@@ -30,82 +35,173 @@ class Direction(Enum):
 class AbstractWorkMode(models.Model):
     enterprise = models.ForeignKey(DJANGO_ORG_ENTERPRISE, verbose_name=_('Enterprise'), on_delete=models.PROTECT)
     name = models.CharField(_('Name'), max_length=36)
+    cycle_length = models.PositiveSmallIntegerField(_('Cycle length, days'), default=1,
+                                                    validators=[MinValueValidator(1)])
+    cycle_start = models.DateField(_('Cycle start'), default=CYCLE_START)
+
+    objects = EnterpriseManager()
 
     class Meta:
         abstract = True
         verbose_name = _('Work mode')
         verbose_name_plural = _('Work modes')
         unique_together = ('enterprise', 'name')
-        ordering = ('enterprise', 'name')
+        ordering = ORDERING['AbstractWorkMode']
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.name}'
 
+    @property
+    def tz(self) -> ZoneInfo:
+        """The enterprise time zone, from the cache when the enterprise is not loaded."""
+        if cache.is_enabled() and not self._meta.get_field('enterprise').is_cached(self):
+            return ZoneInfo(cache.time_zone(self.enterprise_id))
+        return self.enterprise.tz
+
+    @property
+    def calendar(self) -> CalendarIndex:
+        if getattr(self, '_calendar', None) is None:
+            table = cache.shift_tables(self.enterprise_id).get(self.pk) if cache.is_enabled() else None
+            if table is not None:
+                self._calendar = table.calendar
+            else:
+                CalendarIndex.prefetch([self])
+        return self._calendar
+
+    def _shift_rows(self) -> List[Tuple[Tuple[str, object], ...]]:
+        """(field, value) pairs of the shifts by day and number, from the cache if enabled."""
+        WorkShift = self.shift_set.model
+        fields = WorkShift._row_fields()
+        rows = cache.work_shifts(self.enterprise_id).get(self.pk) if cache.is_enabled() else None
+        if rows is None:
+            # Not cached, or the cache predates the work mode
+            rows = self.shift_set.order_by('day', 'number').values_list(*fields)
+        return [tuple(zip(fields, row)) for row in rows]
+
+    def _shift(self, rows: List[Tuple[Tuple[str, object], ...]], shift_id: Optional[int] = None
+               ) -> Optional[ForwardRef('WorkShift')]:
+        for row in rows:
+            if shift_id is None or row[0][1] == shift_id:
+                shift = self._bind(self.shift_set.model(**dict(row)))
+                shift._work_shifts = rows
+                return shift
+        return None
+
+    def cycle_day(self, day: date) -> int:
+        return _cycle_day(day, self.cycle_start, self.cycle_length)
+
+    def _lookup(self, day: date, seconds: int) -> Q:
+        if self.cycle_length == 1:
+            return (
+                    (Q(start__gt=F('end')) & Q(start__lte=seconds) & Q(end__lt=seconds))
+                    | (Q(start__lt=F('end')) & Q(start__lte=seconds) & Q(end__gt=seconds))
+                    | (Q(start__gt=F('end')) & Q(start__gt=seconds) & Q(end__gt=seconds))
+            )
+
+        # The shift day of an overnight shift depends on its number, see `_shift_offsets`
+        prev_day, curr_day, next_day = (self.cycle_day(d) for d in (day - DAY1, day, day + DAY1))
+        return (
+                (Q(start__gt=F('end')) & Q(start__lte=seconds) & Q(end__lt=seconds)
+                 & (Q(number=1, day=next_day) | (~Q(number=1) & Q(day=curr_day))))
+                | (Q(start__lt=F('end')) & Q(start__lte=seconds) & Q(end__gt=seconds) & Q(day=curr_day))
+                | (Q(start__gt=F('end')) & Q(start__gt=seconds) & Q(end__gt=seconds)
+                   & (Q(number=1, day=curr_day) | (~Q(number=1) & Q(day=prev_day))))
+        )
+
+    def _bind(self, shift: ForwardRef('WorkShift')) -> ForwardRef('WorkShift'):
+        shift.work_mode = self
+        if self._meta.get_field('enterprise').is_cached(self):
+            shift.enterprise = self.enterprise
+        return shift
+
+    def _nearest(self, shift_time: datetime, direction: Direction) -> Optional[ForwardRef('WorkShift')]:
+        if cache.is_enabled():
+            shift = self._shift(self._shift_rows())
+        else:
+            shift = self.shift_set.order_by('day', 'number').first()
+        if shift is None:
+            return None
+
+        shift = self._bind(shift).work_shift(shift_time)
+        if direction is Direction.NEXT:
+            while shift.start_time <= shift_time:
+                shift = shift.next()
+            while (prev := shift.prev()).start_time > shift_time:
+                shift = prev
+        else:
+            while shift.end_time > shift_time:
+                shift = shift.prev()
+            while (next_ := shift.next()).end_time <= shift_time:
+                shift = next_
+        return shift._step(direction) if shift.is_day_off else shift
+
+    @instrument('work_mode.get_shift')
+    @clock.frozen()
     def get_shift(
             self,
             shift_time: datetime,
             limit: Union[datetime, int] = 0
     ) -> Optional[Union[ForwardRef('WorkShift'), List[ForwardRef('WorkShift')]]]:
-        WorkShift = apps.get_model(DJANGO_ORG_WORK_SHIFT)
         if timezone.is_naive(shift_time):
             raise NaiveTimeSettingError('The time must be specified with a time zone')
 
-        st = shift_time.astimezone(tz=self.enterprise.tz)
-        seconds = int((st - _day_start(st)).total_seconds())
-        q = (
-                (Q(start__gt=F('end')) & Q(start__lte=seconds) & Q(end__lt=seconds))
-                | (Q(start__lt=F('end')) & Q(start__lte=seconds) & Q(end__gt=seconds))
-                | (Q(start__gt=F('end')) & Q(start__gt=seconds) & Q(end__gt=seconds))
-        )
-        shift = WorkShift.objects.filter(q, work_mode=self).order_by('number').first()
-        shift.work_shift(st)
+        st = shift_time.astimezone(tz=self.tz)
+        # A cache older than the work mode has no table for it, the shift is queried then
+        table = cache.shift_tables(self.enterprise_id).get(self.pk) if cache.is_enabled() else None
+        if table is not None:
+            # The compiled table skips the shifts off, the lowest number wins like in the query
+            occurrence = table.at(st)
+            shift = self._shift(self._shift_rows(), occurrence.shift_id) if occurrence is not None else None
+        else:
+            seconds = int((st - _day_start(st)).total_seconds())
+            q = self._lookup(st.date(), seconds)
+            shift = self.shift_set.filter(q).order_by('number').first()
+        if shift is not None:
+            self._bind(shift).work_shift(st)
+            if shift.is_day_off or not shift.start_time <= st < shift.end_time:
+                shift = None
 
         if isinstance(limit, int):
             if -1 <= limit <= 1: return shift
             backward = limit < 0
         else:
             backward = limit < shift_time
+        direction = Direction.PREV if backward else Direction.NEXT
 
-        shift_set = list(self.shift_set.order_by('number'))
-
-        if backward:
-            shift_set.reverse()
-            sec1 = -SEC1
-            shift_edge = attrgetter('start_time')
-        else:
-            sec1 = SEC1
-            shift_edge = attrgetter('end_time')
+        if shift is None:
+            shift = self._nearest(st, direction)
+            if shift is None:
+                return []
 
-        shift_fields = [field.name for field in shift._meta.fields]
-        _fields = attrgetter(*shift_fields)
         shifts = [shift]
-        shift_count = len(shift_set)
-        i = shift_set.index(shift) + 1
-        if i >= shift_count: i = 0
-
         if isinstance(limit, int):
-            count = 1
-            while count < abs(limit):
-                s = WorkShift(**dict(zip(shift_fields, _fields(shift_set[i]))))
-                shifts.append(s.work_shift(shift_edge(shifts[-1]) + sec1))
-                i += 1
-                if i >= shift_count: i = 0
-                count += 1
+            while len(shifts) < abs(limit):
+                shifts.append(shifts[-1]._step(direction))
+        elif backward:
+            while shifts[-1].start_time > limit:
+                shift = shifts[-1]._step(direction)
+                if shift.end_time <= limit: break
+                shifts.append(shift)
         else:
-            while not shifts[-1].start_time <= limit < shifts[-1].end_time:
-                s = WorkShift(**dict(zip(shift_fields, _fields(shift_set[i]))))
-                shifts.append(s.work_shift(shift_edge(shifts[-1]) + sec1))
-                i += 1
-                if i >= shift_count: i = 0
+            while shifts[-1].end_time <= limit:
+                shift = shifts[-1]._step(direction)
+                if shift.start_time > limit: break
+                shifts.append(shift)
 
         return shifts
 
     @classmethod
+    @instrument('work_mode.get_shifts')
+    @clock.frozen()
     def get_shifts(cls, shift_time: datetime, limit: Union[datetime, int] = 0) -> List[ForwardRef('WorkShift')]:
+        """Shifts of all the work modes, fanned out over the shards."""
         if timezone.is_naive(shift_time):
             raise NaiveTimeSettingError('The time must be specified with a time zone')
 
-        shifts = [wm.get_shift(shift_time, limit=limit) for wm in cls.objects.all()]
+        work_modes = [wm for qs in cls.objects.select_related('enterprise').on_shards() for wm in qs]
+        if not cache.is_enabled():
+            CalendarIndex.prefetch(work_modes)
+        shifts = [wm.get_shift(shift_time, limit=limit) for wm in work_modes]
         if isinstance(limit, int) and -1 <= limit <= 1:
             return shifts
 
@@ -119,48 +215,62 @@ class AbstractWorkShift(models.Model):
                                   related_name='shift_set', on_delete=models.PROTECT)
     name = models.CharField(_('Name'), max_length=36)
     number = models.PositiveSmallIntegerField(_('Shift number'))
+    day = models.PositiveSmallIntegerField(_('Cycle day'), default=0)
     start = models.PositiveIntegerField(_('Shift start indent, sec.'), default=0)
     end = models.PositiveIntegerField(_('Shift end indent, sec.'), default=43200)
 
+    objects = EnterpriseManager()
+
     class Meta:
         abstract = True
         verbose_name = _('Work shift')
         verbose_name_plural = _('Work shifts')
         unique_together = (('work_mode', 'name'), ('work_mode', 'number'))
-        ordering = ('enterprise__name', 'work_mode__name', 'number')
+        ordering = ORDERING['AbstractWorkShift']
 
     def __str__(self):
         return f'{self.enterprise.name}/{self.work_mode.name}/{self.name}'
 
+    @classmethod
+    def _row_fields(cls) -> List[str]:
+        fields = [f.name for f in cls._meta.fields if f.name not in ('id', 'work_mode', 'enterprise')]
+        return ['id', 'enterprise_id', 'work_mode_id', *fields]
+
+    @instrument('work_shift.save')
     def save(self, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        if self.day and self.day >= related(self, 'work_mode', using).cycle_length:
+            raise CycleDayError('The cycle day is out of the work mode cycle')
         if self.enterprise_id is None:
-            self.enterprise_id = self.work_mode.enterprise_id
+            self.enterprise_id = related(self, 'work_mode', using).enterprise_id
 
         super().save(**kwargs)
 
+    def _borders(self, shift_day: date) -> Tuple[datetime, datetime]:
+        day_start = _datetime(shift_day, tzinfo=self.work_mode.tz)
+        start, end = self.work_mode.calendar.override(shift_day, self.id) or (self.start, self.end)
+        start, end = _shift_offsets(self.number, start, end)
+        return day_start + timedelta(seconds=start), day_start + timedelta(seconds=end)
+
+    @instrument('work_shift.borders')
     def borders(self, shift_time: datetime) -> Tuple[datetime, datetime]:
-        day_start = _day_start(shift_time).replace(tzinfo=self.enterprise.tz)
-        if self.start < self.end:
-            start = day_start + timedelta(seconds=self.start)
-            end = day_start + timedelta(seconds=self.end)
-        elif self.number > 1:
-            start = day_start + timedelta(seconds=self.start)
-            end = day_start + timedelta(seconds=self.end) + SECONDS_IN_DAY
-        else:
-            start = day_start + timedelta(seconds=self.start) - SECONDS_IN_DAY
-            end = day_start + timedelta(seconds=self.end)
+        work_mode = self.work_mode
+        day = _day_start(shift_time).date()
+        if work_mode.cycle_length > 1:
+            day = _nearest_cycle_day(day, self.day, work_mode.cycle_start, work_mode.cycle_length)
+        cycle = timedelta(days=work_mode.cycle_length)
 
+        start, end = self._borders(day)
         if not start <= shift_time < end:
-            if (start + SECONDS_IN_DAY <= shift_time < end + SECONDS_IN_DAY):
-                start += SECONDS_IN_DAY
-                end += SECONDS_IN_DAY
-            elif (start - SECONDS_IN_DAY <= shift_time < end - SECONDS_IN_DAY):
-                start -= SECONDS_IN_DAY
-                end -= SECONDS_IN_DAY
+            for shift_day in (day + cycle, day - cycle):
+                _start, _end = self._borders(shift_day)
+                if _start <= shift_time < _end:
+                    return _start, _end
 
         return start, end
 
     @staticmethod
+    @instrument('work_shift.make_work_shift')
     def make_work_shift(
             shift: Optional[ForwardRef('WorkShift')],
             shift_time: datetime,
@@ -174,56 +284,68 @@ class AbstractWorkShift(models.Model):
             raise NaiveTimeSettingError('The time must be specified with a time zone')
 
         shift.shift_time = shift_time
-        shift.now = now or timezone.now()
+        shift.now = now or clock.now()
         shift.start_time, shift.end_time = shift.borders(shift.shift_time)
-        start_day_time = _day_start(shift.shift_time)
-        end_day_time = start_day_time + SECONDS_IN_DAY
-        if (
-                shift.number == 1
-                and (
-                    shift.start_time.day < shift.end_time.day
-                    or shift.start_time.month < shift.end_time.month
-                    or shift.start_time.year < shift.end_time.year
-                )
-                and shift.start_time.day == shift.shift_time.day
-        ):
-            shift.shift_day_time = end_day_time
+        if shift.number == 1 and shift.start >= shift.end:
+            shift.shift_day_time = _day_start(shift.end_time)
         else:
-            shift.shift_day_time = start_day_time
+            shift.shift_day_time = _day_start(shift.start_time)
         shift.shift_day = shift.shift_day_time.date()
         shift.is_current = shift.start_time <= shift.now < shift.end_time
         return shift
 
+    @property
+    def is_day_off(self) -> bool:
+        return self.work_mode.calendar.is_off(self.shift_day, self.id)
+
     def work_shift(self, shift_time: Union[date, datetime]) -> Optional[ForwardRef('WorkShift')]:
         if not isinstance(shift_time, datetime):
-            shift_time = _datetime(shift_time, tzinfo=self.enterprise.tz)
+            shift_time = _datetime(shift_time, tzinfo=self.work_mode.tz)
         return self.__class__.make_work_shift(self, shift_time)
 
-    def _step(self, direction: Direction) -> ForwardRef('WorkShift'):
-        if not getattr(self, 'shift_time', None):
-            return self.work_shift(timezone.now())._step(direction)
-
+    def _advance(self, direction: Direction) -> ForwardRef('WorkShift'):
+        """The adjacent shift of the cycle, a day off or not."""
         if not getattr(self, '_work_shifts', []):
-            fields = [f.name for f in self._meta.fields if f.name not in ('id', 'work_mode', 'enterprise')]
-            fields.insert(0, 'id')
-            fields.insert(1, 'enterprise_id')
-            fields.insert(2, 'work_mode_id')
-            f = lambda v: tuple(zip(fields, v))
-            self._work_shifts = list(map(f, self.work_mode.shift_set.order_by('number').values_list(*fields)))
-
-        shift_set = self._work_shifts.copy()
+            self._work_shifts = self.work_mode._shift_rows()
+
+        work_mode = self.work_mode
+        cycle = timedelta(days=work_mode.cycle_length)
+        cycle_start = self.shift_day - timedelta(days=self.day)
+        shifts = [s[0][1] for s in self._work_shifts]
+        i = shifts.index(self.id)
         if direction is Direction.PREV:
-            shift_set.reverse()
-            shift_time = getattr(self, 'start_time') - SEC1
+            i -= 1
+            if i < 0:
+                i = len(shifts) - 1
+                cycle_start -= cycle
         else:
-            shift_time = getattr(self, 'end_time') + SEC1
-
-        shifts = [s[0][1] for s in shift_set]
-        i = shifts.index(self.id) + 1
-        if i >= len(shifts): i = 0
+            i += 1
+            if i >= len(shifts):
+                i = 0
+                cycle_start += cycle
+
+        shift = work_mode._bind(self.__class__(**dict(self._work_shifts[i])))
+        start_time, end_time = shift._borders(cycle_start + timedelta(days=shift.day))
+        shift = shift.work_shift(end_time - SEC1 if direction is Direction.PREV else start_time)
+        shift._work_shifts = self._work_shifts
+        return shift
 
-        shift = self.__class__(**dict(shift_set[i])).work_shift(shift_time)
-        shift._work_shifts = self._work_shifts.copy()
+    @instrument('work_shift.step')
+    def _step(self, direction: Direction) -> ForwardRef('WorkShift'):
+        if not getattr(self, 'shift_time', None):
+            return self.work_shift(clock.now())._step(direction)
+
+        shift = self._advance(direction)
+        if not shift.is_day_off:
+            return shift
+
+        # Past the calendar horizon and one more cycle no shift is off
+        first, last = self.work_mode.calendar.horizon()
+        cycle = timedelta(days=self.work_mode.cycle_length)
+        while shift.is_day_off:
+            if not first - cycle <= shift.shift_day <= last + cycle:
+                raise DayOffError('Every shift of the work mode is off')
+            shift = shift._advance(direction)
         return shift
 
     def next(self) -> ForwardRef('WorkShift'):
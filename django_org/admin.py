@@ -12,7 +12,11 @@ from .settings import (
     DJANGO_ORG_DEPARTMENT_TYPE,
     DJANGO_ORG_DEPARTMENT,
     DJANGO_ORG_PERSON,
-    DJANGO_ORG_EMPLOYEE
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+    DJANGO_ORG_CHANGE_LOG_ENTRY,
+    DJANGO_ORG_OUTBOX_MESSAGE
 )
 
 
@@ -38,7 +42,7 @@ if DJANGO_ORG_POST == f'{DEFAULT_APP_NAME}.Post':
 if DJANGO_ORG_WORK_MODE == f'{DEFAULT_APP_NAME}.WorkMode':
     @admin.register(models.WorkMode)
     class WorkModeAdmin(admin.ModelAdmin):
-        list_display = ('enterprise', 'name',)
+        list_display = ('enterprise', 'name', 'cycle_length', 'cycle_start',)
         list_display_links = ('name',)
         search_fields = ('name',)
         ordering = ('enterprise__name', 'name',)
@@ -47,7 +51,7 @@ if DJANGO_ORG_WORK_MODE == f'{DEFAULT_APP_NAME}.WorkMode':
 if DJANGO_ORG_WORK_SHIFT == f'{DEFAULT_APP_NAME}.WorkShift':
     @admin.register(models.WorkShift)
     class WorkShiftAdmin(admin.ModelAdmin):
-        list_display = ('enterprise', 'work_mode', 'name', 'number', 'start', 'end',)
+        list_display = ('enterprise', 'work_mode', 'name', 'number', 'day', 'start', 'end',)
         list_display_links = ('name',)
         search_fields = ('work_mode', 'name',)
         ordering = ('enterprise__name', 'work_mode__name', 'number', 'name',)
@@ -87,3 +91,56 @@ if DJANGO_ORG_EMPLOYEE == f'{DEFAULT_APP_NAME}.Employee':
         list_display_links = ('person',)
         search_fields = ('person',)
         ordering = ('enterprise__name', 'department__name', 'post', 'person',)
+
+
+if DJANGO_ORG_WORK_MODE_ASSIGNMENT == f'{DEFAULT_APP_NAME}.WorkModeAssignment':
+    @admin.register(models.WorkModeAssignment)
+    class WorkModeAssignmentAdmin(admin.ModelAdmin):
+        list_display = ('enterprise', 'employee', 'work_mode', 'date_from', 'date_to',)
+        list_display_links = ('employee',)
+        search_fields = ('employee__person__full_name',)
+        ordering = ('enterprise__name', 'employee', 'date_from',)
+
+
+if DJANGO_ORG_CALENDAR_EXCEPTION == f'{DEFAULT_APP_NAME}.CalendarException':
+    @admin.register(models.CalendarException)
+    class CalendarExceptionAdmin(admin.ModelAdmin):
+        list_display = ('enterprise', 'day', 'name', 'work_mode', 'work_shift', 'start', 'end',)
+        list_display_links = ('day',)
+        search_fields = ('name',)
+        ordering = ('enterprise__name', '-day',)
+
+
+if DJANGO_ORG_CHANGE_LOG_ENTRY == f'{DEFAULT_APP_NAME}.ChangeLogEntry':
+    @admin.register(models.ChangeLogEntry)
+    class ChangeLogEntryAdmin(admin.ModelAdmin):
+        list_display = ('changed_at', 'enterprise_id', 'model', 'object_id', 'action',)
+        list_display_links = ('changed_at',)
+        list_filter = ('action', 'model',)
+        readonly_fields = ('changed_at', 'enterprise', 'model', 'object_id', 'action', 'data',)
+        ordering = ('-id',)
+
+        def has_add_permission(self, request):
+            return False
+
+        def has_change_permission(self, request, obj=None):
+            return False
+
+        def has_delete_permission(self, request, obj=None):
+            return False
+
+
+if DJANGO_ORG_OUTBOX_MESSAGE == f'{DEFAULT_APP_NAME}.OutboxMessage':
+    @admin.register(models.OutboxMessage)
+    class OutboxMessageAdmin(admin.ModelAdmin):
+        list_display = ('id', 'created_at', 'enterprise_id', 'model', 'object_id', 'action',)
+        list_display_links = ('id',)
+        list_filter = ('action', 'model',)
+        readonly_fields = ('created_at', 'enterprise', 'model', 'object_id', 'action', 'data',)
+        ordering = ('-id',)
+
+        def has_add_permission(self, request):
+            return False
+
+        def has_change_permission(self, request, obj=None):
+            return False
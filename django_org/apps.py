@@ -1,3 +1,6 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
@@ -6,5 +9,45 @@ __all__ = (
 )
 
 
+COMMANDS = ('manage.py', 'django-admin', 'django-admin.py', '__main__.py')
+
+
+def _serves_requests() -> bool:
+    """False for management commands (`migrate`, `shell`, ...) except `runserver`."""
+    if not sys.argv or os.path.basename(sys.argv[0]) not in COMMANDS:
+        return True
+    return sys.argv[1:2] == ['runserver']
+
+
 class OrgConfig(AppConfig):
     name = 'django_org'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from django_org import cache, history, identity_map, instrumentation, outbox, replicas
+        from django_org.settings import (
+            DJANGO_ORG_CACHE,
+            DJANGO_ORG_CHANGE_LOG,
+            DJANGO_ORG_INSTRUMENTATION,
+            DJANGO_ORG_OUTBOX,
+            DJANGO_ORG_READ_REPLICAS,
+            DJANGO_ORG_WARM_ON_READY
+        )
+
+        # Inactive outside `identity_map()` blocks
+        identity_map.install()
+        if DJANGO_ORG_INSTRUMENTATION:
+            instrumentation.enable()
+        if DJANGO_ORG_READ_REPLICAS:
+            post_save.connect(replicas._pin_on_write, dispatch_uid='django_org_pin_on_save')
+            post_delete.connect(replicas._pin_on_write, dispatch_uid='django_org_pin_on_delete')
+        if DJANGO_ORG_CHANGE_LOG:
+            history.connect()
+        if DJANGO_ORG_OUTBOX:
+            outbox.connect()
+        if DJANGO_ORG_CACHE is not None:
+            cache.connect()
+            if DJANGO_ORG_WARM_ON_READY and _serves_requests():
+                # In the background, the database must not be queried while the apps are loading
+                cache.warm_in_background()
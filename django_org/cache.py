@@ -0,0 +1,249 @@
+"""Cache of the hot read paths: shift tables, interval indexes, enterprise time zones and department trees.
+
+Enabled with `DJANGO_ORG_CACHE`, an alias of `CACHES`: a local memory cache is per process,
+a shared one (Redis, Memcached) is filled once for all the processes. Every entry of an enterprise
+carries its version, a change of the enterprise's org models bumps the version.
+"""
+
+import logging
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connections, models
+from django.db.models.signals import post_delete, post_save
+
+from django_org.instrumentation import cache_hit, cache_miss
+from django_org.interval_index import IntervalIndex
+from django_org.schedule import ShiftTable
+from django_org.settings import (
+    DJANGO_ORG_CACHE,
+    DJANGO_ORG_CACHE_TIMEOUT,
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION
+)
+
+
+__all__ = (
+    'WarmUpReport',
+    'is_enabled',
+    'invalidate',
+    'time_zone',
+    'shift_tables',
+    'work_shifts',
+    'department_tree',
+    'subtree_ranges',
+    'interval_index',
+    'warm',
+    'warm_in_background',
+    'connect',
+    'disconnect',
+)
+
+
+logger = logging.getLogger('django_org')
+
+PREFIX = 'django_org'
+CACHED_MODELS = (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+)
+
+
+class WarmUpReport(NamedTuple):
+    enterprises: int
+    seconds: float
+    memory: int
+    peak_memory: int
+
+    def __str__(self):
+        return (f'Warmed {self.enterprises} enterprises in {self.seconds:.2f}s, '
+                f'{self.memory / 2 ** 20:.1f} MiB allocated, {self.peak_memory / 2 ** 20:.1f} MiB peak')
+
+
+def is_enabled() -> bool:
+    return DJANGO_ORG_CACHE is not None
+
+
+def _cache():
+    return caches[DJANGO_ORG_CACHE]
+
+
+def _id(enterprise: Union[models.Model, int]) -> int:
+    return enterprise.pk if isinstance(enterprise, models.Model) else enterprise
+
+
+def _version(enterprise_id: int) -> int:
+    cache = _cache()
+    key = f'{PREFIX}:version:{enterprise_id}'
+    version = cache.get(key)
+    if version is None:
+        # A timestamp, so an evicted version never brings back stale entries
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(enterprise: Union[models.Model, int]):
+    if is_enabled():
+        _cache().set(f'{PREFIX}:version:{_id(enterprise)}', time.time_ns(), None)
+
+
+def _get(name: str, enterprise: Union[models.Model, int], load: Callable, suffix: str = ''):
+    cache = _cache()
+    enterprise_id = _id(enterprise)
+    key = f'{PREFIX}:{name}:{enterprise_id}:{_version(enterprise_id)}{suffix}'
+    value = cache.get(key)
+    if value is None:
+        cache_miss(f'cache.{name}')
+        value = load()
+        cache.set(key, value, DJANGO_ORG_CACHE_TIMEOUT)
+    else:
+        cache_hit(f'cache.{name}')
+    return value
+
+
+def time_zone(enterprise: Union[models.Model, int]) -> str:
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    if isinstance(enterprise, models.Model):
+        return enterprise.time_zone
+    return _get('time_zone', enterprise,
+                lambda: Enterprise.objects.for_enterprise(enterprise).values_list('time_zone', flat=True).get())
+
+
+def shift_tables(enterprise: Union[models.Model, int]) -> Dict[int, ShiftTable]:
+    """Compiled shift tables of the enterprise work modes by work mode id."""
+    WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+    return _get('shift_tables', enterprise,
+                lambda: ShiftTable.for_work_modes(WorkMode.objects.for_enterprise(enterprise).select_related('enterprise')))
+
+
+def work_shifts(enterprise: Union[models.Model, int]) -> Dict[int, List[tuple]]:
+    """Rows of the enterprise work shifts by work mode id, ordered by day and number."""
+    WorkShift = apps.get_model(DJANGO_ORG_WORK_SHIFT)
+
+    def load():
+        rows = defaultdict(list)
+        fields = WorkShift._row_fields()
+        for row in WorkShift.objects.for_enterprise(enterprise).order_by('work_mode_id', 'day', 'number').values_list(
+                *fields):
+            rows[row[2]].append(row)
+        return dict(rows)
+
+    return _get('work_shifts', enterprise, load)
+
+
+def department_tree(enterprise: Union[models.Model, int]) -> Dict[Optional[int], List[int]]:
+    """Department ids of the enterprise by parent id, roots under None."""
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+
+    def load():
+        children = defaultdict(list)
+        for pk, parent_id in Department.objects.for_enterprise(enterprise).values_list('id', 'parent_id').order_by('id'):
+            children[parent_id].append(pk)
+        return dict(children)
+
+    return _get('department_tree', enterprise, load)
+
+
+def subtree_ranges(department: models.Model) -> List[Tuple[int, int]]:
+    """Id ranges of the department subtree, see `django_org.scope`."""
+    from django_org.scope import id_ranges
+
+    return _get('subtree_ranges', department.enterprise_id, lambda: id_ranges(department.subtree_ids()),
+                suffix=f':{department.pk}')
+
+
+def interval_index(enterprise: Union[models.Model, int], start: date, end: date) -> IntervalIndex:
+    """Interval index of the enterprise shift occurrences over the days [start, end)."""
+    return _get('interval_index', enterprise, lambda: IntervalIndex.for_enterprise(enterprise, start, end),
+                suffix=f':{start:%Y%m%d}:{end:%Y%m%d}')
+
+
+def _warm_one(enterprise: models.Model, threaded: bool):
+    try:
+        time_zone(enterprise.pk)
+        shift_tables(enterprise)
+        work_shifts(enterprise)
+        department_tree(enterprise)
+    finally:
+        if threaded:
+            connections.close_all()
+
+
+def warm(enterprises: Optional[Iterable[models.Model]] = None, concurrency: int = 4) -> WarmUpReport:
+    """Load the caches of the enterprises (all by default), at most `concurrency` at a time."""
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    if not is_enabled():
+        raise RuntimeError('The cache is disabled, set DJANGO_ORG_CACHE')
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        if enterprises is None:
+            enterprises = [e for qs in Enterprise.objects.order_by('pk').on_shards() for e in qs]
+        enterprises = list(enterprises)
+        if concurrency > 1 and len(enterprises) > 1:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='django_org_warm') as executor:
+                list(executor.map(lambda e: _warm_one(e, True), enterprises))
+        else:
+            for enterprise in enterprises:
+                _warm_one(enterprise, False)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return WarmUpReport(len(enterprises), time.perf_counter() - started, max(current - before, 0), peak - before)
+
+
+def warm_in_background(concurrency: int = 4) -> threading.Thread:
+    def run():
+        try:
+            logger.info('%s', warm(concurrency=concurrency))
+        except Exception:
+            logger.exception('django_org cache warm-up failed')
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, name='django_org_warm', daemon=True)
+    thread.start()
+    return thread
+
+
+def _on_change(sender, instance, **kwargs):
+    if isinstance(instance, apps.get_model(DJANGO_ORG_ENTERPRISE)):
+        invalidate(instance.pk)
+    elif instance.enterprise_id is not None:
+        invalidate(instance.enterprise_id)
+
+
+def connect():
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'django_org_cache_save_{label}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'django_org_cache_delete_{label}')
+
+
+def disconnect():
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.disconnect(sender=model, dispatch_uid=f'django_org_cache_save_{label}')
+        post_delete.disconnect(sender=model, dispatch_uid=f'django_org_cache_delete_{label}')
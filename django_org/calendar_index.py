@@ -0,0 +1,82 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.apps import apps
+from django.db.models import Q
+
+from django_org.settings import DJANGO_ORG_CALENDAR_EXCEPTION
+from django_org.sharding import by_db
+
+
+__all__ = (
+    'CalendarIndex',
+)
+
+
+class CalendarIndex:
+    """Calendar exceptions of one work mode.
+
+    Whole days off are kept as per-year bitmaps, so a lookup is a couple of integer operations.
+    """
+
+    __slots__ = ('_years', '_shifts_off', '_overrides')
+
+    def __init__(self, exceptions: Iterable[Tuple[date, Optional[int], Optional[int], Optional[int]]] = ()):
+        self._years: Dict[int, int] = defaultdict(int)
+        self._shifts_off = set()
+        self._overrides = {}
+        for day, shift_id, start, end in exceptions:
+            if start is not None and end is not None:
+                self._overrides[(day, shift_id)] = (start, end)
+            elif shift_id is not None:
+                self._shifts_off.add((day, shift_id))
+            else:
+                self._years[day.year] |= 1 << self._bit(day)
+
+    def __bool__(self):
+        return bool(self._years or self._shifts_off or self._overrides)
+
+    @staticmethod
+    def _bit(day: date) -> int:
+        return day.toordinal() - date(day.year, 1, 1).toordinal()
+
+    def is_day_off(self, day: date) -> bool:
+        return bool(self._years.get(day.year, 0) >> self._bit(day) & 1)
+
+    def is_off(self, day: date, shift_id: int) -> bool:
+        return self.is_day_off(day) or (day, shift_id) in self._shifts_off
+
+    def horizon(self) -> Optional[Tuple[date, date]]:
+        """The first and the last day a shift may be off."""
+        days = [day for day, _ in self._shifts_off]
+        if self._years:
+            days += [date(min(self._years), 1, 1), date(max(self._years), 12, 31)]
+        return (min(days), max(days)) if days else None
+
+    def override(self, day: date, shift_id: int) -> Optional[Tuple[int, int]]:
+        return self._overrides.get((day, shift_id))
+
+    @classmethod
+    def prefetch(cls, work_modes: Iterable) -> None:
+        """Load the calendars of the work modes with a single query."""
+        CalendarException = apps.get_model(DJANGO_ORG_CALENDAR_EXCEPTION)
+        work_modes = list(work_modes)
+        if not work_modes:
+            return
+
+        common = defaultdict(list)
+        own = defaultdict(list)
+        for db, group in by_db(work_modes).items():
+            rows = CalendarException.objects.using(db).filter(
+                Q(work_mode__in=group) | Q(work_mode__isnull=True),
+                enterprise_id__in={wm.enterprise_id for wm in group}
+            ).values_list('enterprise_id', 'work_mode_id', 'day', 'work_shift_id', 'start', 'end').order_by()
+            for enterprise_id, work_mode_id, *exception in rows:
+                if work_mode_id is None:
+                    common[enterprise_id].append(exception)
+                else:
+                    own[work_mode_id].append(exception)
+
+        for wm in work_modes:
+            wm._calendar = cls(common[wm.enterprise_id] + own[wm.pk])
@@ -0,0 +1,73 @@
+"""The clock of django_org: the current time of `is_current`, trackers, snapshots, the logs and the outbox.
+
+`now()` is `timezone.now()` unless a clock is set for the context. Bulk APIs evaluate inside
+`frozen()`, so every shift of a batch is compared with one timestamp; tests and benchmarks replay
+time with `frozen(at)` or any callable passed to `use`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.utils import timezone
+
+from django_org.exceptions import NaiveTimeSettingError
+
+
+__all__ = (
+    'Frozen',
+    'frozen',
+    'now',
+    'use',
+)
+
+
+Clock = Callable[[], datetime]
+
+_clock: ContextVar[Optional[Clock]] = ContextVar('django_org_clock', default=None)
+
+
+class Frozen:
+    """A clock standing still at `at`."""
+
+    __slots__ = ('at',)
+
+    def __init__(self, at: datetime):
+        if timezone.is_naive(at):
+            raise NaiveTimeSettingError('The time must be specified with a time zone')
+        self.at = at
+
+    def __call__(self) -> datetime:
+        return self.at
+
+
+def now() -> datetime:
+    clock = _clock.get()
+    return clock() if clock is not None else timezone.now()
+
+
+@contextmanager
+def use(clock: Clock):
+    """Read the time from `clock` inside the block."""
+    token = _clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _clock.reset(token)
+
+
+@contextmanager
+def frozen(at: Optional[datetime] = None):
+    """Stop the clock at `at` (the current time by default) inside the block, yield the frozen time.
+
+    Without `at` a block nested in a frozen one keeps the outer time, so a batch calling other
+    batches is evaluated with one timestamp.
+    """
+    clock = _clock.get()
+    if at is None and isinstance(clock, Frozen):
+        yield clock.at
+        return
+
+    with use(Frozen(at or now())) as clock:
+        yield clock.at
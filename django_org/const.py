@@ -1,6 +1,8 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 
 SEC1 = timedelta(seconds=1)
 HOUR1 = timedelta(seconds=3600)
 SECONDS_IN_DAY = 24 * HOUR1
+DAY1 = timedelta(days=1)
+CYCLE_START = date(1970, 1, 1)
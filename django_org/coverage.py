@@ -0,0 +1,163 @@
+"""Staffing coverage: headcount per shift occurrence per department subtree against a target.
+
+`coverage` builds the whole grid in one pass with a bounded number of queries: the department
+tree, the work mode assignments of the window and the shift tables (all but the assignments come
+from the cache with `DJANGO_ORG_CACHE`). Assignments become difference arrays over the days per
+department and work mode, the departments are rolled up into their parents bottom-up and the
+columns are gathered from the rows, all with whole-array operations instead of per-cell loops.
+"""
+
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+from operator import add, itemgetter
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from django.apps import apps
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from django_org import cache, scope
+from django_org.instrumentation import instrument
+from django_org.schedule import Occurrence, ShiftTable
+from django_org.settings import DJANGO_ORG_WORK_MODE, DJANGO_ORG_DEPARTMENT, DJANGO_ORG_WORK_MODE_ASSIGNMENT
+
+
+__all__ = (
+    'COLUMNS',
+    'Coverage',
+    'coverage',
+)
+
+
+COLUMNS = ('department_id', 'shift_day', 'shift_id', 'start', 'end', 'headcount', 'target')
+
+# Target headcounts by (department id, shift id)
+Targets = Mapping[Tuple[int, int], int]
+
+
+class Coverage(NamedTuple):
+    """Dense matrix: a row per department (subtree first, parents before children), a column per occurrence."""
+    departments: List[int]
+    occurrences: List[Occurrence]
+    headcount: List[array]
+    target: List[array]
+
+    def shortfall(self) -> List[array]:
+        """Missing headcount per cell, zero where the target is met."""
+        return [array('i', (max(t - h, 0) for h, t in zip(hs, ts))) for hs, ts in zip(self.headcount, self.target)]
+
+    def rows(self) -> Iterator[Tuple]:
+        """The cells as `COLUMNS` tuples, e.g. for `django_org.export`."""
+        for department_id, hs, ts in zip(self.departments, self.headcount, self.target):
+            for o, h, t in zip(self.occurrences, hs, ts):
+                yield department_id, o.shift_day, o.shift_id, o.start, o.end, h, t
+
+
+def _departments(enterprise: models.Model, root: Optional[int]) -> Tuple[List[int], Dict[int, int]]:
+    """Department ids of the subtree breadth-first with their parents."""
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+    if cache.is_enabled():
+        children = cache.department_tree(enterprise)
+    else:
+        children = {}
+        for pk, parent_id in Department.objects.for_enterprise(enterprise).values_list('id', 'parent_id').order_by('id'):
+            children.setdefault(parent_id, []).append(pk)
+
+    ids = [root] if root is not None else list(children.get(None, ()))
+    parents = {}
+    for pk in ids:
+        for child in children.get(pk, ()):
+            parents[child] = pk
+            ids.append(child)
+    return ids, parents
+
+
+@instrument('coverage')
+def coverage(
+        enterprise: Optional[models.Model] = None,
+        department: Optional[models.Model] = None,
+        start: Optional[date] = None,
+        days: int = 14,
+        targets: Optional[Targets] = None
+) -> Coverage:
+    """Headcount assigned to every shift occurrence of the days [start, start + days) per department subtree.
+
+    An employee counts for an occurrence when their assignment to its work mode is effective on the
+    shift day, and for the department of the employee and all its ancestors within the grid.
+    `start` is today in the enterprise time zone by default.
+    """
+    WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+    WorkModeAssignment = apps.get_model(DJANGO_ORG_WORK_MODE_ASSIGNMENT)
+    if department is not None:
+        enterprise = department.enterprise
+    if enterprise is None:
+        raise ValueError('Either enterprise or department must be specified')
+    if start is None:
+        start = timezone.localdate(timezone=enterprise.tz)
+    end = start + timedelta(days=days - 1)
+
+    departments, parents = _departments(enterprise, department.pk if department is not None else None)
+    if cache.is_enabled():
+        tables = cache.shift_tables(enterprise)
+    else:
+        tables = ShiftTable.for_work_modes(WorkMode.objects.for_enterprise(enterprise).select_related('enterprise'))
+
+    occurrences = sorted(
+        (o for day in range(days) for table in tables.values()
+         for o in table.day_occurrences(start + timedelta(days=day))),
+        key=lambda o: (o.start, o.work_mode_id, o.number)
+    )
+
+    # A row per department: headcount by work mode and day, `days` cells per work mode
+    modes = {pk: i for i, pk in enumerate(sorted(tables))}
+    width, stride = len(modes) * days, days + 1
+    index = {pk: i for i, pk in enumerate(departments)}
+    diffs: Dict[int, array] = {}
+
+    assignments = WorkModeAssignment.objects.for_enterprise(enterprise).filter(
+        Q(date_to__isnull=True) | Q(date_to__gte=start),
+        date_from__lte=end,
+    )
+    if department is not None:
+        assignments = assignments.filter(scope.ranges_q('employee__department__pk', scope.subtree_ranges(department)))
+    for department_id, work_mode_id, date_from, date_to in assignments.values_list(
+            'employee__department_id', 'work_mode_id', 'date_from', 'date_to').order_by().iterator():
+        if department_id not in index or work_mode_id not in modes:
+            continue
+        diff = diffs.get(department_id)
+        if diff is None:
+            diff = diffs[department_id] = array('i', [0]) * (len(modes) * stride)
+        offset = modes[work_mode_id] * stride
+        diff[offset + max((date_from - start).days, 0)] += 1
+        diff[offset + (min((date_to - start).days, days - 1) if date_to else days - 1) + 1] -= 1
+
+    zeros = array('i', [0]) * width
+    rows = [zeros] * len(departments)
+    for department_id, diff in diffs.items():
+        row = array('i')
+        for offset in range(0, len(diff), stride):
+            row.extend(accumulate(diff[offset:offset + days]))
+        rows[index[department_id]] = row
+
+    # Children come after their parents, so a bottom-up pass rolls up whole subtrees
+    for i in range(len(departments) - 1, 0, -1):
+        parent = parents.get(departments[i])
+        if parent is not None and rows[i] is not zeros:
+            j = index[parent]
+            rows[j] = array('i', map(add, rows[j], rows[i]))
+
+    positions = [modes[o.work_mode_id] * days + (o.shift_day - start).days for o in occurrences]
+    if positions:
+        gather = itemgetter(*positions) if len(positions) > 1 else lambda row: (row[positions[0]],)
+        headcount = [array('i', gather(row)) for row in rows]
+    else:
+        headcount = [array('i') for _ in rows]
+
+    targets = targets or {}
+    target = [
+        array('i', (targets.get((department_id, o.shift_id), 0) for o in occurrences))
+        for department_id in departments
+    ]
+    return Coverage(departments, occurrences, headcount, target)
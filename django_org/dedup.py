@@ -0,0 +1,278 @@
+"""Matching and merging of duplicate people.
+
+`PersonIndex` puts every person into blocks by normalized keys: the short name as built by
+`AbstractPerson._short_name` (with and without the middle name), a phonetic key and the first
+trigram of the last name with the first initial, and the sorted name tokens (swapped first and
+last names). Candidates are scored with the trigram similarity of the names only within their
+blocks, so matching is close to linear in the number of people instead of quadratic.
+"""
+
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from django.apps import apps
+from django.db import models, router, transaction
+from django.db.models import Case, Value, When
+
+from django_org import history, outbox, replicas
+from django_org.instrumentation import instrument
+from django_org.settings import DJANGO_ORG_PERSON, DJANGO_ORG_EMPLOYEE
+from django_org.utils import _case
+
+
+__all__ = (
+    'Match',
+    'Merged',
+    'PersonIndex',
+    'blocking_keys',
+    'clusters',
+    'merge',
+    'normalize',
+    'similarity',
+    'soundex',
+)
+
+
+CHUNK_SIZE = 5000
+THRESHOLD = 0.75
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+
+
+class Match(NamedTuple):
+    a: int
+    b: int
+    score: float
+
+
+class _Names(NamedTuple):
+    full: str
+    last_first: str
+    has_middle: bool
+
+
+class Merged(NamedTuple):
+    people: int
+    employees: int
+    users: int
+    # The groups left unmerged, their people would have more than one employee or user
+    skipped: Tuple[Tuple[int, ...], ...] = ()
+
+
+def normalize(name: str) -> str:
+    """Case-folded, without accents, punctuation and repeated spaces."""
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(c if c.isalnum() else ' ' for c in name if not unicodedata.combining(c))
+    return ' '.join(name.split())
+
+
+def soundex(name: str) -> str:
+    """American Soundex of a normalized name, names in other scripts are kept as their first letters."""
+    letters = [c for c in name if c.isalpha()]
+    if not letters:
+        return ''
+    if not letters[0].isascii():
+        return ''.join(letters[:4])
+
+    code, previous = letters[0], SOUNDEX_CODES.get(letters[0], '')
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, '')
+        if digit and digit != previous:
+            code += digit
+        if c not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def _trigrams(name: str) -> Set[str]:
+    name = f'  {name} '
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the trigrams of two normalized names."""
+    ta, tb = _trigrams(a), _trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+def blocking_keys(last_name: str, first_name: str, middle_name: str = '') -> Set[str]:
+    Person = apps.get_model(DJANGO_ORG_PERSON)
+    last_name, first_name, middle_name = normalize(last_name), normalize(first_name), normalize(middle_name)
+    full_name = Person._full_name(last_name, first_name, middle_name)
+    keys = {
+        f's:{Person._short_name(last_name, first_name, middle_name)}',
+        f's:{Person._short_name(last_name, first_name, "")}',
+        f't:{" ".join(sorted(full_name.split()))}',
+    }
+    if last_name:
+        keys.add(f'p:{soundex(last_name)}{first_name[:1]}')
+        keys.add(f'g:{last_name[:3]}{first_name[:1]}')
+    return keys
+
+
+class PersonIndex:
+    """Blocks of people for matching, blocks larger than `max_block` are too common to be used."""
+
+    def __init__(self, max_block: int = 1000):
+        self.max_block = max_block
+        self.blocks: Dict[str, List[int]] = defaultdict(list)
+        self.keys: Dict[int, Set[str]] = {}
+        self.names: Dict[int, _Names] = {}
+
+    @staticmethod
+    def _names(last_name: str, first_name: str, middle_name: str) -> _Names:
+        return _Names(
+            normalize(f'{last_name} {first_name} {middle_name}'),
+            normalize(f'{last_name} {first_name}'),
+            bool(normalize(middle_name)),
+        )
+
+    def add(self, pk: int, last_name: str, first_name: str, middle_name: str = ''):
+        self.names[pk] = self._names(last_name, first_name, middle_name)
+        self.keys[pk] = blocking_keys(last_name, first_name, middle_name)
+        for key in self.keys[pk]:
+            self.blocks[key].append(pk)
+
+    @classmethod
+    @instrument('dedup.build')
+    def build(cls, people: Optional[models.QuerySet] = None, max_block: int = 1000,
+              chunk_size: int = CHUNK_SIZE) -> 'PersonIndex':
+        """The index of the people, all of them by default, read in chunks."""
+        if people is None:
+            people = apps.get_model(DJANGO_ORG_PERSON).objects.all()
+        index = cls(max_block)
+        rows = people.values_list('id', 'last_name', 'first_name', 'middle_name').order_by()
+        for pk, last_name, first_name, middle_name in rows.iterator(chunk_size=chunk_size):
+            index.add(pk, last_name, first_name, middle_name)
+        return index
+
+    @staticmethod
+    def _score(a: _Names, b: _Names) -> float:
+        pairs = [(a.full, b.full)]
+        if not (a.has_middle and b.has_middle):
+            # A missing middle name is not a difference
+            pairs.append((a.last_first, b.last_first))
+        # Nor is the order of the names
+        pairs += [(' '.join(sorted(x.split())), ' '.join(sorted(y.split()))) for x, y in pairs]
+        return max(similarity(x, y) for x, y in pairs)
+
+    def match(self, last_name: str, first_name: str, middle_name: str = '',
+              threshold: float = THRESHOLD) -> List[Tuple[int, float]]:
+        """People matching a record, best first."""
+        names = self._names(last_name, first_name, middle_name)
+        candidates = {
+            pk for key in blocking_keys(last_name, first_name, middle_name)
+            for pk in self.blocks.get(key, ()) if len(self.blocks[key]) <= self.max_block
+        }
+        scored = [(pk, self._score(names, self.names[pk])) for pk in candidates]
+        return sorted([s for s in scored if s[1] >= threshold], key=lambda s: (-s[1], s[0]))
+
+    @instrument('dedup.duplicates')
+    def duplicates(self, threshold: float = THRESHOLD) -> List[Match]:
+        """Pairs of people scored within the blocks, each pair once: in the first block key they share."""
+        matches = []
+        for key, pks in self.blocks.items():
+            if len(pks) < 2 or len(pks) > self.max_block:
+                continue
+            for i, a in enumerate(pks):
+                for b in pks[i + 1:]:
+                    if key != min(k for k in self.keys[a] & self.keys[b] if len(self.blocks[k]) <= self.max_block):
+                        continue
+                    pair = (a, b) if a < b else (b, a)
+                    score = self._score(self.names[a], self.names[b])
+                    if score >= threshold:
+                        matches.append(Match(*pair, score))
+        return sorted(matches)
+
+
+def clusters(matches: Iterable[Match]) -> List[List[int]]:
+    """Groups of matching people by ids, the oldest person first."""
+    parent = {}
+
+    def find(pk):
+        parent.setdefault(pk, pk)
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    for a, b, _ in matches:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    groups = defaultdict(list)
+    for pk in parent:
+        groups[find(pk)].append(pk)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def _log_updates(model, using: str, lookup: str, pks: Iterable[int], chunk_size: int):
+    pks = sorted(pks)
+    for i in range(0, len(pks), chunk_size):
+        queryset = model.objects.using(using).filter(**{f'{lookup}__in': pks[i:i + chunk_size]})
+        if history.is_connected():
+            history.log_updates(queryset)
+        if outbox.is_connected():
+            outbox.publish_updates(queryset)
+
+
+@instrument('dedup.merge')
+def merge(groups: Iterable[Sequence[int]], using: Optional[str] = None, chunk_size: int = 500) -> Merged:
+    """Merge every group into its first person: employees and users are re-pointed, the rest deleted.
+
+    A person has at most one employee and one user, so a group with more than one of either is
+    skipped and returned in `Merged.skipped`, the other groups are merged.
+    """
+    Person = apps.get_model(DJANGO_ORG_PERSON)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+    using = using or router.db_for_write(Person)
+    groups = [tuple(group) for group in groups if len(group) > 1]
+    if not groups:
+        return Merged(0, 0, 0)
+
+    with transaction.atomic(using=using):
+        members = [pk for group in groups for pk in group]
+        employees, users = {}, {}
+        for i in range(0, len(members), chunk_size):
+            chunk = members[i:i + chunk_size]
+            employees.update(Employee.objects.using(using).filter(person_id__in=chunk).values_list('person_id', 'id'))
+            users.update(Person.objects.using(using).filter(pk__in=chunk, user__isnull=False).values_list(
+                'id', 'user_id'))
+
+        keeper, skipped = {}, []
+        for group in groups:
+            if sum(pk in employees for pk in group) > 1 or sum(pk in users for pk in group) > 1:
+                skipped.append(group)
+            else:
+                keeper.update((pk, group[0]) for pk in group[1:])
+
+        ids = list(keeper)
+        moved_employees = {pk: keeper[pk] for pk in employees if pk in keeper}
+        moved_users = {keeper[pk]: users[pk] for pk in users if pk in keeper}
+        items = list(moved_employees.items())
+        for i in range(0, len(items), chunk_size):
+            mapping = dict(items[i:i + chunk_size])
+            Employee.objects.using(using).filter(person_id__in=mapping).update(person_id=_case('person_id', mapping))
+        if moved_users:
+            # The user link is unique, it is released first
+            Person.objects.using(using).filter(user_id__in=moved_users.values()).update(user=None)
+            items = list(moved_users.items())
+            for i in range(0, len(items), chunk_size):
+                mapping = {user_id: pk for pk, user_id in items[i:i + chunk_size]}
+                Person.objects.using(using).filter(pk__in=mapping.values()).update(
+                    user_id=Case(*(When(pk=pk, then=Value(user_id)) for user_id, pk in mapping.items()),
+                                 output_field=Person._meta.get_field('user').target_field))
+
+        _log_updates(Employee, using, 'person_id', set(moved_employees.values()), chunk_size)
+        _log_updates(Person, using, 'pk', moved_users, chunk_size)
+        for i in range(0, len(ids), chunk_size):
+            Person.objects.using(using).filter(pk__in=ids[i:i + chunk_size]).delete()
+
+    if ids:
+        replicas.pin(using)
+    return Merged(len(ids), len(moved_employees), len(moved_users), tuple(skipped))
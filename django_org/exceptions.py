@@ -8,3 +8,35 @@ class IDMismatchError(OrgBaseException):
 
 class NaiveTimeSettingError(OrgBaseException):
     ...
+
+
+class CycleDayError(OrgBaseException):
+    ...
+
+
+class DayOffError(OrgBaseException):
+    ...
+
+
+class ShiftOverrideError(OrgBaseException):
+    ...
+
+
+class SnapshotError(OrgBaseException):
+    ...
+
+
+class ChangeLogError(OrgBaseException):
+    ...
+
+
+class DepartmentCycleError(OrgBaseException):
+    ...
+
+
+class ShardingError(OrgBaseException):
+    ...
+
+
+class SyntheticDataError(OrgBaseException):
+    ...
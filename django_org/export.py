@@ -0,0 +1,157 @@
+"""Streaming exports of the employee list (e.g. for payroll vendors) to CSV and JSON Lines.
+
+Rows are read with a chunked `iterator()` (a server-side cursor where the backend supports it)
+as plain values, department paths come from the department tree loaded once, so the memory
+does not grow with the number of employees.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from django.apps import apps
+from django.db import models
+
+from django_org.exceptions import DepartmentCycleError
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_DEPARTMENT, DJANGO_ORG_EMPLOYEE
+
+
+__all__ = (
+    'COLUMNS',
+    'FORMATS',
+    'department_paths',
+    'employee_rows',
+    'to_csv',
+    'to_jsonl',
+    'export',
+)
+
+
+CHUNK_SIZE = 5000
+
+COLUMNS = (
+    'employee_id',
+    'enterprise',
+    'department',
+    'post',
+    'last_name',
+    'first_name',
+    'middle_name',
+    'full_name',
+)
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/jsonl',
+}
+
+
+def department_paths(departments: models.QuerySet, separator: str = ' / ') -> Dict[int, str]:
+    """Paths of the departments from their roots.
+
+    The departments are read with a single query, their ancestors outside `departments` with one
+    query per level. Raises `DepartmentCycleError` if a department is its own ancestor.
+    """
+    rows = departments.values_list('id', 'parent_id', 'name').order_by()
+    nodes = {pk: (parent_id, name) for pk, parent_id, name in rows}
+    missing = {parent_id for parent_id, _ in nodes.values()} - set(nodes) - {None}
+    while missing:
+        rows = list(departments.model.objects.using(departments.db).filter(pk__in=missing).values_list(
+            'id', 'parent_id', 'name').order_by())
+        nodes.update((pk, (parent_id, name)) for pk, parent_id, name in rows)
+        missing = {parent_id for _, parent_id, _ in rows} - set(nodes) - {None}
+    paths = {}
+    for pk in nodes:
+        chain, seen, node = [], set(), pk
+        while node in nodes and node not in paths:
+            if node in seen:
+                raise DepartmentCycleError(f'Department {node} is its own ancestor')
+            chain.append(node)
+            seen.add(node)
+            node = nodes[node][0]
+        path = paths.get(node, '')
+        for node in reversed(chain):
+            path = f'{path}{separator}{nodes[node][1]}' if path else nodes[node][1]
+            paths[node] = path
+    return paths
+
+
+def employee_rows(
+        employees: Optional[models.QuerySet] = None,
+        enterprise: Union[models.Model, int, None] = None,
+        departments: Optional[models.QuerySet] = None,
+        chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple]:
+    """Rows of `COLUMNS`, of all the employees of the enterprise (of all the enterprises) by default.
+
+    The paths of `departments` (of the enterprise by default) are read before the rows are iterated,
+    so `DepartmentCycleError` is raised by the call itself.
+    """
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+    if employees is None:
+        employees = Employee.objects.all()
+    if departments is None:
+        departments = Department.objects.all()
+    enterprises = Enterprise.objects.all()
+    if enterprise is not None:
+        employees = employees.for_enterprise(enterprise)
+        departments = departments.for_enterprise(enterprise)
+        enterprises = enterprises.for_enterprise(enterprise)
+
+    paths = department_paths(departments)
+    names = dict(enterprises.values_list('id', 'name'))
+    rows = employees.values_list(
+        'id', 'enterprise_id', 'department_id', 'post__name',
+        'person__last_name', 'person__first_name', 'person__middle_name', 'person__full_name'
+    ).order_by('pk')
+    return _rows(rows, names, paths, chunk_size)
+
+
+def _rows(rows: models.QuerySet, names: Dict[int, str], paths: Dict[int, str], chunk_size: int) -> Iterator[Tuple]:
+    for pk, enterprise_id, department_id, *values in rows.iterator(chunk_size=chunk_size):
+        yield (pk, names.get(enterprise_id, ''), paths.get(department_id, ''), *values)
+
+
+def _chunked(rows: Iterable[Tuple], size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def to_csv(rows: Iterable[Tuple], header: bool = True, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """CSV text in pieces of `chunk_size` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(COLUMNS)
+    for chunk in _chunked(rows, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def to_jsonl(rows: Iterable[Tuple], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """JSON Lines text in pieces of `chunk_size` rows."""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for chunk in _chunked(rows, chunk_size):
+        yield ''.join(f'{dumps(dict(zip(COLUMNS, row)))}\n' for row in chunk)
+
+
+FORMATS = {
+    'csv': to_csv,
+    'jsonl': to_jsonl,
+}
+
+
+def export(rows: Iterable[Tuple], format: str = 'csv', chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    return FORMATS[format](rows, chunk_size=chunk_size)
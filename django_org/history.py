@@ -0,0 +1,272 @@
+"""Change log of the django_org models and point-in-time (as-of) state.
+
+With `DJANGO_ORG_CHANGE_LOG` every save and delete of the org models is appended to the change log.
+`take_snapshot` stores the state of an enterprise periodically, `state_as_of` restores a past
+state from the latest snapshot before that time plus the changes after it. Queryset `update()`,
+`bulk_create()` and raw SQL bypass the log, `log_updates` and `log_creates` record their rows.
+
+Ids of concurrent transactions may commit out of order, so a snapshot does not step over a gap in
+the ids until the entry after it is `DJANGO_ORG_CHANGE_LOG_LAG` seconds old (as the outbox relay
+does): a change committed later than that after its id was allocated is missed by the snapshots.
+"""
+
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from django_org import clock
+from django_org.exceptions import NaiveTimeSettingError
+from django_org.settings import (
+    DJANGO_ORG_CHANGE_LOG_LAG,
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_PERSON,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+    DJANGO_ORG_CHANGE_LOG_ENTRY,
+    DJANGO_ORG_CHANGE_LOG_SNAPSHOT
+)
+from django_org.sharding import shard_for
+
+
+__all__ = (
+    'OrgState',
+    'connect',
+    'disconnect',
+    'is_connected',
+    'log_creates',
+    'log_moves',
+    'log_updates',
+    'take_snapshot',
+    'state_as_of',
+)
+
+
+# The models of an enterprise state, people have no enterprise and are logged only
+ENTERPRISE_MODELS = (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+)
+LOGGED_MODELS = ENTERPRISE_MODELS + (DJANGO_ORG_PERSON,)
+
+Rows = Dict[str, Dict[int, dict]]
+
+_connected = False
+
+
+def _label(model: Union[str, type]) -> str:
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _enterprise_id(instance: models.Model) -> Optional[int]:
+    if isinstance(instance, apps.get_model(DJANGO_ORG_ENTERPRISE)):
+        return instance.pk
+    return getattr(instance, 'enterprise_id', None)
+
+
+def _data(instance: models.Model) -> dict:
+    """Concrete field values as they come back from the JSON column."""
+    data = {f.attname: getattr(instance, f.attname) for f in instance._meta.concrete_fields}
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def _on_save(sender, instance, created, raw=False, using=None, **kwargs):
+    ChangeLogEntry = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY)
+    ChangeLogEntry.objects.using(using).create(
+        enterprise_id=_enterprise_id(instance),
+        model=sender._meta.label,
+        object_id=instance.pk,
+        action=ChangeLogEntry.Action.CREATE if created else ChangeLogEntry.Action.UPDATE,
+        data=_data(instance),
+    )
+
+
+def _on_delete(sender, instance, using=None, **kwargs):
+    ChangeLogEntry = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY)
+    ChangeLogEntry.objects.using(using).create(
+        enterprise_id=_enterprise_id(instance),
+        model=sender._meta.label,
+        object_id=instance.pk,
+        action=ChangeLogEntry.Action.DELETE,
+    )
+
+
+def _log_rows(queryset: models.QuerySet, action: int, enterprise_id: Optional[int] = None):
+    ChangeLogEntry = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY)
+    delete = action == ChangeLogEntry.Action.DELETE
+    ChangeLogEntry.objects.using(queryset.db).bulk_create([
+        ChangeLogEntry(
+            enterprise_id=enterprise_id if delete else _enterprise_id(instance),
+            model=queryset.model._meta.label,
+            object_id=instance.pk,
+            action=action,
+            data=None if delete else _data(instance),
+        )
+        for instance in queryset.order_by('pk')
+    ])
+
+
+def log_updates(queryset: models.QuerySet):
+    """Log the current rows of a queryset as updated, for changes made with `update()`."""
+    _log_rows(queryset, apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY).Action.UPDATE)
+
+
+def log_creates(queryset: models.QuerySet):
+    """Log the rows of a queryset as created, for rows inserted with `bulk_create()`."""
+    _log_rows(queryset, apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY).Action.CREATE)
+
+
+def log_moves(queryset: models.QuerySet, enterprise_id: int):
+    """Log the rows of a queryset as deleted from `enterprise_id`, for rows moved to another enterprise."""
+    _log_rows(queryset, apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY).Action.DELETE, enterprise_id)
+
+
+def connect():
+    global _connected
+    _connected = True
+    for label in LOGGED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'django_org_log_save_{label}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'django_org_log_delete_{label}')
+
+
+def disconnect():
+    global _connected
+    _connected = False
+    for label in LOGGED_MODELS:
+        model = apps.get_model(label)
+        post_save.disconnect(sender=model, dispatch_uid=f'django_org_log_save_{label}')
+        post_delete.disconnect(sender=model, dispatch_uid=f'django_org_log_delete_{label}')
+
+
+def is_connected() -> bool:
+    return _connected
+
+
+def _instance(model, data: dict) -> models.Model:
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    return model(**{k: fields[k].to_python(v) for k, v in data.items() if k in fields})
+
+
+class OrgState:
+    """Rows of the enterprise models at a point in time."""
+
+    def __init__(self, rows: Rows, when: Optional[datetime] = None):
+        self._rows = rows
+        self.when = when
+
+    def rows(self, model: Union[str, type]) -> Dict[int, dict]:
+        return self._rows.get(_label(model), {})
+
+    def objects(self, model: Union[str, type]) -> List[models.Model]:
+        """Unsaved instances built from the rows, ordered by id."""
+        model = apps.get_model(_label(model))
+        return [_instance(model, data) for _, data in sorted(self.rows(model).items())]
+
+    def get(self, model: Union[str, type], pk: int) -> Optional[models.Model]:
+        data = self.rows(model).get(pk)
+        return _instance(apps.get_model(_label(model)), data) if data is not None else None
+
+
+def _apply(rows: Rows, changes: Iterable[Tuple[str, int, int, Optional[dict]]]):
+    delete = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY).Action.DELETE
+    for label, object_id, action, data in changes:
+        if action == delete:
+            rows[label].pop(object_id, None)
+        else:
+            rows[label][object_id] = data
+
+
+def _load(snapshot: Optional[models.Model]) -> Rows:
+    rows = defaultdict(dict)
+    if snapshot is not None:
+        for label, objects in snapshot.data.items():
+            rows[label] = {int(pk): data for pk, data in objects.items()}
+    return rows
+
+
+def _changes(enterprise: Union[models.Model, int], since: int):
+    ChangeLogEntry = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY)
+    return ChangeLogEntry.objects.for_enterprise(enterprise).filter(id__gt=since).order_by('id')
+
+
+def _settled(using: str, since: int) -> int:
+    """The last log id after `since` with no gap below it that a running transaction may still fill."""
+    ChangeLogEntry = apps.get_model(DJANGO_ORG_CHANGE_LOG_ENTRY)
+    horizon = clock.now() - timedelta(seconds=DJANGO_ORG_CHANGE_LOG_LAG)
+    position = since
+    entries = ChangeLogEntry.objects.using(using).filter(id__gt=since).order_by('id').values_list('id', 'changed_at')
+    for pk, changed_at in entries.iterator():
+        if pk != position + 1 and changed_at > horizon:
+            break
+        position = pk
+    return position
+
+
+def take_snapshot(enterprise: models.Model, now: Optional[datetime] = None) -> models.Model:
+    """Store the current state of the enterprise.
+
+    The first snapshot is read from the tables, the next ones from the previous snapshot and
+    the change log. Returns the latest snapshot if nothing has changed since it.
+    """
+    ChangeLogSnapshot = apps.get_model(DJANGO_ORG_CHANGE_LOG_SNAPSHOT)
+    now = now or clock.now()
+    using = router.db_for_write(ChangeLogSnapshot, shard=shard_for(enterprise))
+    latest = ChangeLogSnapshot.objects.for_enterprise(enterprise).order_by('-last_change_id').first()
+    if latest is None:
+        # The log position is read first: a change committed while the tables are read is then
+        # also replayed after the snapshot, which is harmless as an entry holds the whole row.
+        # The positions of the other snapshots are settled, the log is scanned from the latest.
+        with transaction.atomic(using=using):
+            since = ChangeLogSnapshot.objects.using(using).aggregate(last=Max('last_change_id'))['last'] or 0
+            last_change_id = _settled(using, since)
+            rows = defaultdict(dict)
+            for label in ENTERPRISE_MODELS:
+                for obj in apps.get_model(label).objects.for_enterprise(enterprise).order_by():
+                    rows[label][obj.pk] = _data(obj)
+    else:
+        settled = _settled(using, latest.last_change_id)
+        changes = list(_changes(enterprise, latest.last_change_id).using(using).filter(id__lte=settled).values_list(
+            'id', 'changed_at', 'model', 'object_id', 'action', 'data'))
+        if not changes:
+            return latest
+        last_change_id, now = changes[-1][:2]
+        rows = _load(latest)
+        _apply(rows, (change[2:] for change in changes))
+
+    return ChangeLogSnapshot.objects.create(
+        enterprise=enterprise, taken_at=now, last_change_id=last_change_id, data=rows)
+
+
+def state_as_of(enterprise: Union[models.Model, int], when: datetime) -> OrgState:
+    """State of the enterprise at `when`: the latest snapshot before it plus the changes after the snapshot."""
+    ChangeLogSnapshot = apps.get_model(DJANGO_ORG_CHANGE_LOG_SNAPSHOT)
+    if timezone.is_naive(when):
+        raise NaiveTimeSettingError('The time must be specified with a time zone')
+
+    snapshot = ChangeLogSnapshot.objects.for_enterprise(enterprise).filter(
+        taken_at__lte=when).order_by('-taken_at', '-last_change_id').first()
+    rows = _load(snapshot)
+    changes = _changes(enterprise, snapshot.last_change_id if snapshot else 0).filter(changed_at__lte=when)
+    _apply(rows, changes.values_list('model', 'object_id', 'action', 'data'))
+    return OrgState(rows, when)
@@ -0,0 +1,124 @@
+"""Identity map of the django_org reference models for a request or a task.
+
+Inside `identity_map()` (or `IdentityMapMiddleware` for a request) the foreign keys of the
+django_org models to enterprises, posts, work modes, department types and departments resolve
+through a map of the rows already fetched in the block, so each row is queried at most once
+however many objects refer to it. Outside the block the foreign keys work as usual.
+
+A saved or deleted reference row is dropped from the map and read again when it is needed next;
+queryset `update()` sends no signals and leaves the mapped row stale until the block ends.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+from django.db.models.signals import post_delete, post_save
+
+from django_org.replicas import primary_of
+from django_org.settings import (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT
+)
+from django_org.sharding import _org_models
+
+
+__all__ = (
+    'IdentityMapMiddleware',
+    'identity_map',
+    'install',
+    'is_active',
+    'remember',
+)
+
+
+REFERENCE_MODELS = (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+)
+
+Key = Tuple[type, Optional[str], object]
+
+_map: ContextVar[Optional[Dict[Key, models.Model]]] = ContextVar('django_org_identity_map', default=None)
+
+
+def _key(model, db: Optional[str], pk) -> Key:
+    # A replica and its primary hold the same rows, shards do not
+    return model, primary_of(db), pk
+
+
+def is_active() -> bool:
+    return _map.get() is not None
+
+
+def remember(*objs: models.Model):
+    """Put already loaded objects to the current identity map, if any."""
+    rows = _map.get()
+    if rows is not None:
+        for obj in objs:
+            rows[_key(obj.__class__, obj._state.db, obj.pk)] = obj
+
+
+def _evict(sender, instance, using=None, **kwargs):
+    rows = _map.get()
+    if rows is not None:
+        rows.pop(_key(sender, using, instance.pk), None)
+
+
+@contextmanager
+def identity_map():
+    """Share the reference rows inside the block, a nested block uses the outer map."""
+    if _map.get() is not None:
+        yield
+        return
+
+    token = _map.set({})
+    try:
+        yield
+    finally:
+        _map.reset(token)
+
+
+class IdentityMapDescriptor(ForwardManyToOneDescriptor):
+    def get_object(self, instance):
+        rows = _map.get()
+        if rows is None:
+            return super().get_object(instance)
+
+        key = _key(self.field.related_model, instance._state.db, getattr(instance, self.field.attname))
+        obj = rows.get(key)
+        if obj is None:
+            obj = rows[key] = super().get_object(instance)
+        return obj
+
+
+def install():
+    """Resolve the foreign keys of the django_org models to the reference models through the map."""
+    references = {apps.get_model(label) for label in REFERENCE_MODELS}
+    for label in REFERENCE_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_evict, sender=model, dispatch_uid=f'django_org_identity_map_save_{label}')
+        post_delete.connect(_evict, sender=model, dispatch_uid=f'django_org_identity_map_delete_{label}')
+    for model in _org_models():
+        for field in model._meta.concrete_fields:
+            if (field.many_to_one and field.related_model in references
+                    and type(model.__dict__.get(field.name)) is ForwardManyToOneDescriptor):
+                setattr(model, field.name, IdentityMapDescriptor(field))
+
+
+class IdentityMapMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map():
+            return self.get_response(request)
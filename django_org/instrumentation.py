@@ -0,0 +1,127 @@
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from django_org.settings import DJANGO_ORG_METRICS
+from django_org.signals import measured
+
+
+__all__ = (
+    'Metrics',
+    'Collector',
+    'instrument',
+    'enable',
+    'disable',
+    'is_enabled',
+    'cache_hit',
+    'cache_miss',
+)
+
+
+PREFIX = 'django_org'
+
+
+class Metrics:
+    """StatsD-like sink. Subclass it to forward to StatsD, Prometheus, etc."""
+
+    def timing(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
+        ...
+
+    def incr(self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None):
+        ...
+
+
+class Collector(Metrics):
+    """In-process sink, mostly for tests."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.counters = Counter()
+
+    def timing(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
+        self.timings[name].append(value)
+
+    def incr(self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None):
+        self.counters[name] += value
+
+    def clear(self):
+        self.timings.clear()
+        self.counters.clear()
+
+
+_metrics: Optional[Metrics] = None
+
+
+def enable(metrics: Optional[Metrics] = None) -> Metrics:
+    global _metrics
+    _metrics = metrics or import_string(DJANGO_ORG_METRICS)()
+    return _metrics
+
+
+def disable():
+    global _metrics
+    _metrics = None
+
+
+def is_enabled() -> bool:
+    return _metrics is not None
+
+
+def cache_hit(name: str):
+    if _metrics is not None:
+        _metrics.incr(f'{PREFIX}.{name}.cache_hit')
+
+
+def cache_miss(name: str):
+    if _metrics is not None:
+        _metrics.incr(f'{PREFIX}.{name}.cache_miss')
+
+
+class _QueryCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _measure(metrics: Metrics, name: str, func: Callable, args, kwargs):
+    counter = _QueryCounter()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(counter))
+        started = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = perf_counter() - started
+            metrics.timing(f'{PREFIX}.{name}.duration', duration * 1000)
+            metrics.incr(f'{PREFIX}.{name}.calls')
+            metrics.incr(f'{PREFIX}.{name}.queries', counter.count)
+            measured.send(sender=func, name=name, duration=duration, queries=counter.count)
+
+
+def instrument(name: str) -> Callable:
+    """Measure duration and query count (inclusive of nested calls) while instrumentation is enabled.
+
+    When disabled the wrapper costs one global lookup.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _metrics
+            if metrics is None:
+                return func(*args, **kwargs)
+            return _measure(metrics, name, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,144 @@
+from datetime import date
+from typing import Iterable, List, Optional, Tuple, Union
+
+from django.apps import apps
+from django.db import models
+
+from django_org.schedule import Occurrence, ShiftTable
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_MODE
+from django_org.utils import Instant, _datetime, _epoch
+
+
+__all__ = (
+    'IntervalIndex',
+)
+
+
+# center, intervals containing the center by start ascending and by end descending, left, right
+_Node = Tuple[int, List[Occurrence], List[Occurrence], Optional[tuple], Optional[tuple]]
+
+
+def _build(occurrences: List[Occurrence]) -> Optional[_Node]:
+    if not occurrences:
+        return None
+
+    endpoints = sorted(o.start for o in occurrences)
+    center = endpoints[len(endpoints) // 2]
+    left, right, here = [], [], []
+    for o in occurrences:
+        if o.end <= center:
+            left.append(o)
+        elif o.start > center:
+            right.append(o)
+        else:
+            here.append(o)
+    return (
+        center,
+        sorted(here, key=lambda o: o.start),
+        sorted(here, key=lambda o: o.end, reverse=True),
+        _build(left),
+        _build(right),
+    )
+
+
+class IntervalIndex:
+    """Static interval tree over shift occurrences (`[start, end)` in epoch seconds).
+
+    Stabbing and overlap queries take O(log n + k). The index is picklable, so it can be kept
+    in a cache and shared between requests.
+    """
+
+    __slots__ = ('start', 'end', '_root', '_size')
+
+    def __init__(self, occurrences: Iterable[Occurrence], start: Optional[Instant] = None,
+                 end: Optional[Instant] = None):
+        occurrences = [o for o in occurrences if o.start < o.end]
+        self.start = _epoch(start) if start is not None else min((o.start for o in occurrences), default=None)
+        self.end = _epoch(end) if end is not None else max((o.end for o in occurrences), default=None)
+        self._size = len(occurrences)
+        self._root = _build(occurrences)
+
+    def __len__(self):
+        return self._size
+
+    def __getstate__(self):
+        return self.start, self.end, self._root, self._size
+
+    def __setstate__(self, state):
+        self.start, self.end, self._root, self._size = state
+
+    @classmethod
+    def for_enterprise(cls, enterprise: Union[models.Model, int], start: date, end: date) -> 'IntervalIndex':
+        """Occurrences of all the work modes of the enterprise overlapping the days [start, end)."""
+        from django_org import cache
+
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+        if cache.is_enabled():
+            tables = cache.shift_tables(enterprise)
+        else:
+            tables = ShiftTable.for_work_modes(WorkMode.objects.for_enterprise(enterprise).select_related('enterprise'))
+        if not isinstance(enterprise, models.Model):
+            enterprise = Enterprise.objects.for_enterprise(enterprise).get()
+
+        start, end = _datetime(start, tzinfo=enterprise.tz), _datetime(end, tzinfo=enterprise.tz)
+        return cls((o for table in tables.values() for o in table.occurrences(start, end)), start, end)
+
+    def covers(self, start: Instant, end: Instant) -> bool:
+        """Whether [start, end) is within the horizon the index was built for."""
+        return self.start is not None and self.start <= _epoch(start) and _epoch(end) <= self.end
+
+    def at(self, t: Instant) -> List[Occurrence]:
+        """Occurrences containing `t`, ordered by start."""
+        t = _epoch(t)
+        result = []
+        node = self._root
+        while node is not None:
+            center, by_start, by_end, left, right = node
+            if t < center:
+                for o in by_start:
+                    if o.start > t:
+                        break
+                    result.append(o)
+                node = left
+            elif t > center:
+                for o in by_end:
+                    if o.end <= t:
+                        break
+                    result.append(o)
+                node = right
+            else:
+                result.extend(by_start)
+                break
+        return sorted(result)
+
+    def overlapping(self, start: Instant, end: Instant) -> List[Occurrence]:
+        """Occurrences overlapping [start, end), ordered by start."""
+        a, b = _epoch(start), _epoch(end)
+        result = []
+        if a >= b:
+            return result
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if b <= center:
+                for o in by_start:
+                    if o.start >= b:
+                        break
+                    result.append(o)
+                stack.append(left)
+            elif a > center:
+                for o in by_end:
+                    if o.end <= a:
+                        break
+                    result.append(o)
+                stack.append(right)
+            else:
+                result.extend(by_start)
+                stack.append(left)
+                stack.append(right)
+        return sorted(result)
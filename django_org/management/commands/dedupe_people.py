@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from django_org import dedup
+
+
+class Command(BaseCommand):
+    help = 'Find duplicate people by blocked name matching and optionally merge them into the oldest record.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=dedup.THRESHOLD, help='Minimal trigram similarity')
+        parser.add_argument('--max-block', type=int, default=1000, help='Larger blocks are skipped as too common')
+        parser.add_argument('--merge', action='store_true', help='Merge the groups, only report them by default')
+
+    def handle(self, *args, **options):
+        index = dedup.PersonIndex.build(max_block=options['max_block'])
+        groups = dedup.clusters(index.duplicates(options['threshold']))
+        for group in groups:
+            self.stdout.write(' '.join(map(str, group)))
+        self.stdout.write(f'{len(groups)} groups of duplicates among {len(index.names)} people')
+
+        if options['merge'] and groups:
+            merged = dedup.merge(groups)
+            for group in merged.skipped:
+                self.stderr.write(f'Skipped {" ".join(map(str, group))}: more than one employee or user')
+            self.stdout.write(f'Merged {merged.people} people, re-pointed {merged.employees} employees '
+                              f'and {merged.users} users')
@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_org import export
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+
+
+class Command(BaseCommand):
+    help = 'Stream the employees with their names, post, department path and enterprise to CSV or JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('enterprise', nargs='?', help='Enterprise id or name, all by default')
+        parser.add_argument('-f', '--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('-o', '--output', help='Output file, stdout by default')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        enterprise = None
+        if key := options['enterprise']:
+            lookup = {'pk': int(key)} if key.isdigit() else {'name': key}
+            try:
+                enterprise = Enterprise.objects.get(**lookup)
+            except Enterprise.DoesNotExist:
+                raise CommandError(f'Enterprise "{key}" does not exist')
+
+        rows = export.employee_rows(enterprise=enterprise, chunk_size=options['chunk_size'])
+        chunks = export.export(rows, options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+                stream.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,32 @@
+import sys
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_org import snapshot
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+
+
+class Command(BaseCommand):
+    help = 'Export an enterprise with its org structure, work modes and staff to a binary snapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('enterprise', help='Enterprise id or name')
+        parser.add_argument('-o', '--output', help='Output file, stdout by default')
+        parser.add_argument('--chunk-size', type=int, default=snapshot.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        key = options['enterprise']
+        lookup = {'pk': int(key)} if key.isdigit() else {'name': key}
+        try:
+            enterprise = Enterprise.objects.get(**lookup)
+        except Enterprise.DoesNotExist:
+            raise CommandError(f'Enterprise "{key}" does not exist')
+
+        if options['output']:
+            with open(options['output'], 'wb') as stream:
+                total = snapshot.dump(enterprise, stream, chunk_size=options['chunk_size'])
+        else:
+            total = snapshot.dump(enterprise, sys.stdout.buffer, chunk_size=options['chunk_size'])
+        self.stderr.write(f'Exported {total} rows')
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_org import synthetic
+from django_org.exceptions import SyntheticDataError
+
+
+class Command(BaseCommand):
+    help = 'Generate deterministic synthetic enterprises, departments, work modes and staff for load testing.'
+
+    def add_arguments(self, parser):
+        shape = synthetic.PRODUCTION
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='Synthetic',
+                            help='Enterprise names are <prefix><seed>-<n>, change it to generate more data')
+        parser.add_argument('--enterprises', type=int, default=shape.enterprises)
+        parser.add_argument('--departments', type=int, default=shape.departments, help='Per enterprise')
+        parser.add_argument('--depth', type=int, default=shape.depth, help='Depth of the department trees')
+        parser.add_argument('--people', type=int, default=shape.people, help='Per enterprise')
+        parser.add_argument('--work-modes', type=int, default=shape.work_modes, help='Per enterprise')
+        parser.add_argument('--posts', type=int, default=shape.posts, help='Per enterprise')
+        parser.add_argument('--overnight', type=float, default=shape.overnight,
+                            help='Share of the work modes with overnight shifts')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', help='Database alias, routed by default')
+
+    def handle(self, *args, **options):
+        shape = synthetic.Shape(**{
+            name: options[name] for name in synthetic.Shape._fields if options.get(name) is not None
+        })
+        started = time.perf_counter()
+        try:
+            counts = synthetic.generate(shape, seed=options['seed'], using=options['database'],
+                                        batch_size=options['batch_size'], prefix=options['prefix'])
+        except SyntheticDataError as e:
+            raise CommandError(str(e))
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(f'Generated in {time.perf_counter() - started:.1f}s')
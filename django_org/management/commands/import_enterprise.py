@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django_org import snapshot
+from django_org.exceptions import SnapshotError
+
+
+class Command(BaseCommand):
+    help = 'Import an enterprise snapshot made by export_enterprise, primary keys are kept.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Snapshot file, "-" for stdin')
+        parser.add_argument('--database', help='Database alias, the shard of the enterprise by default')
+        parser.add_argument('--batch-size', type=int, default=snapshot.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            if options['input'] == '-':
+                total = snapshot.load(sys.stdin.buffer, using=options['database'], batch_size=options['batch_size'])
+            else:
+                with open(options['input'], 'rb') as stream:
+                    total = snapshot.load(stream, using=options['database'], batch_size=options['batch_size'])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'Imported {total} rows')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from django_org import outbox
+from django_org.sharding import shards
+
+
+class Command(BaseCommand):
+    help = 'Deliver the django_org outbox to a sink: a JSON Lines file or a callable.'
+
+    def add_arguments(self, parser):
+        sink = parser.add_mutually_exclusive_group(required=True)
+        sink.add_argument('--file', help='Append the messages to a JSON Lines file')
+        sink.add_argument('--sink', help='Dotted path of a callable taking a list of messages, or of its class')
+        parser.add_argument('--database', help='Database alias, every shard by default')
+        parser.add_argument('--consumer', default='default', help='The name the offset is stored under')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=float, default=1.0, help='Poll interval, sec.')
+        parser.add_argument('--once', action='store_true', help='Exit when the outbox is drained')
+        parser.add_argument('--purge', action='store_true', help='Delete the messages delivered to all the consumers')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            sink = outbox.FileSink(options['file'])
+        else:
+            try:
+                sink = import_string(options['sink'])
+            except ImportError as e:
+                raise CommandError(str(e))
+            if isinstance(sink, type):
+                sink = sink()
+
+        databases = [options['database']] if options['database'] else shards()
+        if len(databases) > 1 and not options['once']:
+            raise CommandError('Run a relay per shard with --database, or use --once')
+
+        for db in databases:
+            relay = outbox.Relay(sink, consumer=options['consumer'], using=db, batch_size=options['batch_size'])
+            delivered = relay.run(interval=options['interval'], once=options['once'])
+            self.stdout.write(f'{relay.using}: delivered {delivered} messages')
+            if options['purge']:
+                self.stdout.write(f'{relay.using}: purged {outbox.purge(relay.using)} messages')
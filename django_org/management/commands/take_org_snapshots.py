@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from django_org import history
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+
+
+class Command(BaseCommand):
+    help = 'Store the change log snapshots of the enterprises, run it periodically to keep as-of queries fast.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('enterprises', nargs='*', type=int, help='Enterprise ids, all by default')
+
+    def handle(self, *args, **options):
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        for qs in Enterprise.objects.order_by('pk').on_shards():
+            if options['enterprises']:
+                qs = qs.filter(pk__in=options['enterprises'])
+            for enterprise in qs:
+                snapshot = history.take_snapshot(enterprise)
+                self.stdout.write(f'{enterprise}: change {snapshot.last_change_id} at {snapshot.taken_at:%Y-%m-%d %H:%M:%S}')
@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_org import cache
+from django_org.settings import DJANGO_ORG_ENTERPRISE
+
+
+class Command(BaseCommand):
+    help = 'Preload the django_org cache: shift tables, enterprise time zones and department trees.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('enterprises', nargs='*', type=int, help='Enterprise ids, all by default')
+        parser.add_argument('--concurrency', type=int, default=4, help='Enterprises loaded at a time')
+
+    def handle(self, *args, **options):
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        if not cache.is_enabled():
+            raise CommandError('The cache is disabled, set DJANGO_ORG_CACHE')
+
+        enterprises = None
+        if options['enterprises']:
+            enterprises = [e for qs in Enterprise.objects.filter(pk__in=options['enterprises']).on_shards() for e in qs]
+        self.stdout.write(str(cache.warm(enterprises, concurrency=options['concurrency'])))
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.13 on 2026-10-19 00:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkModeAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_from', models.DateField(verbose_name='Effective from')),
+                ('date_to', models.DateField(blank=True, null=True, verbose_name='Effective to')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='work_mode_assignments', to='django_org.employee', verbose_name='Employee')),
+                ('enterprise', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, to='django_org.enterprise', verbose_name='Enterprise')),
+                ('work_mode', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='assignments', to='django_org.workmode', verbose_name='Work mode')),
+            ],
+            options={
+                'verbose_name': 'Work mode assignment',
+                'verbose_name_plural': 'Work mode assignments',
+                'ordering': ('employee', 'date_from'),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='workmodeassignment',
+            index=models.Index(fields=['enterprise', 'date_from', 'date_to'], name='workmodeassignment_ent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workmodeassignment',
+            index=models.Index(fields=['work_mode', 'date_from'], name='workmodeassignment_wm_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='workmodeassignment',
+            unique_together={('employee', 'date_from')},
+        ),
+    ]
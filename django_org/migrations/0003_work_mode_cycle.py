@@ -0,0 +1,30 @@
+# Generated by Django 4.1.13 on 2026-10-19 00:57
+
+import datetime
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0002_work_mode_assignment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workmode',
+            name='cycle_length',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Cycle length, days'),
+        ),
+        migrations.AddField(
+            model_name='workmode',
+            name='cycle_start',
+            field=models.DateField(default=datetime.date(1970, 1, 1), verbose_name='Cycle start'),
+        ),
+        migrations.AddField(
+            model_name='workshift',
+            name='day',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Cycle day'),
+        ),
+    ]
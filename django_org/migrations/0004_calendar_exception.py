@@ -0,0 +1,37 @@
+# Generated by Django 4.1.13 on 2026-10-19 00:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0003_work_mode_cycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Shift day')),
+                ('name', models.CharField(blank=True, default='', max_length=64, verbose_name='Name')),
+                ('start', models.PositiveIntegerField(blank=True, null=True, verbose_name='Shift start indent, sec.')),
+                ('end', models.PositiveIntegerField(blank=True, null=True, verbose_name='Shift end indent, sec.')),
+                ('enterprise', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='django_org.enterprise', verbose_name='Enterprise')),
+                ('work_mode', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='django_org.workmode', verbose_name='Work mode')),
+                ('work_shift', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='django_org.workshift', verbose_name='Work shift')),
+            ],
+            options={
+                'verbose_name': 'Calendar exception',
+                'verbose_name_plural': 'Calendar exceptions',
+                'ordering': ('enterprise', 'day'),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='calendarexception',
+            index=models.Index(fields=['enterprise', 'day'], name='calendarexception_day_idx'),
+        ),
+    ]
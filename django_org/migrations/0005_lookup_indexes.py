@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-19 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0004_calendar_exception'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['enterprise', 'parent'], name='django_org__enterpr_4c79b4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department', 'post'], name='django_org__departm_af171a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['last_name', 'middle_name', 'first_name'], name='django_org__last_na_be5afb_idx'),
+        ),
+    ]
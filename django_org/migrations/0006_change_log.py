@@ -0,0 +1,62 @@
+# Generated by Django 4.1.13 on 2026-10-19 01:17
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django_org.clock
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0005_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(verbose_name='Taken at')),
+                ('last_change_id', models.BigIntegerField(default=0, verbose_name='Last change')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Data')),
+                ('enterprise', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='django_org.enterprise', verbose_name='Enterprise')),
+            ],
+            options={
+                'verbose_name': 'Change log snapshot',
+                'verbose_name_plural': 'Change log snapshots',
+                'ordering': ('enterprise', '-taken_at'),
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed_at', models.DateTimeField(default=django_org.clock.now, editable=False, verbose_name='Changed at')),
+                ('model', models.CharField(editable=False, max_length=100, verbose_name='Model')),
+                ('object_id', models.BigIntegerField(editable=False, verbose_name='Object id')),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Create'), (2, 'Update'), (3, 'Delete')], editable=False, verbose_name='Action')),
+                ('data', models.JSONField(editable=False, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Data')),
+                ('enterprise', models.ForeignKey(db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='django_org.enterprise', verbose_name='Enterprise')),
+            ],
+            options={
+                'verbose_name': 'Change log entry',
+                'verbose_name_plural': 'Change log',
+                'ordering': ('id',),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogsnapshot',
+            index=models.Index(fields=['enterprise', 'taken_at'], name='changelogsnapshot_ent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['enterprise', 'id'], name='changelogentry_ent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['model', 'object_id'], name='changelogentry_obj_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-19 01:37
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django_org.clock
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_org', '0006_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxOffset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=64, unique=True, verbose_name='Consumer')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Position')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+            options={
+                'verbose_name': 'Outbox offset',
+                'verbose_name_plural': 'Outbox offsets',
+                'ordering': ('consumer',),
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django_org.clock.now, editable=False, verbose_name='Created at')),
+                ('model', models.CharField(editable=False, max_length=100, verbose_name='Model')),
+                ('object_id', models.BigIntegerField(editable=False, verbose_name='Object id')),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Create'), (2, 'Update'), (3, 'Delete')], editable=False, verbose_name='Action')),
+                ('data', models.JSONField(editable=False, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Data')),
+                ('enterprise', models.ForeignKey(db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='django_org.enterprise', verbose_name='Enterprise')),
+            ],
+            options={
+                'verbose_name': 'Outbox message',
+                'verbose_name_plural': 'Outbox',
+                'ordering': ('id',),
+                'abstract': False,
+            },
+        ),
+    ]
@@ -10,7 +10,13 @@ from .settings import (
     DJANGO_ORG_DEPARTMENT_TYPE,
     DJANGO_ORG_DEPARTMENT,
     DJANGO_ORG_PERSON,
-    DJANGO_ORG_EMPLOYEE
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+    DJANGO_ORG_CHANGE_LOG_ENTRY,
+    DJANGO_ORG_CHANGE_LOG_SNAPSHOT,
+    DJANGO_ORG_OUTBOX_MESSAGE,
+    DJANGO_ORG_OUTBOX_OFFSET
 )
 
 
@@ -79,3 +85,51 @@ if DJANGO_ORG_EMPLOYEE == f'{DEFAULT_APP_NAME}.Employee':
 
 
     __all__.append('Employee')
+
+
+if DJANGO_ORG_WORK_MODE_ASSIGNMENT == f'{DEFAULT_APP_NAME}.WorkModeAssignment':
+    class WorkModeAssignment(org_models.roster.AbstractWorkModeAssignment):
+        ...
+
+
+    __all__.append('WorkModeAssignment')
+
+
+if DJANGO_ORG_CALENDAR_EXCEPTION == f'{DEFAULT_APP_NAME}.CalendarException':
+    class CalendarException(org_models.calendar.AbstractCalendarException):
+        ...
+
+
+    __all__.append('CalendarException')
+
+
+if DJANGO_ORG_CHANGE_LOG_ENTRY == f'{DEFAULT_APP_NAME}.ChangeLogEntry':
+    class ChangeLogEntry(org_models.history.AbstractChangeLogEntry):
+        ...
+
+
+    __all__.append('ChangeLogEntry')
+
+
+if DJANGO_ORG_CHANGE_LOG_SNAPSHOT == f'{DEFAULT_APP_NAME}.ChangeLogSnapshot':
+    class ChangeLogSnapshot(org_models.history.AbstractChangeLogSnapshot):
+        ...
+
+
+    __all__.append('ChangeLogSnapshot')
+
+
+if DJANGO_ORG_OUTBOX_MESSAGE == f'{DEFAULT_APP_NAME}.OutboxMessage':
+    class OutboxMessage(org_models.outbox.AbstractOutboxMessage):
+        ...
+
+
+    __all__.append('OutboxMessage')
+
+
+if DJANGO_ORG_OUTBOX_OFFSET == f'{DEFAULT_APP_NAME}.OutboxOffset':
+    class OutboxOffset(org_models.outbox.AbstractOutboxOffset):
+        ...
+
+
+    __all__.append('OutboxOffset')
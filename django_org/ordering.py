@@ -0,0 +1,68 @@
+from django.db.models import QuerySet
+
+
+__all__ = (
+    'DISPLAY_ORDERING',
+    'JOIN_FREE_ORDERING',
+    'ORDERING',
+    'display_order',
+    'join_free_order',
+)
+
+
+# Human friendly orderings, they join the related tables to sort by names
+DISPLAY_ORDERING = {
+    'AbstractEnterprise': ('name',),
+    'AbstractPost': ('enterprise', 'name'),
+    'AbstractWorkMode': ('enterprise', 'name'),
+    'AbstractWorkShift': ('enterprise__name', 'work_mode__name', 'number'),
+    'AbstractDepartmentType': ('enterprise', 'name'),
+    'AbstractDepartment': ('enterprise__name', 'parent__name', 'department_type__name', 'name'),
+    'AbstractPerson': ('last_name', 'middle_name', 'first_name'),
+    'AbstractEmployee': ('enterprise', 'department', 'post', 'person'),
+    'AbstractWorkModeAssignment': ('employee', 'date_from'),
+    'AbstractCalendarException': ('enterprise', 'day'),
+    'AbstractChangeLogEntry': ('id',),
+    'AbstractChangeLogSnapshot': ('enterprise', '-taken_at'),
+    'AbstractOutboxMessage': ('id',),
+    'AbstractOutboxOffset': ('consumer',),
+}
+
+# Orderings by the model's own columns, backed by its unique constraints and indexes
+JOIN_FREE_ORDERING = {
+    'AbstractEnterprise': ('name',),
+    'AbstractPost': ('enterprise_id', 'name'),
+    'AbstractWorkMode': ('enterprise_id', 'name'),
+    'AbstractWorkShift': ('work_mode_id', 'number'),
+    'AbstractDepartmentType': ('enterprise_id', 'name'),
+    'AbstractDepartment': ('enterprise_id', 'parent_id', 'id'),
+    'AbstractPerson': ('last_name', 'middle_name', 'first_name'),
+    'AbstractEmployee': ('enterprise_id', 'department_id', 'post_id', 'person_id'),
+    'AbstractWorkModeAssignment': ('employee_id', 'date_from'),
+    'AbstractCalendarException': ('enterprise_id', 'day'),
+    'AbstractChangeLogEntry': ('id',),
+    'AbstractChangeLogSnapshot': ('enterprise_id', '-taken_at'),
+    'AbstractOutboxMessage': ('id',),
+    'AbstractOutboxOffset': ('consumer',),
+}
+
+# `Meta.ordering` of the abstract models, independent of the settings as it is a part of the migrations.
+# `DJANGO_ORG_JOIN_FREE_ORDERING` is applied by `EnterpriseManager`
+ORDERING = DISPLAY_ORDERING
+
+
+def _ordering(orderings, queryset: QuerySet) -> QuerySet:
+    for cls in queryset.model.__mro__:
+        if cls.__name__ in orderings:
+            return queryset.order_by(*orderings[cls.__name__])
+    raise TypeError(f'{queryset.model.__name__} is not a django_org model')
+
+
+def display_order(queryset: QuerySet) -> QuerySet:
+    """Order a django_org queryset by names, for lists shown to people."""
+    return _ordering(DISPLAY_ORDERING, queryset)
+
+
+def join_free_order(queryset: QuerySet) -> QuerySet:
+    """Order a django_org queryset by its own indexed columns only."""
+    return _ordering(JOIN_FREE_ORDERING, queryset)
@@ -0,0 +1,238 @@
+"""Transactional outbox of the django_org changes for downstream services.
+
+With `DJANGO_ORG_OUTBOX` every save and delete of the org models appends a message with the state
+of the object (derived fields such as `enterprise_id` and `full_name` included) on the same
+database connection, so it commits or rolls back with the change when the write runs inside
+`transaction.atomic` (e.g. with `ATOMIC_REQUESTS`). `Relay` delivers the messages in batches to a
+sink and stores the offset of its consumer after the sink returns: delivery is at-least-once.
+
+Ids of concurrent transactions may commit out of order, so the relay does not step over a gap in
+the ids (a new consumer: below its first message) until the message after it is
+`DJANGO_ORG_OUTBOX_RELAY_LAG` seconds old, then it logs a warning with the skipped ids. A gap is
+left by a rolled back transaction, or by one still open after the lag: its messages are never
+delivered to the consumers past it, so keep the lag above your longest transaction.
+
+Queryset `update()`, `bulk_create()` and raw SQL send no signals: `publish_updates` and
+`publish_creates` append the messages of their rows. The tree moves, person merges and snapshot
+imports of django_org call them, other bulk writes (`synthetic.generate`, `parallel.BulkCreate`)
+do not reach the outbox.
+"""
+
+import json
+import logging
+import os
+import queue
+import time
+from datetime import timedelta
+from typing import Callable, Iterable, List, Optional
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import Min
+from django.db.models.signals import post_delete, post_save
+
+from django_org import clock
+from django_org.history import LOGGED_MODELS, _data, _enterprise_id
+from django_org.settings import DJANGO_ORG_OUTBOX_MESSAGE, DJANGO_ORG_OUTBOX_OFFSET, DJANGO_ORG_OUTBOX_RELAY_LAG
+
+
+__all__ = (
+    'FileSink',
+    'QueueSink',
+    'Relay',
+    'connect',
+    'disconnect',
+    'is_connected',
+    'publish_creates',
+    'publish_updates',
+    'purge',
+)
+
+
+Sink = Callable[[List[dict]], None]
+
+logger = logging.getLogger('django_org')
+
+_connected = False
+
+
+def _on_save(sender, instance, created, raw=False, using=None, **kwargs):
+    OutboxMessage = apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE)
+    OutboxMessage.objects.using(using).create(
+        enterprise_id=_enterprise_id(instance),
+        model=sender._meta.label,
+        object_id=instance.pk,
+        action=OutboxMessage.Action.CREATE if created else OutboxMessage.Action.UPDATE,
+        data=_data(instance),
+    )
+
+
+def _on_delete(sender, instance, using=None, **kwargs):
+    OutboxMessage = apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE)
+    OutboxMessage.objects.using(using).create(
+        enterprise_id=_enterprise_id(instance),
+        model=sender._meta.label,
+        object_id=instance.pk,
+        action=OutboxMessage.Action.DELETE,
+        data=_data(instance),
+    )
+
+
+def _publish(queryset: models.QuerySet, action: int):
+    OutboxMessage = apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE)
+    OutboxMessage.objects.using(queryset.db).bulk_create([
+        OutboxMessage(
+            enterprise_id=_enterprise_id(instance),
+            model=queryset.model._meta.label,
+            object_id=instance.pk,
+            action=action,
+            data=_data(instance),
+        )
+        for instance in queryset.order_by('pk')
+    ])
+
+
+def publish_updates(queryset: models.QuerySet):
+    """Append the current rows of a queryset as updated, for changes made with `update()`."""
+    _publish(queryset, apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE).Action.UPDATE)
+
+
+def publish_creates(queryset: models.QuerySet):
+    """Append the rows of a queryset as created, for rows inserted with `bulk_create()`."""
+    _publish(queryset, apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE).Action.CREATE)
+
+
+def connect():
+    global _connected
+    _connected = True
+    for label in LOGGED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'django_org_outbox_save_{label}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'django_org_outbox_delete_{label}')
+
+
+def disconnect():
+    global _connected
+    _connected = False
+    for label in LOGGED_MODELS:
+        model = apps.get_model(label)
+        post_save.disconnect(sender=model, dispatch_uid=f'django_org_outbox_save_{label}')
+        post_delete.disconnect(sender=model, dispatch_uid=f'django_org_outbox_delete_{label}')
+
+
+def is_connected() -> bool:
+    return _connected
+
+
+def _message(message: models.Model) -> dict:
+    return {
+        'offset': message.id,
+        'created_at': message.created_at,
+        'enterprise_id': message.enterprise_id,
+        'model': message.model,
+        'object_id': message.object_id,
+        'action': message.Action(message.action).name.lower(),
+        'data': message.data,
+    }
+
+
+class FileSink:
+    """Appends the messages to a JSON Lines file, synced to the disk before the offset moves."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, messages: List[dict]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(f'{json.dumps(m, cls=DjangoJSONEncoder)}\n' for m in messages)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class QueueSink:
+    """Puts the messages to a local queue, e.g. for a consumer thread."""
+
+    def __init__(self, queue_: Optional[queue.Queue] = None):
+        self.queue = queue_ if queue_ is not None else queue.Queue()
+
+    def __call__(self, messages: List[dict]):
+        for message in messages:
+            self.queue.put(message)
+
+
+class Relay:
+    """Delivers the outbox of a database to `sink`, any callable taking a list of message dicts."""
+
+    def __init__(self, sink: Sink, consumer: str = 'default', using: Optional[str] = None,
+                 batch_size: int = 500, lag: float = DJANGO_ORG_OUTBOX_RELAY_LAG):
+        self.sink = sink
+        self.consumer = consumer
+        self.using = using or router.db_for_write(apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE))
+        self.batch_size = batch_size
+        self.lag = timedelta(seconds=lag)
+
+    def position(self) -> int:
+        OutboxOffset = apps.get_model(DJANGO_ORG_OUTBOX_OFFSET)
+        offset = OutboxOffset.objects.using(self.using).filter(consumer=self.consumer).first()
+        return offset.position if offset is not None else 0
+
+    def _ready(self, position: int, messages: Iterable[models.Model]) -> List[models.Model]:
+        horizon = clock.now() - self.lag
+        ready = []
+        for message in messages:
+            if message.id > position + 1:
+                if message.created_at > horizon:
+                    break
+                logger.warning('Relay of %s skips the outbox ids %d-%d, rolled back or not committed within %s',
+                               self.consumer, position + 1, message.id - 1, self.lag)
+            ready.append(message)
+            position = max(position, message.id)
+        return ready
+
+    def deliver(self) -> int:
+        """Deliver one batch, return the number of messages delivered."""
+        OutboxMessage = apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE)
+        OutboxOffset = apps.get_model(DJANGO_ORG_OUTBOX_OFFSET)
+        with transaction.atomic(using=self.using):
+            # The locked offset keeps other relays of the consumer waiting
+            offset, _ = OutboxOffset.objects.using(self.using).select_for_update().get_or_create(
+                consumer=self.consumer)
+            messages = OutboxMessage.objects.using(self.using).filter(id__gt=offset.position).order_by('id')
+            position = offset.position
+            if not position:
+                # A new consumer: the ids up to the offsets of the others are settled (e.g. purged)
+                position = OutboxOffset.objects.using(self.using).exclude(pk=offset.pk).aggregate(
+                    m=Min('position'))['m'] or 0
+            ready = self._ready(position, messages[:self.batch_size])
+            if not ready:
+                return 0
+
+            self.sink([_message(m) for m in ready])
+            offset.position = ready[-1].id
+            offset.save(update_fields=('position', 'updated_at'))
+        return len(ready)
+
+    def run(self, interval: float = 1.0, once: bool = False) -> int:
+        """Deliver until the outbox is drained, then poll every `interval` seconds unless `once`."""
+        total = 0
+        while True:
+            delivered = self.deliver()
+            total += delivered
+            if delivered:
+                continue
+            if once:
+                return total
+            time.sleep(interval)
+
+
+def purge(using: Optional[str] = None) -> int:
+    """Delete the messages delivered to all the consumers, return the number deleted."""
+    OutboxMessage = apps.get_model(DJANGO_ORG_OUTBOX_MESSAGE)
+    OutboxOffset = apps.get_model(DJANGO_ORG_OUTBOX_OFFSET)
+    using = using or router.db_for_write(OutboxMessage)
+    position = OutboxOffset.objects.using(using).aggregate(m=Min('position'))['m']
+    if not position:
+        return 0
+    deleted, _ = OutboxMessage.objects.using(using).filter(id__lte=position).delete()
+    return deleted
@@ -0,0 +1,199 @@
+"""Recomputation of shift data over large date ranges in a process pool.
+
+The work is split into jobs by work modes and shift days. The compiled shift tables are pickled
+once and sent to every worker by the pool initializer, the workers open their own database
+connections. A task turns a table and a range of shift days into rows, a sink writes a chunk of
+rows from the worker. Both must be picklable: module level functions or instances of module level
+classes.
+"""
+
+import logging
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import django
+from django.apps import apps
+from django.db import connections
+
+from django_org.const import DAY1
+from django_org.schedule import Occurrence, ShiftTable
+from django_org.worked_time import ShiftTime, worked_time
+
+
+__all__ = (
+    'Job',
+    'Recomputed',
+    'jobs',
+    'occurrences',
+    'AttributePunches',
+    'BulkCreate',
+    'recompute',
+)
+
+
+Task = Callable[[ShiftTable, date, date], Iterable[Any]]
+Sink = Callable[[List[Any]], None]
+
+logger = logging.getLogger('django_org')
+
+_tables: Dict[int, ShiftTable] = {}
+
+
+class Job(NamedTuple):
+    """Shift days [start, end) of the work modes."""
+    work_mode_ids: Tuple[int, ...]
+    start: date
+    end: date
+
+
+class Recomputed(NamedTuple):
+    jobs: int
+    rows: int
+    seconds: float
+    results: list
+
+
+def jobs(work_mode_ids: Sequence[int], start: date, end: date,
+         work_modes_per_job: int = 50, days_per_job: int = 31) -> List[Job]:
+    work_mode_ids = list(work_mode_ids)
+    result = []
+    for i in range(0, len(work_mode_ids), work_modes_per_job):
+        group = tuple(work_mode_ids[i:i + work_modes_per_job])
+        day = start
+        while day < end:
+            until = min(day + days_per_job * DAY1, end)
+            result.append(Job(group, day, until))
+            day = until
+    return result
+
+
+def _day_occurrences(table: ShiftTable, start: date, end: date) -> List[Occurrence]:
+    result = []
+    day = start
+    while day < end:
+        result.extend(table.day_occurrences(day))
+        day += DAY1
+    return result
+
+
+def occurrences(table: ShiftTable, start: date, end: date) -> List[Occurrence]:
+    """Occurrences of the shift days [start, end), the materialization task."""
+    return _day_occurrences(table, start, end)
+
+
+class AttributePunches:
+    """Worked time of the punches within the occurrences of the shift days.
+
+    `loader(work_mode_id, start, end)` runs in the worker and returns the (key, start, end) punches
+    overlapping [start, end). Each occurrence is counted by the job of its shift day only.
+    """
+
+    def __init__(self, loader: Callable[[int, datetime, datetime], Iterable[Tuple[Hashable, Any, Any]]]):
+        self.loader = loader
+
+    def __call__(self, table: ShiftTable, start: date, end: date) -> List[ShiftTime]:
+        days = _day_occurrences(table, start, end)
+        if not days:
+            return []
+
+        window = table.to_datetime(min(o.start for o in days)), table.to_datetime(max(o.end for o in days))
+        grouped = {}
+        for key, punch_start, punch_end in self.loader(table.work_mode_id, *window):
+            grouped.setdefault(key, []).append((punch_start, punch_end))
+
+        return [
+            row
+            for key, punches in grouped.items()
+            for row in worked_time(table, punches, key=key)
+            if start <= row.shift_day < end
+        ]
+
+
+class BulkCreate:
+    """Sink creating `model(**row._asdict())` objects in one bulk insert per chunk."""
+
+    def __init__(self, model: str, using: Optional[str] = None, ignore_conflicts: bool = False):
+        self.model = model
+        self.using = using
+        self.ignore_conflicts = ignore_conflicts
+
+    def __call__(self, rows: List[Any]):
+        model = apps.get_model(self.model)
+        model.objects.db_manager(self.using).bulk_create(
+            [model(**row._asdict()) for row in rows], ignore_conflicts=self.ignore_conflicts)
+
+
+def _init_worker(payload: bytes):
+    global _tables
+    if not apps.ready:
+        django.setup()
+    _tables = pickle.loads(payload)
+
+
+def _run(job: Job, task: Task, sink: Optional[Sink], chunk_size: int) -> Tuple[int, list]:
+    rows = []
+    written = 0
+    for work_mode_id in job.work_mode_ids:
+        rows.extend(task(_tables[work_mode_id], job.start, job.end))
+        if sink is not None and len(rows) >= chunk_size:
+            full = len(rows) - len(rows) % chunk_size
+            for i in range(0, full, chunk_size):
+                sink(rows[i:i + chunk_size])
+            written += full
+            del rows[:full]
+
+    if sink is None:
+        return len(rows), rows
+    if rows:
+        sink(rows)
+    return written + len(rows), []
+
+
+def recompute(
+        work_modes: Iterable,
+        start: date,
+        end: date,
+        task: Task = occurrences,
+        sink: Optional[Sink] = None,
+        processes: Optional[int] = None,
+        work_modes_per_job: int = 50,
+        days_per_job: int = 31,
+        chunk_size: int = 5000
+) -> Recomputed:
+    """Run the task for the shift days [start, end) of the work modes.
+
+    With a sink the rows are written by the workers in chunks of `chunk_size`, otherwise they are
+    returned to the caller. `processes=0` runs the jobs in the current process, and so does a call
+    inside a transaction (with a warning logged): the workers would not see its changes and its
+    connection cannot be closed before they are forked. With `ATOMIC_REQUESTS` that is every call
+    from a view, run the recomputation from a task or a command instead.
+    """
+    started = time.perf_counter()
+    tables = ShiftTable.for_work_modes(work_modes)
+    todo = jobs(sorted(tables), start, end, work_modes_per_job, days_per_job)
+    payload = pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL)
+
+    count = 0
+    results = []
+    in_transaction = any(connection.in_atomic_block for connection in connections.all())
+    if in_transaction and processes != 0:
+        logger.warning('recompute() runs %d jobs in the current process, it is called inside a transaction', len(todo))
+    if processes == 0 or in_transaction:
+        _init_worker(payload)
+        for job in todo:
+            n, rows = _run(job, task, sink, chunk_size)
+            count += n
+            results.extend(rows)
+    else:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(payload,)) as executor:
+            futures = [executor.submit(_run, job, task, sink, chunk_size) for job in todo]
+            for future in as_completed(futures):
+                n, rows = future.result()
+                count += n
+                results.extend(rows)
+
+    return Recomputed(len(todo), count, time.perf_counter() - started, results)
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from datetime import date
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from django_org.schedule import ShiftTable
+from django_org.utils import Instant, _epoch
+
+
+__all__ = (
+    'ShiftBucket',
+    'ShiftPartitioner',
+)
+
+
+class ShiftBucket:
+    """Events of one shift occurrence aggregated into `value`."""
+
+    __slots__ = ('work_mode_id', 'shift_day', 'shift_number', 'shift_id', 'start', 'end', 'value')
+
+    def __init__(self, work_mode_id: int, shift_day: date, shift_number: int, shift_id: int,
+                 start: int, end: int, value: Any):
+        self.work_mode_id = work_mode_id
+        self.shift_day = shift_day
+        self.shift_number = shift_number
+        self.shift_id = shift_id
+        self.start = start
+        self.end = end
+        self.value = value
+
+    def __repr__(self):
+        return f'<ShiftBucket {self.key}: {self.value!r}>'
+
+    @property
+    def key(self) -> Tuple[int, date, int]:
+        return self.work_mode_id, self.shift_day, self.shift_number
+
+
+def _count(value: int, event: Any) -> int:
+    return value + 1
+
+
+class ShiftPartitioner:
+    """Buckets a time ordered event stream by (work_mode, shift_day, shift_number).
+
+    Only the buckets of the shifts still open are kept in memory, a bucket is emitted as soon as
+    the stream passes its end (plus `lateness` seconds). Events of an already emitted bucket are
+    counted in `late`, events outside any shift in `unassigned`. By default buckets count events.
+    """
+
+    def __init__(
+            self,
+            tables: Mapping[Hashable, ShiftTable],
+            initial: Callable[[], Any] = int,
+            reducer: Callable[[Any, Any], Any] = _count,
+            lateness: int = 0
+    ):
+        self.tables = tables
+        self.initial = initial
+        self.reducer = reducer
+        self.lateness = lateness
+        self.watermark: Optional[int] = None
+        self.late = 0
+        self.unassigned = 0
+        self._open = defaultdict(list)
+        self._closing = []
+        self._seq = count()
+        self._closed_until = {}
+
+    def __len__(self):
+        return len(self._closing)
+
+    def _bucket(self, work_mode_id: Hashable, t: int) -> Optional[ShiftBucket]:
+        for bucket in self._open[work_mode_id]:
+            if bucket.start <= t < bucket.end:
+                return bucket
+
+        occurrence = self.tables[work_mode_id].at(t)
+        if occurrence is None:
+            self.unassigned += 1
+            return None
+        if occurrence.end <= self._closed_until.get(work_mode_id, occurrence.end - 1):
+            self.late += 1
+            return None
+
+        bucket = ShiftBucket(work_mode_id, occurrence.shift_day, occurrence.number, occurrence.shift_id,
+                             occurrence.start, occurrence.end, self.initial())
+        self._open[work_mode_id].append(bucket)
+        heappush(self._closing, (bucket.end, next(self._seq), bucket))
+        return bucket
+
+    def _close(self, until: Optional[int]) -> List[ShiftBucket]:
+        closed = []
+        while self._closing and (until is None or self._closing[0][0] <= until):
+            end, _, bucket = heappop(self._closing)
+            self._open[bucket.work_mode_id].remove(bucket)
+            self._closed_until[bucket.work_mode_id] = max(self._closed_until.get(bucket.work_mode_id, end), end)
+            closed.append(bucket)
+        return closed
+
+    def add(self, work_mode_id: Hashable, t: Instant, event: Any = None) -> List[ShiftBucket]:
+        """Add an event, return the buckets closed by it."""
+        t = _epoch(t)
+        bucket = self._bucket(work_mode_id, t)
+        if bucket is not None:
+            bucket.value = self.reducer(bucket.value, event)
+
+        if self.watermark is None or t > self.watermark:
+            self.watermark = t
+            return self._close(t - self.lateness)
+        return []
+
+    def flush(self) -> List[ShiftBucket]:
+        """Close all the open buckets."""
+        return self._close(None)
+
+    def partition(self, events: Iterable[Tuple[Hashable, Instant, Any]]) -> Iterator[ShiftBucket]:
+        """Stream (work_mode_id, time, event) triples into closed buckets."""
+        for work_mode_id, t, event in events:
+            yield from self.add(work_mode_id, t, event)
+        yield from self.flush()
@@ -0,0 +1,149 @@
+"""Reorganisation of the department tree.
+
+`move_subtree` re-parents a department together with all its descendants in one transaction.
+Every affected table is changed with set-based `update()` statements, their number grows only with
+the query parameters limit of the database backend, not with the number of rows.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.apps import apps
+from django.db import connections, models, router, transaction
+
+from django_org import cache, history, outbox, replicas
+from django_org.exceptions import DepartmentCycleError, IDMismatchError
+from django_org.instrumentation import instrument
+from django_org.settings import (
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT
+)
+from django_org.sharding import shard_for
+from django_org.utils import _case
+
+
+__all__ = (
+    'move_subtree',
+)
+
+
+def _chunks(ids: List[int], using: str) -> Iterator[List[int]]:
+    size = (connections[using].features.max_query_params or 20000) // 2
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _values(queryset: models.QuerySet, lookup: str, field: str, ids: List[int]) -> Iterator[int]:
+    for chunk in _chunks(ids, queryset.db):
+        yield from queryset.filter(**{f'{lookup}__in': chunk}).values_list(field, flat=True).order_by().distinct()
+
+
+def _remap(model, using: str, ids: Iterable[int], enterprise_id: int, create: bool = True) -> Dict[int, int]:
+    """Map `model` rows to the rows of the enterprise with the same names, creating the missing ones."""
+    names = dict(model.objects.using(using).filter(pk__in=set(ids)).values_list('id', 'name'))
+    targets = model.objects.using(using).filter(enterprise_id=enterprise_id, name__in=set(names.values()))
+    missing = set(names.values()) - set(targets.values_list('name', flat=True))
+    if missing and not create:
+        raise IDMismatchError(f'No {model._meta.verbose_name} named {", ".join(sorted(missing))} in the enterprise')
+    if missing:
+        model.objects.using(using).bulk_create([model(enterprise_id=enterprise_id, name=name) for name in missing])
+        if history.is_connected():
+            history.log_creates(targets.filter(name__in=missing))
+        if outbox.is_connected():
+            outbox.publish_creates(targets.filter(name__in=missing))
+
+    ids_by_name = dict(targets.values_list('name', 'id'))
+    return {pk: ids_by_name[name] for pk, name in names.items()}
+
+
+@instrument('department.move_subtree')
+def move_subtree(
+        department: models.Model,
+        parent: Optional[models.Model] = None,
+        department_type: Optional[models.Model] = None
+) -> List[int]:
+    """Move the department with its descendants under `parent`, to the roots if it is None.
+
+    The target enterprise is the one of `parent`, else of `department_type`, else the current one.
+    Across enterprises the department types and posts of the subtree are matched by name in the
+    target enterprise (the missing ones are created), so are the work modes of the assignments
+    (the missing ones raise `IDMismatchError`). Returns the ids of the moved departments.
+    """
+    Department = department.__class__
+    DepartmentType = apps.get_model(DJANGO_ORG_DEPARTMENT_TYPE)
+    Post = apps.get_model(DJANGO_ORG_POST)
+    WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+    WorkModeAssignment = apps.get_model(DJANGO_ORG_WORK_MODE_ASSIGNMENT)
+
+    source_id = department.enterprise_id
+    target_id = (parent or department_type or department).enterprise_id
+    if department_type is not None and department_type.enterprise_id != target_id:
+        raise IDMismatchError('Mismatch of enterprises identifiers')
+    if shard_for(source_id) != shard_for(target_id):
+        raise IDMismatchError('A subtree cannot be moved across shards')
+
+    using = router.db_for_write(Department, instance=department)
+    with transaction.atomic(using=using):
+        # The tree is locked and read from the database, the cached one may be stale
+        children, types = defaultdict(list), {}
+        for pk, parent_id, type_id in Department.objects.using(using).select_for_update().filter(
+                enterprise_id=source_id).values_list('id', 'parent_id', 'department_type_id').order_by():
+            children[parent_id].append(pk)
+            types[pk] = type_id
+        ids = [department.pk]
+        for pk in ids:
+            ids.extend(children.get(pk, ()))
+        if parent is not None and parent.pk in ids:
+            raise DepartmentCycleError('A department cannot be moved into its own subtree')
+
+        changes = {'enterprise_id': target_id}
+        if target_id != source_id:
+            type_ids = _remap(DepartmentType, using, (types[pk] for pk in ids), target_id)
+            post_ids = _remap(Post, using, _values(
+                Employee.objects.using(using), 'department_id', 'post_id', ids), target_id)
+            work_mode_ids = _remap(WorkMode, using, _values(
+                WorkModeAssignment.objects.using(using), 'employee__department_id', 'work_mode_id', ids),
+                target_id, create=False)
+            changes['department_type_id'] = _case('department_type_id', type_ids)
+
+        for chunk in _chunks(ids, using):
+            Department.objects.using(using).filter(pk__in=chunk).update(**changes)
+            if target_id != source_id:
+                Employee.objects.using(using).filter(department_id__in=chunk).update(
+                    enterprise_id=target_id, post_id=_case('post_id', post_ids))
+                WorkModeAssignment.objects.using(using).filter(employee__department_id__in=chunk).update(
+                    enterprise_id=target_id, work_mode_id=_case('work_mode_id', work_mode_ids))
+
+        root = {'parent_id': parent.pk if parent is not None else None}
+        if department_type is not None:
+            root['department_type_id'] = department_type.pk
+        Department.objects.using(using).filter(pk=department.pk).update(**root)
+
+        for log, connected in ((history.log_updates, history.is_connected()),
+                               (outbox.publish_updates, outbox.is_connected())):
+            if not connected:
+                continue
+            for chunk in _chunks(ids, using):
+                log(Department.objects.using(using).filter(pk__in=chunk))
+                if target_id != source_id:
+                    log(Employee.objects.using(using).filter(department_id__in=chunk))
+                    log(WorkModeAssignment.objects.using(using).filter(employee__department_id__in=chunk))
+        if history.is_connected() and target_id != source_id:
+            # The moved rows are logged under the target only, the source states must drop them
+            for chunk in _chunks(ids, using):
+                history.log_moves(Department.objects.using(using).filter(pk__in=chunk), source_id)
+                history.log_moves(Employee.objects.using(using).filter(department_id__in=chunk), source_id)
+                history.log_moves(WorkModeAssignment.objects.using(using).filter(
+                    employee__department_id__in=chunk), source_id)
+
+    # The updates send no signals, the reads are pinned to the primary here
+    replicas.pin(using)
+    department.refresh_from_db(using=using, fields=('enterprise', 'parent', 'department_type'))
+    cache.invalidate(source_id)
+    if target_id != source_id:
+        cache.invalidate(target_id)
+    return ids
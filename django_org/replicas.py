@@ -0,0 +1,94 @@
+"""Read replicas of the django_org databases.
+
+`DJANGO_ORG_READ_REPLICAS` maps a primary alias to its replica aliases. Reads go to a replica
+until something is written to the primary in the current context (request, task), then they
+stick to the primary. Add `ReplicaMiddleware` to scope that to a request. A write is a save or a
+delete of a model; queryset `update()`, `bulk_create()` and raw SQL send no signals, call `pin()`
+after them.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+from django_org.settings import DJANGO_ORG_READ_REPLICAS
+
+
+__all__ = (
+    'replica_for',
+    'primary_of',
+    'pin',
+    'is_pinned',
+    'use_primary',
+    'sticky_scope',
+    'ReplicaMiddleware',
+)
+
+
+_ALL = '*'
+_pinned: ContextVar[frozenset] = ContextVar('django_org_pinned', default=frozenset())
+
+
+def _primaries() -> dict:
+    return {replica: primary for primary, replicas in (DJANGO_ORG_READ_REPLICAS or {}).items() for replica in replicas}
+
+
+def primary_of(alias: Optional[str]) -> Optional[str]:
+    return _primaries().get(alias, alias)
+
+
+def pin(alias: Optional[str] = None):
+    """Stick the reads of the primary to it for the rest of the context."""
+    alias = primary_of(alias or DEFAULT_DB_ALIAS)
+    if alias not in _pinned.get():
+        _pinned.set(_pinned.get() | {alias})
+
+
+def is_pinned(alias: Optional[str] = None) -> bool:
+    pinned = _pinned.get()
+    return _ALL in pinned or primary_of(alias or DEFAULT_DB_ALIAS) in pinned
+
+
+def replica_for(alias: Optional[str] = None) -> Optional[str]:
+    """A replica of the primary (default if None), else the primary when it is pinned or has no replicas."""
+    primary = primary_of(alias or DEFAULT_DB_ALIAS)
+    replicas = (DJANGO_ORG_READ_REPLICAS or {}).get(primary)
+    if not replicas or is_pinned(primary):
+        return alias and primary
+    return random.choice(replicas)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primaries inside the block."""
+    token = _pinned.set(_pinned.get() | {_ALL})
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def sticky_scope():
+    """Forget the writes made inside the block once it exits."""
+    token = _pinned.set(frozenset())
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def _pin_on_write(sender, using=None, **kwargs):
+    pin(using)
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with sticky_scope():
+            return self.get_response(request)
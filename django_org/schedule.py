@@ -0,0 +1,172 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from heapq import heappop, heappush
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from django.apps import apps
+
+from django_org.calendar_index import CalendarIndex
+from django_org.const import DAY1
+from django_org.settings import DJANGO_ORG_ENTERPRISE, DJANGO_ORG_WORK_SHIFT
+from django_org.sharding import by_db
+from django_org.utils import Instant, _epoch, _shift_offsets, _cycle_day
+
+
+__all__ = (
+    'Occurrence',
+    'ShiftTable',
+)
+
+
+class Occurrence(NamedTuple):
+    """A shift occurrence, `start` and `end` are epoch seconds."""
+    start: int
+    end: int
+    shift_day: date
+    shift_id: int
+    number: int
+    work_mode_id: int
+
+
+class ShiftTable:
+    """Compiled shift definitions of one work mode.
+
+    Resolves and iterates shift occurrences without touching the database. Shift borders follow
+    the wall clock of the enterprise time zone like `AbstractWorkShift.borders`, but occurrences
+    carry epoch seconds, so durations are correct across DST transitions.
+    """
+
+    __slots__ = ('work_mode_id', 'time_zone', 'tz', 'cycle_length', 'cycle_start', 'calendar', '_days')
+
+    def __init__(
+            self,
+            work_mode_id: int,
+            time_zone: str,
+            shifts: Iterable[Tuple[int, int, int, int, int]],
+            cycle_length: int = 1,
+            cycle_start: Optional[date] = None,
+            calendar: Optional[CalendarIndex] = None
+    ):
+        """`shifts` are (id, number, day, start, end) rows."""
+        self.work_mode_id = work_mode_id
+        self.time_zone = time_zone
+        self.tz = ZoneInfo(time_zone)
+        self.cycle_length = cycle_length
+        self.cycle_start = cycle_start or date(1970, 1, 1)
+        self.calendar = calendar or CalendarIndex()
+        self._days: List[List[Tuple[int, int, int, int]]] = [[] for _ in range(cycle_length)]
+        for pk, number, day, start, end in sorted(shifts, key=lambda s: (s[2], s[1])):
+            self._days[day].append((pk, number, start, end))
+
+    def __reduce__(self):
+        shifts = [(pk, number, day, start, end)
+                  for day, rows in enumerate(self._days) for pk, number, start, end in rows]
+        return self.__class__, (self.work_mode_id, self.time_zone, shifts,
+                                self.cycle_length, self.cycle_start, self.calendar)
+
+    def __bool__(self):
+        return any(self._days)
+
+    @classmethod
+    def for_work_modes(cls, work_modes: Iterable) -> Dict[int, 'ShiftTable']:
+        """Compile the work modes with two queries: shifts and calendars (plus time zones if not cached)."""
+        Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+        WorkShift = apps.get_model(DJANGO_ORG_WORK_SHIFT)
+        work_modes = list(work_modes)
+        if not work_modes:
+            return {}
+
+        enterprise_field = work_modes[0]._meta.get_field('enterprise')
+        time_zones = {
+            wm.enterprise_id: wm.enterprise.time_zone for wm in work_modes if enterprise_field.is_cached(wm)
+        }
+        if any(getattr(wm, '_calendar', None) is None for wm in work_modes):
+            CalendarIndex.prefetch(work_modes)
+        shifts = defaultdict(list)
+        for db, group in by_db(work_modes).items():
+            missing = {wm.enterprise_id for wm in group} - time_zones.keys()
+            if missing:
+                time_zones.update(Enterprise.objects.using(db).filter(pk__in=missing).values_list('id', 'time_zone'))
+            for work_mode_id, *shift in WorkShift.objects.using(db).filter(work_mode__in=group).values_list(
+                    'work_mode_id', 'id', 'number', 'day', 'start', 'end').order_by():
+                shifts[work_mode_id].append(shift)
+
+        return {
+            wm.pk: cls(
+                wm.pk, time_zones[wm.enterprise_id], shifts[wm.pk], wm.cycle_length, wm.cycle_start, wm.calendar
+            )
+            for wm in work_modes
+        }
+
+    @classmethod
+    def for_work_mode(cls, work_mode) -> 'ShiftTable':
+        return cls.for_work_modes([work_mode])[work_mode.pk]
+
+    def _midnight(self, day: date) -> datetime:
+        return datetime.combine(day, time.min, tzinfo=self.tz)
+
+    def local_date(self, t: Instant) -> date:
+        return datetime.fromtimestamp(_epoch(t), tz=self.tz).date()
+
+    def to_datetime(self, t: int) -> datetime:
+        return datetime.fromtimestamp(t, tz=self.tz)
+
+    def occurrence(self, shift: Tuple[int, int, int, int], shift_day: date) -> Optional[Occurrence]:
+        pk, number, start, end = shift
+        if self.calendar.is_off(shift_day, pk):
+            return None
+
+        start, end = self.calendar.override(shift_day, pk) or (start, end)
+        start, end = _shift_offsets(number, start, end)
+        midnight = self._midnight(shift_day)
+        return Occurrence(
+            int((midnight + timedelta(seconds=start)).timestamp()),
+            int((midnight + timedelta(seconds=end)).timestamp()),
+            shift_day,
+            pk,
+            number,
+            self.work_mode_id
+        )
+
+    def day_occurrences(self, shift_day: date) -> Iterator[Occurrence]:
+        for shift in self._days[_cycle_day(shift_day, self.cycle_start, self.cycle_length)]:
+            occurrence = self.occurrence(shift, shift_day)
+            if occurrence is not None:
+                yield occurrence
+
+    def at(self, t: Instant) -> Optional[Occurrence]:
+        """The occurrence containing `t`, the lowest shift number wins."""
+        t = _epoch(t)
+        day = self.local_date(t)
+        found = [
+            o for d in (day - DAY1, day, day + DAY1) for o in self.day_occurrences(d)
+            if o.start <= t < o.end
+        ]
+        return min(found, key=lambda o: o.number) if found else None
+
+    def occurrences(self, start: Instant, end: Optional[Instant] = None) -> Iterator[Occurrence]:
+        """Occurrences overlapping [start, end) ordered by start. Without `end` the stream is endless."""
+        start = _epoch(start)
+        end = end if end is None else _epoch(end)
+        if not self:
+            return
+
+        # An occurrence of a shift day starts no earlier than the previous midnight
+        heap = []
+        day = self.local_date(start) - DAY1
+        while True:
+            threshold = self._midnight(day - DAY1).timestamp()
+            while heap and heap[0].start < threshold:
+                occurrence = heappop(heap)
+                if occurrence.end > start and (end is None or occurrence.start < end):
+                    yield occurrence
+            if end is not None and threshold >= end:
+                return
+
+            for occurrence in self.day_occurrences(day):
+                heappush(heap, occurrence)
+            day += DAY1
+
+    def between(self, start: Instant, end: Instant) -> List[Occurrence]:
+        return list(self.occurrences(start, end))
@@ -0,0 +1,104 @@
+"""Row-level scoping of the org models by the department subtree of a user.
+
+A user sees the rows within the subtree of the department of their employee. The subtree is kept
+as sorted id ranges (cached with `DJANGO_ORG_CACHE`), which turn into a few `BETWEEN` conditions
+instead of a huge `IN` list: departments of a subtree are mostly created together.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import models
+from django.db.models import Q
+
+from django_org import cache
+from django_org.settings import (
+    DJANGO_ORG_POST,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_PERSON,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT
+)
+
+
+__all__ = (
+    'IdRanges',
+    'id_ranges',
+    'ranges_q',
+    'subtree_ranges',
+    'user_ranges',
+    'visible_q',
+)
+
+
+IdRanges = List[Tuple[int, int]]
+
+# The lookup of the department id of the scoped models
+DEPARTMENT_LOOKUPS = {
+    DJANGO_ORG_DEPARTMENT: 'pk',
+    DJANGO_ORG_EMPLOYEE: 'department__pk',
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT: 'employee__department__pk',
+}
+# The models seen through the employees of the subtree and their field on the employee
+EMPLOYEE_FIELDS = {
+    DJANGO_ORG_POST: 'post_id',
+    DJANGO_ORG_PERSON: 'person_id',
+}
+
+
+def id_ranges(ids: Iterable[int]) -> IdRanges:
+    """Inclusive ranges of consecutive ids."""
+    ranges = []
+    for pk in sorted(set(ids)):
+        if ranges and ranges[-1][1] == pk - 1:
+            ranges[-1] = (ranges[-1][0], pk)
+        else:
+            ranges.append((pk, pk))
+    return ranges
+
+
+def ranges_q(lookup: str, ranges: IdRanges) -> Q:
+    singles = [start for start, end in ranges if start == end]
+    q = Q(**{f'{lookup}__in': singles})
+    for start, end in ranges:
+        if start != end:
+            q |= Q(**{f'{lookup}__range': (start, end)})
+    return q
+
+
+def subtree_ranges(department: models.Model) -> IdRanges:
+    if cache.is_enabled():
+        return cache.subtree_ranges(department)
+    return id_ranges(department.subtree_ids())
+
+
+def user_ranges(user) -> Optional[IdRanges]:
+    """Department id ranges visible to the user, None if the user sees everything.
+
+    Resolved once per user object, e.g. once per request.
+    """
+    if user.is_superuser:
+        return None
+    if not hasattr(user, '_django_org_ranges'):
+        Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+        employee = None
+        if user.is_authenticated:
+            employee = Employee.objects.select_related('department').filter(person__user=user).first()
+        user._django_org_ranges = subtree_ranges(employee.department) if employee is not None else []
+    return user._django_org_ranges
+
+
+def visible_q(model, user) -> Q:
+    """The filter of `model` rows visible to the user."""
+    ranges = user_ranges(user)
+    if ranges is None:
+        return Q()
+
+    label = model._meta.label
+    if label in DEPARTMENT_LOOKUPS:
+        return ranges_q(DEPARTMENT_LOOKUPS[label], ranges)
+    if label in EMPLOYEE_FIELDS:
+        Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+        employees = Employee.objects.filter(ranges_q('department__pk', ranges))
+        return Q(pk__in=employees.values(EMPLOYEE_FIELDS[label]))
+    raise TypeError(f'{label} is not scoped by departments')
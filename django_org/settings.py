@@ -12,3 +12,29 @@ DJANGO_ORG_DEPARTMENT_TYPE = getattr(settings, 'DJANGO_ORG_DEPARTMENT_TYPE', f'{
 DJANGO_ORG_DEPARTMENT = getattr(settings, 'DJANGO_ORG_DEPARTMENT', f'{DEFAULT_APP_NAME}.Department')
 DJANGO_ORG_PERSON = getattr(settings, 'DJANGO_ORG_PERSON', f'{DEFAULT_APP_NAME}.Person')
 DJANGO_ORG_EMPLOYEE = getattr(settings, 'DJANGO_ORG_EMPLOYEE', f'{DEFAULT_APP_NAME}.Employee')
+DJANGO_ORG_WORK_MODE_ASSIGNMENT = getattr(settings, 'DJANGO_ORG_WORK_MODE_ASSIGNMENT',
+                                          f'{DEFAULT_APP_NAME}.WorkModeAssignment')
+DJANGO_ORG_CALENDAR_EXCEPTION = getattr(settings, 'DJANGO_ORG_CALENDAR_EXCEPTION',
+                                        f'{DEFAULT_APP_NAME}.CalendarException')
+DJANGO_ORG_CHANGE_LOG_ENTRY = getattr(settings, 'DJANGO_ORG_CHANGE_LOG_ENTRY', f'{DEFAULT_APP_NAME}.ChangeLogEntry')
+DJANGO_ORG_CHANGE_LOG_SNAPSHOT = getattr(settings, 'DJANGO_ORG_CHANGE_LOG_SNAPSHOT',
+                                         f'{DEFAULT_APP_NAME}.ChangeLogSnapshot')
+DJANGO_ORG_OUTBOX_MESSAGE = getattr(settings, 'DJANGO_ORG_OUTBOX_MESSAGE', f'{DEFAULT_APP_NAME}.OutboxMessage')
+DJANGO_ORG_OUTBOX_OFFSET = getattr(settings, 'DJANGO_ORG_OUTBOX_OFFSET', f'{DEFAULT_APP_NAME}.OutboxOffset')
+
+DJANGO_ORG_INSTRUMENTATION = getattr(settings, 'DJANGO_ORG_INSTRUMENTATION', False)
+DJANGO_ORG_METRICS = getattr(settings, 'DJANGO_ORG_METRICS', 'django_org.instrumentation.Metrics')
+
+DJANGO_ORG_JOIN_FREE_ORDERING = getattr(settings, 'DJANGO_ORG_JOIN_FREE_ORDERING', False)
+
+DJANGO_ORG_SHARDS = getattr(settings, 'DJANGO_ORG_SHARDS', None)
+DJANGO_ORG_SHARD_FUNCTION = getattr(settings, 'DJANGO_ORG_SHARD_FUNCTION', 'django_org.sharding.modulo_shard')
+DJANGO_ORG_READ_REPLICAS = getattr(settings, 'DJANGO_ORG_READ_REPLICAS', None)
+DJANGO_ORG_CHANGE_LOG = getattr(settings, 'DJANGO_ORG_CHANGE_LOG', False)
+DJANGO_ORG_CHANGE_LOG_LAG = getattr(settings, 'DJANGO_ORG_CHANGE_LOG_LAG', 30)
+DJANGO_ORG_OUTBOX = getattr(settings, 'DJANGO_ORG_OUTBOX', False)
+DJANGO_ORG_OUTBOX_RELAY_LAG = getattr(settings, 'DJANGO_ORG_OUTBOX_RELAY_LAG', 30)
+
+DJANGO_ORG_CACHE = getattr(settings, 'DJANGO_ORG_CACHE', None)
+DJANGO_ORG_CACHE_TIMEOUT = getattr(settings, 'DJANGO_ORG_CACHE_TIMEOUT', 24 * 3600)
+DJANGO_ORG_WARM_ON_READY = getattr(settings, 'DJANGO_ORG_WARM_ON_READY', False)
@@ -0,0 +1,210 @@
+"""Routing of django_org models to databases by enterprise.
+
+Set `DJANGO_ORG_SHARDS` to the database aliases holding the enterprises and add
+`django_org.sharding.EnterpriseRouter` to `DATABASE_ROUTERS`. An enterprise goes to the alias
+returned by `DJANGO_ORG_SHARD_FUNCTION(enterprise_id, shards)`, by default `enterprise_id % len(shards)`.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from django.apps import apps
+from django.db import models
+from django.utils.module_loading import import_string
+
+from django_org.ordering import join_free_order
+from django_org.replicas import primary_of, replica_for
+from django_org.settings import (
+    DJANGO_ORG_SHARDS,
+    DJANGO_ORG_SHARD_FUNCTION,
+    DJANGO_ORG_JOIN_FREE_ORDERING,
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_PERSON,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION,
+    DJANGO_ORG_CHANGE_LOG_ENTRY,
+    DJANGO_ORG_CHANGE_LOG_SNAPSHOT,
+    DJANGO_ORG_OUTBOX_MESSAGE
+)
+
+
+__all__ = (
+    'modulo_shard',
+    'is_sharded',
+    'shards',
+    'shard_for',
+    'db_for',
+    'by_db',
+    'related',
+    'EnterpriseQuerySet',
+    'EnterpriseManager',
+    'EnterpriseRouter',
+)
+
+
+def modulo_shard(enterprise_id: int, shards: Sequence[str]) -> str:
+    return shards[enterprise_id % len(shards)]
+
+
+@lru_cache(maxsize=None)
+def _shard_function(path: str):
+    return import_string(path)
+
+
+@lru_cache(maxsize=None)
+def _org_models() -> frozenset:
+    return frozenset(apps.get_model(label) for label in (
+        DJANGO_ORG_ENTERPRISE,
+        DJANGO_ORG_POST,
+        DJANGO_ORG_WORK_MODE,
+        DJANGO_ORG_WORK_SHIFT,
+        DJANGO_ORG_DEPARTMENT_TYPE,
+        DJANGO_ORG_DEPARTMENT,
+        DJANGO_ORG_PERSON,
+        DJANGO_ORG_EMPLOYEE,
+        DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+        DJANGO_ORG_CALENDAR_EXCEPTION,
+        DJANGO_ORG_CHANGE_LOG_ENTRY,
+        DJANGO_ORG_CHANGE_LOG_SNAPSHOT,
+        DJANGO_ORG_OUTBOX_MESSAGE,
+    ))
+
+
+def is_sharded() -> bool:
+    return bool(DJANGO_ORG_SHARDS)
+
+
+def shards() -> List[Optional[str]]:
+    """The aliases to fan out to, `[None]` (routed as usual) without sharding."""
+    return list(DJANGO_ORG_SHARDS) if DJANGO_ORG_SHARDS else [None]
+
+
+def shard_for(enterprise: Union[models.Model, int, None]) -> Optional[str]:
+    if not DJANGO_ORG_SHARDS or enterprise is None:
+        return None
+    enterprise_id = enterprise.pk if isinstance(enterprise, models.Model) else enterprise
+    if enterprise_id is None:
+        return None
+    return _shard_function(DJANGO_ORG_SHARD_FUNCTION)(enterprise_id, DJANGO_ORG_SHARDS)
+
+
+def db_for(instance: models.Model) -> Optional[str]:
+    """The primary database of an instance: by its enterprise, else by its cached relations."""
+    if DJANGO_ORG_SHARDS:
+        if isinstance(instance, apps.get_model(DJANGO_ORG_ENTERPRISE)):
+            enterprise_id = instance.pk
+        else:
+            enterprise_id = getattr(instance, 'enterprise_id', None)
+        if enterprise_id is not None:
+            return shard_for(enterprise_id)
+
+        for field in instance._meta.concrete_fields:
+            if field.is_relation and field.is_cached(instance):
+                obj = field.get_cached_value(instance)
+                if obj is not None and obj._state.db:
+                    return primary_of(obj._state.db)
+    return primary_of(instance._state.db)
+
+
+def by_db(instances: Iterable[models.Model]) -> Dict[Optional[str], List[models.Model]]:
+    groups = defaultdict(list)
+    for instance in instances:
+        groups[instance._state.db].append(instance)
+    return groups
+
+
+def related(instance: models.Model, name: str, using: Optional[str] = None) -> Optional[models.Model]:
+    """The related object `name` of an instance, fetched from `using` when it is not cached."""
+    field = instance._meta.get_field(name)
+    if using is None or field.is_cached(instance) or getattr(instance, field.attname) is None:
+        return getattr(instance, name)
+
+    obj = field.related_model._base_manager.db_manager(using).get(pk=getattr(instance, field.attname))
+    field.set_cached_value(instance, obj)
+    return obj
+
+
+class EnterpriseQuerySet(models.QuerySet):
+    def _on_shard(self, db: Optional[str]) -> 'EnterpriseQuerySet':
+        # A hint, not `using`, so the router may still pick a replica for reads
+        qs = self._chain()
+        if db is not None:
+            qs._hints = {**qs._hints, 'shard': db}
+        return qs
+
+    def for_enterprise(self, enterprise: Union[models.Model, int]) -> 'EnterpriseQuerySet':
+        """Objects of the enterprise, routed to its shard."""
+        qs = self._on_shard(shard_for(enterprise))
+        if self.model is apps.get_model(DJANGO_ORG_ENTERPRISE):
+            return qs.filter(pk=getattr(enterprise, 'pk', enterprise))
+        if any(f.name == 'enterprise' for f in self.model._meta.concrete_fields):
+            return qs.filter(enterprise=enterprise)
+        return qs
+
+    def visible_to(self, user) -> 'EnterpriseQuerySet':
+        """Objects within the department subtree of the user's employee, all of them for superusers."""
+        from django_org.scope import visible_q
+
+        return self.filter(visible_q(self.model, user))
+
+    def create(self, **kwargs):
+        # A manager writes to its own database, the instance hint is not passed to the router
+        if self._db is None and DJANGO_ORG_SHARDS:
+            # People have no enterprise, `Person.objects.for_enterprise(e).create()` puts one on its shard
+            db = self._hints.get('shard') or db_for(self.model(**kwargs))
+            if db is not None:
+                return self.using(db).create(**kwargs)
+        return super().create(**kwargs)
+
+    def on_shards(self) -> List['EnterpriseQuerySet']:
+        """The queryset on every shard."""
+        return [self._on_shard(db) for db in shards()]
+
+
+class EnterpriseManager(models.Manager.from_queryset(EnterpriseQuerySet)):
+    def get_queryset(self) -> EnterpriseQuerySet:
+        qs = super().get_queryset()
+        if DJANGO_ORG_JOIN_FREE_ORDERING:
+            qs = join_free_order(qs)
+        return qs
+
+
+class EnterpriseRouter:
+    """Routes django_org models by enterprise, reads go to the read replicas if any."""
+
+    @staticmethod
+    def _primary(**hints) -> Optional[str]:
+        if 'shard' in hints:
+            return hints['shard']
+        instance = hints.get('instance')
+        return db_for(instance) if instance is not None else None
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model not in _org_models():
+            return None
+        return replica_for(self._primary(**hints))
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        if model not in _org_models():
+            return None
+        # Not pinned here: Django asks for the write alias where no write follows
+        return self._primary(**hints)
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        org_models = _org_models()
+        if type(obj1) not in org_models or type(obj2) not in org_models:
+            return None
+        db1, db2 = (primary_of(obj._state.db) if obj._state.db else db_for(obj) for obj in (obj1, obj2))
+        if db1 is None or db2 is None:
+            return True
+        return db1 == db2
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        return None
@@ -0,0 +1,11 @@
+from django.dispatch import Signal
+
+
+__all__ = (
+    'measured',
+)
+
+
+# Sent by instrumented django_org calls when instrumentation is enabled.
+# Arguments: name, duration (seconds), queries.
+measured = Signal()
@@ -0,0 +1,330 @@
+"""Compact binary snapshots of an enterprise.
+
+A snapshot is a gzip stream of length-prefixed frames. Each frame holds one value encoded with a
+small msgpack-like codec: a header, then for every model a section with its column names followed
+by chunks of rows stored column by column. Models go in the order required by the PROTECT foreign
+keys and departments parents first, so a snapshot is loaded with chunked `bulk_create`.
+"""
+
+import gzip
+import struct
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import chain, islice
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Model, QuerySet
+
+from django_org import outbox, replicas
+from django_org.exceptions import SnapshotError
+from django_org.history import LOGGED_MODELS
+from django_org.settings import (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_PERSON,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT,
+    DJANGO_ORG_CALENDAR_EXCEPTION
+)
+from django_org.sharding import shard_for
+
+
+__all__ = (
+    'dump',
+    'load',
+)
+
+
+MAGIC = b'DJORG'
+VERSION = 1
+CHUNK_SIZE = 5000
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _DATE, _DATETIME, _LIST = range(10)
+_DOUBLE = struct.Struct('<d')
+_LENGTH = struct.Struct('<I')
+
+
+def _write_uint(buf: bytearray, n: int):
+    while n > 0x7f:
+        buf.append(n & 0x7f | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _read_uint(data: bytes, i: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        n |= (b & 0x7f) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _encode(buf: bytearray, value: Any):
+    if value is None:
+        buf.append(_NONE)
+    elif value is True:
+        buf.append(_TRUE)
+    elif value is False:
+        buf.append(_FALSE)
+    elif isinstance(value, int):
+        buf.append(_INT)
+        _write_uint(buf, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        buf.append(_FLOAT)
+        buf += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        value = value.encode()
+        buf.append(_STR)
+        _write_uint(buf, len(value))
+        buf += value
+    elif isinstance(value, bytes):
+        buf.append(_BYTES)
+        _write_uint(buf, len(value))
+        buf += value
+    elif isinstance(value, datetime):
+        buf.append(_DATETIME)
+        _encode(buf, value.isoformat())
+    elif isinstance(value, date):
+        buf.append(_DATE)
+        _write_uint(buf, value.toordinal())
+    elif isinstance(value, (list, tuple)):
+        buf.append(_LIST)
+        _write_uint(buf, len(value))
+        for v in value:
+            _encode(buf, v)
+    else:
+        raise SnapshotError(f'Unsupported value type: {type(value).__name__}')
+
+
+def _decode(data: bytes, i: int = 0) -> Tuple[Any, int]:
+    tag = data[i]
+    i += 1
+    if tag == _NONE:
+        return None, i
+    if tag == _TRUE:
+        return True, i
+    if tag == _FALSE:
+        return False, i
+    if tag == _INT:
+        n, i = _read_uint(data, i)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), i
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, i)[0], i + _DOUBLE.size
+    if tag in (_STR, _BYTES):
+        n, i = _read_uint(data, i)
+        value = data[i:i + n]
+        return (value.decode() if tag == _STR else bytes(value)), i + n
+    if tag == _DATE:
+        n, i = _read_uint(data, i)
+        return date.fromordinal(n), i
+    if tag == _DATETIME:
+        value, i = _decode(data, i)
+        return datetime.fromisoformat(value), i
+    if tag == _LIST:
+        n, i = _read_uint(data, i)
+        items = []
+        for _ in range(n):
+            value, i = _decode(data, i)
+            items.append(value)
+        return items, i
+    raise SnapshotError(f'Unknown tag {tag}')
+
+
+def _write_frame(stream: BinaryIO, value: Any):
+    buf = bytearray()
+    _encode(buf, value)
+    stream.write(_LENGTH.pack(len(buf)))
+    stream.write(buf)
+
+
+def _read(stream: BinaryIO, n: int) -> bytes:
+    try:
+        return stream.read(n)
+    except (OSError, EOFError) as e:
+        raise SnapshotError(f'Corrupted snapshot: {e}')
+
+
+def _read_frames(stream: BinaryIO) -> Iterator[Any]:
+    while header := _read(stream, _LENGTH.size):
+        if len(header) < _LENGTH.size:
+            raise SnapshotError('Truncated snapshot')
+        (n,) = _LENGTH.unpack(header)
+        data = _read(stream, n)
+        if len(data) < n:
+            raise SnapshotError('Truncated snapshot')
+        yield _decode(data)[0]
+
+
+def _columns(model) -> List[str]:
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _querysets(enterprise: Model) -> Iterator[Tuple[Any, QuerySet]]:
+    """(model, queryset or list of id chunks) in load order."""
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+    Person = apps.get_model(DJANGO_ORG_PERSON)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+
+    yield Enterprise, Enterprise.objects.for_enterprise(enterprise)
+    for label in (DJANGO_ORG_POST, DJANGO_ORG_DEPARTMENT_TYPE):
+        model = apps.get_model(label)
+        yield model, model.objects.for_enterprise(enterprise).order_by('pk')
+
+    # Parents go before children
+    children = defaultdict(list)
+    for pk, parent_id in Department.objects.for_enterprise(enterprise).values_list('id', 'parent_id').order_by('pk'):
+        children[parent_id].append(pk)
+    ids = list(children[None])
+    for pk in ids:
+        ids.extend(children[pk])
+    for i in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[i:i + CHUNK_SIZE]
+        rows = {row.pk: row for row in Department.objects.for_enterprise(enterprise).filter(pk__in=chunk).order_by()}
+        yield Department, [rows[pk] for pk in chunk]
+
+    for label in (DJANGO_ORG_WORK_MODE, DJANGO_ORG_WORK_SHIFT):
+        model = apps.get_model(label)
+        yield model, model.objects.for_enterprise(enterprise).order_by('pk')
+    employees = Employee.objects.for_enterprise(enterprise)
+    yield Person, Person.objects.for_enterprise(enterprise).filter(pk__in=employees.values('person_id')).order_by('pk')
+    yield Employee, employees.order_by('pk')
+    for label in (DJANGO_ORG_WORK_MODE_ASSIGNMENT, DJANGO_ORG_CALENDAR_EXCEPTION):
+        model = apps.get_model(label)
+        yield model, model.objects.for_enterprise(enterprise).order_by('pk')
+
+
+def dump(enterprise: Model, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write a snapshot of the enterprise, return the number of rows.
+
+    People are exported without their users.
+    """
+    Person = apps.get_model(DJANGO_ORG_PERSON)
+    total = 0
+    current = None
+    with gzip.GzipFile(fileobj=stream, mode='wb') as gz:
+        _write_frame(gz, [MAGIC, VERSION])
+        for model, rows in _querysets(enterprise):
+            columns = _columns(model)
+            if model is not current:
+                _write_frame(gz, ['model', model._meta.label, columns])
+                current = model
+            if isinstance(rows, QuerySet):
+                rows = rows.values_list(*columns).iterator(chunk_size=chunk_size)
+            else:
+                rows = ([getattr(obj, c) for c in columns] for obj in rows)
+
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    total += _write_rows(gz, model, columns, chunk, Person)
+                    chunk = []
+            if chunk:
+                total += _write_rows(gz, model, columns, chunk, Person)
+        _write_frame(gz, ['end', total])
+    return total
+
+
+def _write_rows(stream: BinaryIO, model, columns: List[str], rows: list, person_model) -> int:
+    cols = [list(col) for col in zip(*rows)]
+    if model is person_model and 'user_id' in columns:
+        cols[columns.index('user_id')] = [None] * len(rows)
+    _write_frame(stream, ['rows', cols])
+    return len(rows)
+
+
+def _check_new(model, pks: List[int], using: str):
+    """Refuse rows whose primary keys are taken, e.g. the enterprise or people already imported."""
+    size = connections[using].features.max_query_params or len(pks)
+    taken = []
+    for i in range(0, len(pks), size):
+        taken += model._base_manager.using(using).filter(pk__in=pks[i:i + size]).values_list('pk', flat=True)
+    if taken:
+        ids = ', '.join(map(str, sorted(taken)[:10]))
+        raise SnapshotError(f'{model._meta.label} rows already exist: {ids}{", ..." if len(taken) > 10 else ""}')
+
+
+def _publish_creates(model, pks: List[int], using: str):
+    size = connections[using].features.max_query_params or len(pks)
+    for i in range(0, len(pks), size):
+        outbox.publish_creates(model.objects.using(using).filter(pk__in=pks[i:i + size]))
+
+
+def _enterprise_db(first: list) -> str:
+    """The database of the enterprise of the snapshot, whose row comes first."""
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    enterprise_id = None
+    if len(first) == 2 and first[0][:2] == ['model', Enterprise._meta.label] and first[1][0] == 'rows':
+        columns, rows = first[0][2], first[1][1]
+        if Enterprise._meta.pk.attname in columns and rows and rows[0]:
+            enterprise_id = rows[columns.index(Enterprise._meta.pk.attname)][0]
+    if enterprise_id is None:
+        return router.db_for_write(Enterprise)
+    return router.db_for_write(Enterprise, shard=shard_for(enterprise_id))
+
+
+def load(stream: BinaryIO, using: Optional[str] = None, batch_size: int = CHUNK_SIZE) -> int:
+    """Load a snapshot keeping the primary keys, return the number of rows.
+
+    The rows go to the shard of the enterprise unless `using` is given.
+    """
+    total = 0
+    model = columns = None
+    models = []
+    with gzip.GzipFile(fileobj=stream, mode='rb') as gz:
+        frames = _read_frames(gz)
+        header = next(frames, None)
+        if header != [MAGIC, VERSION]:
+            raise SnapshotError('Not a snapshot or unsupported version')
+
+        if using is None:
+            first = list(islice(frames, 2))
+            using = _enterprise_db(first)
+            frames = chain(first, frames)
+        with transaction.atomic(using=using):
+            for frame in frames:
+                kind = frame[0]
+                if kind == 'model':
+                    _, label, columns = frame
+                    model = apps.get_model(label)
+                    missing = set(columns) - set(_columns(model))
+                    if missing:
+                        raise SnapshotError(f'{label} has no fields {", ".join(sorted(missing))}')
+                    models.append(model)
+                elif kind == 'rows':
+                    objs = [model(**dict(zip(columns, row))) for row in zip(*frame[1])]
+                    _check_new(model, [obj.pk for obj in objs], using)
+                    try:
+                        with transaction.atomic(using=using):
+                            model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+                    except IntegrityError as e:
+                        raise SnapshotError(f'{model._meta.label} rows conflict with the database: {e}')
+                    if outbox.is_connected() and model._meta.label in LOGGED_MODELS:
+                        _publish_creates(model, [obj.pk for obj in objs], using)
+                    total += len(objs)
+                elif kind == 'end':
+                    if frame[1] != total:
+                        raise SnapshotError('Truncated snapshot')
+                    break
+            else:
+                raise SnapshotError('Truncated snapshot')
+
+            connection = connections[using]
+            sql = connection.ops.sequence_reset_sql(no_style(), models)
+            if sql:
+                with connection.cursor() as cursor:
+                    for line in sql:
+                        cursor.execute(line)
+    replicas.pin(using)
+    return total
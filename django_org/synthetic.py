@@ -0,0 +1,218 @@
+"""Deterministic synthetic org data for load and scale testing.
+
+`generate` fills the django_org models from a seed with bulk inserts: enterprises in several time
+zones, department trees of a given size and depth, work modes with day, overnight and multi-day
+cycle shifts (including an overnight first shift, `start > end` with number 1), and people employed
+in random departments with a work mode each. The same seed and shape give the same data.
+"""
+
+import random
+from datetime import date
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from django_org.exceptions import SyntheticDataError
+from django_org.instrumentation import instrument
+from django_org.settings import (
+    DJANGO_ORG_ENTERPRISE,
+    DJANGO_ORG_POST,
+    DJANGO_ORG_WORK_MODE,
+    DJANGO_ORG_WORK_SHIFT,
+    DJANGO_ORG_DEPARTMENT_TYPE,
+    DJANGO_ORG_DEPARTMENT,
+    DJANGO_ORG_PERSON,
+    DJANGO_ORG_EMPLOYEE,
+    DJANGO_ORG_WORK_MODE_ASSIGNMENT
+)
+from django_org.sharding import shard_for, shards
+
+
+__all__ = (
+    'Shape',
+    'PRODUCTION',
+    'SHIFT_TEMPLATES',
+    'generate',
+)
+
+
+H = 3600
+
+TIME_ZONES = ('UTC', 'Europe/Berlin', 'Europe/Moscow', 'America/New_York', 'Asia/Tokyo', 'Australia/Sydney')
+
+# (cycle length, [(cycle day, name, start, end)]), shifts are numbered in order
+SHIFT_TEMPLATES = (
+    (1, [(0, 'Day', 9 * H, 18 * H)]),
+    (1, [(0, 'Day', 8 * H, 20 * H), (0, 'Night', 20 * H, 8 * H)]),
+    (1, [(0, 'Night', 22 * H, 6 * H), (0, 'Morning', 6 * H, 14 * H), (0, 'Evening', 14 * H, 22 * H)]),
+    (4, [(0, 'Day1', 8 * H, 20 * H), (1, 'Day2', 8 * H, 20 * H),
+         (2, 'Night1', 20 * H, 8 * H), (3, 'Night2', 20 * H, 8 * H)]),
+    (7, [(day, f'Day{day + 1}', 9 * H, 18 * H) for day in range(5)]),
+)
+OVERNIGHT_TEMPLATES = [t for t in SHIFT_TEMPLATES if any(start > end for _, _, start, end in t[1])]
+DAY_TEMPLATES = [t for t in SHIFT_TEMPLATES if t not in OVERNIGHT_TEMPLATES]
+
+FIRST_NAMES = ('Anna', 'Boris', 'Clara', 'Dmitry', 'Elena', 'Felix', 'Galina', 'Hugo', 'Irina', 'Jonas',
+               'Kira', 'Leon', 'Maria', 'Nikolai', 'Olga', 'Pavel', 'Rosa', 'Sergei', 'Tatiana', 'Viktor')
+LAST_NAMES = ('Ivanov', 'Schmidt', 'Smith', 'Tanaka', 'Petrov', 'Garcia', 'Muller', 'Kowalski', 'Novak', 'Rossi',
+              'Popov', 'Jensen', 'Sato', 'Fischer', 'Volkov', 'Brown', 'Weber', 'Lebedev', 'Moreau', 'Silva')
+
+
+class Shape(NamedTuple):
+    """Size and shape of a dataset, the counts except `enterprises` are per enterprise."""
+    enterprises: int = 50
+    departments: int = 800
+    depth: int = 12
+    people: int = 40000
+    work_modes: int = 60
+    posts: int = 40
+    overnight: float = 0.5
+    start: date = date(2024, 1, 1)
+
+
+PRODUCTION = Shape()
+
+
+class _Ids:
+    """Primary keys allocated past the existing rows, so the rows are inserted with their keys."""
+
+    def __init__(self, using: str):
+        self.using = using
+        self.next: Dict[type, int] = {}
+
+    def take(self, model, count: int) -> range:
+        if model not in self.next:
+            self.next[model] = (model.objects.using(self.using).aggregate(m=Max('pk'))['m'] or 0) + 1
+        start = self.next[model]
+        self.next[model] += count
+        return range(start, start + count)
+
+
+def _tree(rng: random.Random, count: int, depth: int) -> List[Tuple[Optional[int], int]]:
+    """(parent index, level) of `count` nodes in creation order, a chain makes it `depth` deep."""
+    nodes, open_ = [], []
+    for i in range(count):
+        if i < depth:
+            parent = i - 1 if i else None
+        else:
+            parent = open_[rng.randrange(len(open_))] if open_ else None
+        level = nodes[parent][1] + 1 if parent is not None else 0
+        nodes.append((parent, level))
+        if level < depth - 1:
+            open_.append(i)
+    return nodes
+
+
+def _batches(count: int, size: int) -> Iterator[range]:
+    for start in range(0, count, size):
+        yield range(start, min(start + size, count))
+
+
+def _enterprise(rng: random.Random, shape: Shape, enterprise, using: str, ids: _Ids, batch_size: int,
+                counts: Dict[str, int]):
+    Post = apps.get_model(DJANGO_ORG_POST)
+    WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+    WorkShift = apps.get_model(DJANGO_ORG_WORK_SHIFT)
+    DepartmentType = apps.get_model(DJANGO_ORG_DEPARTMENT_TYPE)
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+    Person = apps.get_model(DJANGO_ORG_PERSON)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+    WorkModeAssignment = apps.get_model(DJANGO_ORG_WORK_MODE_ASSIGNMENT)
+    eid = enterprise.pk
+
+    def insert(objs):
+        if objs:
+            objs[0].__class__.objects.using(using).bulk_create(objs, batch_size=batch_size)
+            counts[objs[0]._meta.label] = counts.get(objs[0]._meta.label, 0) + len(objs)
+
+    posts = ids.take(Post, shape.posts)
+    insert([Post(pk=pk, enterprise_id=eid, name=f'Post{i + 1}') for i, pk in enumerate(posts)])
+
+    types = ids.take(DepartmentType, shape.depth)
+    insert([DepartmentType(pk=pk, enterprise_id=eid, name=f'Level{i + 1}') for i, pk in enumerate(types)])
+
+    departments = ids.take(Department, shape.departments)
+    insert([
+        Department(pk=pk, enterprise_id=eid, department_type_id=types[level], name=f'Department{i + 1}',
+                   parent_id=departments[parent] if parent is not None else None)
+        for i, (pk, (parent, level)) in enumerate(zip(departments, _tree(rng, shape.departments, shape.depth)))
+    ])
+
+    work_modes = ids.take(WorkMode, shape.work_modes)
+    modes, shifts = [], []
+    for i, pk in enumerate(work_modes):
+        templates = OVERNIGHT_TEMPLATES if rng.random() < shape.overnight else DAY_TEMPLATES
+        cycle_length, template = rng.choice(templates)
+        modes.append(WorkMode(pk=pk, enterprise_id=eid, name=f'WorkMode{i + 1}',
+                              cycle_length=cycle_length, cycle_start=shape.start))
+        for number, (day, name, start, end) in enumerate(template, 1):
+            shifts.append(WorkShift(enterprise_id=eid, work_mode_id=pk, name=name, number=number,
+                                    day=day, start=start, end=end))
+    insert(modes)
+    for pk, shift in zip(ids.take(WorkShift, len(shifts)), shifts):
+        shift.pk = pk
+    insert(shifts)
+
+    people = ids.take(Person, shape.people)
+    employees = ids.take(Employee, shape.people)
+    assignments = ids.take(WorkModeAssignment, shape.people)
+    for batch in _batches(shape.people, batch_size):
+        persons, staff, roster = [], [], []
+        for i in batch:
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            middle_name = f'{rng.choice(FIRST_NAMES)}ovich' if rng.random() < 0.5 else ''
+            persons.append(Person(
+                pk=people[i], first_name=first_name, middle_name=middle_name, last_name=last_name,
+                short_name=Person._short_name(last_name, first_name, middle_name),
+                full_name=Person._full_name(last_name, first_name, middle_name),
+            ))
+            staff.append(Employee(pk=employees[i], enterprise_id=eid, person_id=people[i],
+                                  department_id=rng.choice(departments), post_id=rng.choice(posts)))
+            roster.append(WorkModeAssignment(pk=assignments[i], enterprise_id=eid, employee_id=employees[i],
+                                             work_mode_id=rng.choice(work_modes), date_from=shape.start))
+        insert(persons)
+        insert(staff)
+        insert(roster)
+
+
+@instrument('synthetic.generate')
+def generate(shape: Shape = PRODUCTION, seed: int = 0, using: Optional[str] = None,
+             batch_size: int = 5000, prefix: str = 'Synthetic') -> Dict[str, int]:
+    """Generate a dataset, enterprises go to their shards. Returns the number of rows by model.
+
+    The enterprises are named `{prefix}{seed}-{n}`, a name taken already raises `SyntheticDataError`:
+    generate more data with the same seed under another prefix.
+    """
+    Enterprise = apps.get_model(DJANGO_ORG_ENTERPRISE)
+    rng = random.Random(seed)
+    using = using or router.db_for_write(Enterprise)
+    databases = {db or using for db in shards()} | {using}
+    names = [f'{prefix}{seed}-{i + 1}' for i in range(shape.enterprises)]
+    taken = sorted(name for db in databases
+                   for name in Enterprise.objects.using(db).filter(name__in=names).values_list('name', flat=True))
+    if taken:
+        raise SyntheticDataError(f'Enterprises {", ".join(taken)} already exist, use another prefix or seed')
+    first = max(Enterprise.objects.using(db).aggregate(m=Max('pk'))['m'] or 0 for db in databases) + 1
+
+    counts, allocators = {}, {}
+    for i in range(shape.enterprises):
+        enterprise = Enterprise(pk=first + i, name=names[i], time_zone=rng.choice(TIME_ZONES))
+        db = shard_for(enterprise.pk) or using
+        ids = allocators.setdefault(db, _Ids(db))
+        with transaction.atomic(using=db):
+            Enterprise.objects.using(db).bulk_create([enterprise])
+            counts[Enterprise._meta.label] = counts.get(Enterprise._meta.label, 0) + 1
+            _enterprise(rng, shape, enterprise, db, ids, batch_size, counts)
+
+    generated = [apps.get_model(label) for label in counts]
+    for db in allocators:
+        connection = connections[db]
+        sql = connection.ops.sequence_reset_sql(no_style(), generated)
+        if sql:
+            with connection.cursor() as cursor:
+                for line in sql:
+                    cursor.execute(line)
+    return counts
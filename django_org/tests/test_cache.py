@@ -0,0 +1,84 @@
+import datetime
+import io
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from django_org import cache, models
+from django_org.apps import _serves_requests
+
+
+class CacheTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch('django_org.cache.DJANGO_ORG_CACHE', 'default')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        caches['default'].clear()
+        cache.connect()
+        self.addCleanup(cache.disconnect)
+
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Moscow')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.plant = models.Department.objects.create(department_type=dt, name='Plant')
+        self.shop = models.Department.objects.create(department_type=dt, parent=self.plant, name='Shop1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=28800, end=72000)
+
+    def test_warm(self):
+        report = cache.warm(concurrency=1)
+        self.assertEqual(report.enterprises, 1)
+        self.assertGreater(report.peak_memory, 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.time_zone(self.enterprise.pk), 'Europe/Moscow')
+            table = cache.shift_tables(self.enterprise.pk)[self.wm.pk]
+            self.assertEqual(len(list(table.day_occurrences(datetime.date(2024, 1, 1)))), 1)
+            self.assertEqual(self.plant.subtree_ids(), [self.plant.pk, self.shop.pk])
+
+    def test_shift_resolution(self):
+        cache.warm(concurrency=1)
+        wm = models.WorkMode.objects.get()
+        now = datetime.datetime(2024, 1, 1, 12, tzinfo=datetime.timezone.utc)
+        with self.assertNumQueries(0):
+            shift = wm.get_shift(now)
+            self.assertEqual((shift.start_time.hour, shift.end_time.hour), (8, 20))
+            self.assertEqual(shift.next().shift_day, datetime.date(2024, 1, 2))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.enterprise.get_shifts(now)), 1)
+
+    def test_stale_tables(self):
+        cache.warm(concurrency=1)
+        # Created by another process, the cache is not invalidated
+        cache.disconnect()
+        wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode2')
+        models.WorkShift.objects.create(work_mode=wm, name='Night', number=1, start=72000, end=28800)
+        wm = models.WorkMode.objects.get(pk=wm.pk)
+        now = datetime.datetime(2024, 1, 1, 20, tzinfo=datetime.timezone.utc)
+        shift = wm.get_shift(now)
+        self.assertEqual(shift.name, 'Night')
+        self.assertEqual(shift.next().start_time - shift.start_time, datetime.timedelta(days=1))
+
+    def test_warm_on_ready(self):
+        for argv, expected in ((['manage.py', 'migrate'], False), (['manage.py', 'runserver'], True),
+                               (['gunicorn', 'conf.wsgi'], True)):
+            with mock.patch('sys.argv', argv):
+                self.assertEqual(_serves_requests(), expected)
+
+    def test_invalidation(self):
+        cache.warm(concurrency=1)
+        models.Department.objects.create(department_type=self.plant.department_type, parent=self.shop, name='Area')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.plant.subtree_ids()), 3)
+
+        models.WorkShift.objects.create(work_mode=self.wm, name='Night', number=2, start=72000, end=28800)
+        table = cache.shift_tables(self.enterprise)[self.wm.pk]
+        self.assertEqual(len(list(table.day_occurrences(datetime.date(2024, 1, 1)))), 2)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('warm_django_org', str(self.enterprise.pk), stdout=out)
+        self.assertIn('Warmed 1 enterprises', out.getvalue())
+        with mock.patch('django_org.cache.DJANGO_ORG_CACHE', None), self.assertRaises(CommandError):
+            call_command('warm_django_org', stdout=out)
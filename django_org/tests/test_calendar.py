@@ -0,0 +1,94 @@
+import datetime
+
+from django.test import TestCase
+
+from django_org import models
+from django_org.calendar_index import CalendarIndex
+from django_org.const import HOUR1, SECONDS_IN_DAY
+from django_org.exceptions import ShiftOverrideError
+from django_org.utils import _datetime
+
+
+class CalendarIndexTest(TestCase):
+    def test_lookup(self):
+        index = CalendarIndex([
+            (datetime.date(2024, 1, 1), None, None, None),
+            (datetime.date(2024, 12, 31), None, None, None),
+            (datetime.date(2025, 3, 8), 7, None, None),
+            (datetime.date(2025, 3, 9), 7, 3600, 7200),
+        ])
+        self.assertTrue(index.is_day_off(datetime.date(2024, 1, 1)))
+        self.assertTrue(index.is_day_off(datetime.date(2024, 12, 31)))
+        self.assertFalse(index.is_day_off(datetime.date(2024, 1, 2)))
+        self.assertFalse(index.is_day_off(datetime.date(2023, 12, 31)))
+        self.assertTrue(index.is_off(datetime.date(2025, 3, 8), 7))
+        self.assertFalse(index.is_off(datetime.date(2025, 3, 8), 8))
+        self.assertEqual(index.override(datetime.date(2025, 3, 9), 7), (3600, 7200))
+        self.assertIsNone(index.override(datetime.date(2025, 3, 9), 8))
+        self.assertFalse(CalendarIndex())
+
+
+class CalendarExceptionTest(TestCase):
+    N08 = 8 * HOUR1.total_seconds()
+    N20 = 20 * HOUR1.total_seconds()
+    H08 = datetime.timedelta(seconds=N08)
+    H20 = datetime.timedelta(seconds=N20)
+
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.day = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Day', number=1, start=self.N08, end=self.N20)
+        self.night = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Night', number=2, start=self.N20, end=self.N08)
+        self.holiday = datetime.date(2024, 5, 1)
+        self.day_start = _datetime(self.holiday, tzinfo=self.enterprise.tz)
+        models.CalendarException.objects.create(enterprise=self.enterprise, day=self.holiday, name='Labour day')
+
+    def test_get_shift(self):
+        self.assertIsNone(self.wm.get_shift(self.day_start + self.H08 + HOUR1))
+        self.assertIsNone(self.wm.get_shift(self.day_start + self.H20 + HOUR1))
+        shift = self.wm.get_shift(self.day_start + HOUR1)
+        self.assertEqual(shift.id, self.night.id)
+        self.assertEqual(shift.shift_day, self.holiday - datetime.timedelta(days=1))
+
+    def test_step(self):
+        shift = self.wm.get_shift(self.day_start + HOUR1)
+        with self.assertNumQueries(1):
+            shift = shift.next()
+            self.assertEqual(shift.id, self.day.id)
+            self.assertEqual(shift.start_time, self.day_start + SECONDS_IN_DAY + self.H08)
+            shift = shift.prev()
+            self.assertEqual(shift.id, self.night.id)
+            self.assertEqual(shift.end_time, self.day_start + self.H08)
+
+        shifts = self.wm.get_shift(self.day_start + self.H08, limit=2)
+        self.assertEqual(shifts[0].start_time, self.day_start + SECONDS_IN_DAY + self.H08)
+
+    def test_long_closure(self):
+        days = [datetime.date(2024, 1, 1) + datetime.timedelta(days=i) for i in range(366)]
+        models.CalendarException.objects.bulk_create(
+            models.CalendarException(enterprise=self.enterprise, day=day) for day in days if day != self.holiday)
+        self.wm._calendar = None
+
+        shift = self.wm.get_shift(
+            _datetime(datetime.date(2023, 12, 31), tzinfo=self.enterprise.tz) + self.H20 + HOUR1).next()
+        self.assertEqual((shift.id, shift.shift_day), (self.day.id, datetime.date(2025, 1, 1)))
+        shift = shift.prev()
+        self.assertEqual((shift.id, shift.shift_day), (self.night.id, datetime.date(2023, 12, 31)))
+
+    def test_shift_exceptions(self):
+        day = self.holiday + datetime.timedelta(days=1)
+        day_start = self.day_start + SECONDS_IN_DAY
+        models.CalendarException.objects.create(enterprise=self.enterprise, day=day, work_shift=self.night)
+        models.CalendarException.objects.create(
+            enterprise=self.enterprise, day=day, work_shift=self.day, start=self.N08, end=self.N20 + 3600)
+
+        shift = self.wm.get_shift(day_start + self.H08)
+        self.assertEqual((shift.start_time, shift.end_time), (day_start + self.H08, day_start + self.H20 + HOUR1))
+        shift = shift.next()
+        self.assertEqual(shift.id, self.day.id)
+        self.assertEqual(shift.start_time, day_start + SECONDS_IN_DAY + self.H08)
+
+        with self.assertRaises(ShiftOverrideError):
+            models.CalendarException.objects.create(enterprise=self.enterprise, day=day, start=0, end=3600)
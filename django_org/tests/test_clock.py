@@ -0,0 +1,53 @@
+import datetime
+
+from django.test import TestCase
+
+from django_org import clock, history, models, outbox
+from django_org.exceptions import NaiveTimeSettingError
+
+
+class ClockTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=8 * 3600, end=20 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm, name='Night', number=2, start=20 * 3600, end=8 * 3600)
+        self.at = datetime.datetime(2024, 3, 4, 12, tzinfo=datetime.timezone.utc)
+
+    def test_frozen(self):
+        with clock.frozen(self.at) as at:
+            self.assertEqual(at, self.at)
+            self.assertEqual(clock.now(), self.at)
+            with clock.frozen() as inner:
+                self.assertEqual(inner, self.at)
+            with clock.frozen(self.at + datetime.timedelta(hours=1)):
+                self.assertEqual(clock.now(), self.at + datetime.timedelta(hours=1))
+        self.assertNotEqual(clock.now(), self.at)
+
+        with self.assertRaises(NaiveTimeSettingError):
+            with clock.frozen(datetime.datetime(2024, 3, 4)):
+                pass
+
+    def test_replay(self):
+        with clock.frozen(self.at):
+            shifts = self.wm.get_shift(self.at, limit=5)
+            self.assertEqual(self.wm.get_shift(self.at).next().now, self.at)
+        self.assertEqual({s.now for s in shifts}, {self.at})
+        self.assertEqual([s.is_current for s in shifts], [True, False, False, False, False])
+
+        # A stepping clock is read once per batch
+        ticks = iter(self.at + datetime.timedelta(hours=h) for h in range(0, 48, 12))
+        with clock.use(lambda: next(ticks)):
+            shifts = self.wm.get_shift(self.at, limit=4)
+            self.assertEqual(clock.now(), self.at + datetime.timedelta(hours=12))
+        self.assertEqual({s.now for s in shifts}, {self.at})
+
+    def test_log_times(self):
+        history.connect()
+        self.addCleanup(history.disconnect)
+        outbox.connect()
+        self.addCleanup(outbox.disconnect)
+        with clock.frozen(self.at):
+            models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        self.assertEqual(models.ChangeLogEntry.objects.get().changed_at, self.at)
+        self.assertEqual(models.OutboxMessage.objects.get().created_at, self.at)
@@ -0,0 +1,61 @@
+import datetime
+
+from django.test import TestCase
+
+from django_org import coverage, models
+
+
+class CoverageTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.root = models.Department.objects.create(department_type=dt, name='Plant')
+        self.child = models.Department.objects.create(department_type=dt, parent=self.root, name='Shop1')
+        self.other = models.Department.objects.create(department_type=dt, name='Office')
+
+        self.wm1 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.wm2 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode2')
+        self.day = models.WorkShift.objects.create(
+            work_mode=self.wm1, name='Day', number=1, start=8 * 3600, end=20 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm1, name='Night', number=2, start=20 * 3600, end=8 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm2, name='Day', number=1, start=9 * 3600, end=18 * 3600)
+
+        self.start = datetime.date(2024, 3, 4)
+        for i, (department, wm, date_to) in enumerate([
+            (self.root, self.wm1, None),
+            (self.child, self.wm1, self.start + datetime.timedelta(days=2)),
+            (self.child, self.wm2, None),
+            (self.other, self.wm2, None),
+        ]):
+            person = models.Person.objects.create(first_name=f'Name{i}', last_name=f'Last{i}')
+            employee = models.Employee.objects.create(department=department, post=self.post, person=person)
+            models.WorkModeAssignment.objects.create(
+                employee=employee, work_mode=wm, date_from=self.start - datetime.timedelta(days=30), date_to=date_to)
+
+    def test_enterprise(self):
+        with self.assertNumQueries(5):
+            grid = coverage.coverage(self.enterprise, start=self.start, days=14,
+                                     targets={(self.root.pk, self.day.pk): 2})
+        self.assertEqual(grid.departments, [self.root.pk, self.other.pk, self.child.pk])
+        self.assertEqual(len(grid.occurrences), 3 * 14)
+        self.assertEqual([o.start for o in grid.occurrences], sorted(o.start for o in grid.occurrences))
+
+        root, other, child = grid.headcount
+        for j, o in enumerate(grid.occurrences):
+            early = o.shift_day <= self.start + datetime.timedelta(days=2)
+            if o.work_mode_id == self.wm1.pk:
+                self.assertEqual((root[j], child[j], other[j]), (2 if early else 1, 1 if early else 0, 0))
+            else:
+                self.assertEqual((root[j], child[j], other[j]), (1, 1, 1))
+
+        shortfall = grid.shortfall()[0]
+        days = [j for j, o in enumerate(grid.occurrences) if o.shift_id == self.day.pk]
+        self.assertEqual([shortfall[j] for j in days], [0] * 3 + [1] * 11)
+        self.assertEqual(len(list(grid.rows())), 3 * 3 * 14)
+
+    def test_department(self):
+        grid = coverage.coverage(department=self.child, start=self.start, days=7)
+        self.assertEqual(grid.departments, [self.child.pk])
+        self.assertEqual(sum(grid.headcount[0]), 3 + 3 + 7)
+        self.assertEqual(sum(grid.target[0]), 0)
@@ -0,0 +1,93 @@
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_org import dedup, history, models
+
+
+class DedupTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.department = models.Department.objects.create(department_type=dt, name='Plant')
+
+        names = [
+            ('Ivan', 'Petrovich', 'Sidorov'),
+            ('ivan', '', 'Sidorov'),
+            ('Ivan', 'Petrovich', 'Sidorow'),
+            ('Sidorov', '', 'Ivan'),
+            ('José', '', 'Núñez'),
+            ('Jose', '', 'Nunez'),
+            ('Maria', '', 'Garcia'),
+            ('Anna', '', 'Schmidt'),
+        ]
+        self.people = [models.Person.objects.create(first_name=f, middle_name=m, last_name=l) for f, m, l in names]
+
+    def test_keys(self):
+        self.assertEqual(dedup.normalize('  Núñez-GARCÍA '), 'nunez garcia')
+        self.assertEqual(dedup.soundex('robert'), dedup.soundex('rupert'))
+        self.assertEqual(dedup.soundex('tymczak'), 't522')
+        self.assertIn('s:sidorov i.', dedup.blocking_keys('Sidorov', 'Ivan', 'Petrovich'))
+
+    def test_duplicates(self):
+        index = dedup.PersonIndex.build()
+        with mock.patch.object(dedup.PersonIndex, '_score', wraps=dedup.PersonIndex._score) as score:
+            groups = dedup.clusters(index.duplicates())
+        # Each pair sharing blocks is scored once
+        pairs = {frozenset((a, b)) for pks in index.blocks.values() for a in pks for b in pks if a != b}
+        self.assertEqual(score.call_count, len(pairs))
+        ids = [p.pk for p in self.people]
+        self.assertEqual(groups, [ids[0:4], ids[4:6]])
+
+        matches = index.match('Sidorov', 'Ivan')
+        self.assertIn((ids[1], 1.0), matches)
+        self.assertLessEqual({ids[0], ids[1], ids[3]}, {pk for pk, _ in matches})
+        self.assertEqual(index.match('Smith', 'John'), [])
+
+    def test_merge(self):
+        User = get_user_model()
+        keeper, duplicate, other = self.people[0], self.people[1], self.people[2]
+        duplicate.user = User.objects.create_user('ivan')
+        duplicate.save()
+        employee = models.Employee.objects.create(department=self.department, post=self.post, person=other)
+
+        merged = dedup.merge([[keeper.pk, duplicate.pk, other.pk]])
+        self.assertEqual(merged, dedup.Merged(2, 1, 1))
+        employee.refresh_from_db()
+        keeper.refresh_from_db()
+        self.assertEqual(employee.person_id, keeper.pk)
+        self.assertEqual(keeper.user.username, 'ivan')
+        self.assertFalse(models.Person.objects.filter(pk__in=[duplicate.pk, other.pk]).exists())
+
+    def test_conflict(self):
+        for person in self.people[4:6]:
+            models.Employee.objects.create(department=self.department, post=self.post, person=person)
+        conflict, ok = (self.people[4].pk, self.people[5].pk), (self.people[0].pk, self.people[1].pk)
+        merged = dedup.merge([conflict, ok])
+        self.assertEqual(merged, dedup.Merged(1, 0, 0, (conflict,)))
+        self.assertEqual(models.Person.objects.count(), len(self.people) - 1)
+        self.assertEqual(models.Person.objects.filter(pk__in=conflict).count(), 2)
+
+    def test_change_log(self):
+        history.connect()
+        self.addCleanup(history.disconnect)
+        keeper, duplicate = self.people[0], self.people[1]
+        duplicate.user = get_user_model().objects.create_user('ivan')
+        duplicate.save()
+        employee = models.Employee.objects.create(department=self.department, post=self.post, person=duplicate)
+        start = models.ChangeLogEntry.objects.last().id
+
+        dedup.merge([[keeper.pk, duplicate.pk]])
+        updates = models.ChangeLogEntry.objects.filter(id__gt=start, action=models.ChangeLogEntry.Action.UPDATE)
+        self.assertEqual(updates.get(model='django_org.Employee').object_id, employee.pk)
+        self.assertEqual(updates.get(model='django_org.Person').data['user_id'], duplicate.user_id)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('dedupe_people', merge=True, stdout=out)
+        self.assertIn('2 groups of duplicates among 8 people', out.getvalue())
+        self.assertEqual(models.Person.objects.count(), 4)
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_org import export, models
+from django_org.exceptions import DepartmentCycleError
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.plant = models.Department.objects.create(department_type=dt, name='Plant')
+        self.shop = models.Department.objects.create(department_type=dt, parent=self.plant, name='Shop1')
+        self.area = models.Department.objects.create(department_type=dt, parent=self.shop, name='Area1')
+        self.user = get_user_model().objects.create_user('manager', password='secret')
+        for i, department in enumerate((self.shop, self.area, self.plant)):
+            person = models.Person.objects.create(first_name=f'Name{i}', last_name='Last, "quoted"',
+                                                  user=self.user if i == 0 else None)
+            models.Employee.objects.create(department=department, post=post, person=person)
+
+    def test_department_paths(self):
+        paths = export.department_paths(models.Department.objects.all())
+        self.assertEqual(paths, {self.plant.pk: 'Plant', self.shop.pk: 'Plant / Shop1',
+                                 self.area.pk: 'Plant / Shop1 / Area1'})
+
+        # The ancestors outside the departments are read level by level
+        with self.assertNumQueries(3):
+            paths = export.department_paths(models.Department.objects.filter(pk=self.area.pk))
+        self.assertEqual(paths[self.area.pk], 'Plant / Shop1 / Area1')
+
+        models.Department.objects.filter(pk=self.plant.pk).update(parent=self.area)
+        with self.assertRaises(DepartmentCycleError):
+            export.department_paths(models.Department.objects.all())
+        with self.assertRaises(DepartmentCycleError):
+            export.employee_rows()
+
+    def test_rows(self):
+        with self.assertNumQueries(3):
+            rows = list(export.employee_rows(enterprise=self.enterprise, chunk_size=2))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][1:4], ('Enterprise1', 'Plant / Shop1 / Area1', 'Operator'))
+
+    def test_formats(self):
+        rows = list(export.employee_rows())
+        parsed = list(csv.reader(io.StringIO(''.join(export.to_csv(rows, chunk_size=2)))))
+        self.assertEqual(tuple(parsed[0]), export.COLUMNS)
+        self.assertEqual(parsed[1:], [[str(v) for v in row] for row in rows])
+        self.assertEqual(''.join(export.to_csv([])), ','.join(export.COLUMNS) + '\r\n')
+
+        lines = ''.join(export.to_jsonl(rows, chunk_size=2)).splitlines()
+        self.assertEqual(json.loads(lines[2])['department'], 'Plant')
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_employees', str(self.enterprise.pk), format='jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+    def test_view(self):
+        self.client.login(username='manager', password='secret')
+        self.assertEqual(self.client.get('/org/employees.csv').status_code, 403)
+
+        self.user.user_permissions.add(Permission.objects.get(codename='view_employee'))
+        response = self.client.get('/org/employees.csv')
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        # The header and the employees of the manager's subtree, with the paths from the roots
+        self.assertEqual(len(lines), 3)
+        self.assertIn('Plant / Shop1 / Area1', lines[2])
+        self.assertEqual(self.client.get('/org/employees.xml').status_code, 404)
+
+        # A cycle above the subtree is an error before any row is sent
+        office = models.Department.objects.create(department_type=self.plant.department_type, name='Office')
+        models.Department.objects.filter(pk=self.plant.pk).update(parent=office)
+        models.Department.objects.filter(pk=office.pk).update(parent=self.plant)
+        response = self.client.get('/org/employees.csv')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.streaming)
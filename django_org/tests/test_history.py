@@ -0,0 +1,125 @@
+import datetime
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from django_org import history, models
+from django_org.exceptions import ChangeLogError
+
+
+class HistoryTest(TestCase):
+    def setUp(self):
+        history.connect()
+        self.addCleanup(history.disconnect)
+
+        self.t0 = timezone.now()
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.plant = models.Department.objects.create(department_type=dt, name='Plant')
+        self.office = models.Department.objects.create(department_type=dt, name='Office')
+        self.shop = models.Department.objects.create(department_type=dt, parent=self.plant, name='Shop1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.shift = models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=28800, end=72000)
+
+    def at(self, minutes):
+        return self.t0 + datetime.timedelta(minutes=minutes)
+
+    def reorg(self):
+        # Entries are stamped at save time, move them to fixed points of time
+        models.ChangeLogEntry.objects.update(changed_at=self.at(1))
+        self.snapshot = history.take_snapshot(self.enterprise)
+
+        self.shop.parent = self.office
+        self.shop.save()
+        self.shift.end = 64800
+        self.shift.save()
+        models.ChangeLogEntry.objects.filter(id__gt=self.snapshot.last_change_id).update(changed_at=self.at(2))
+        models.WorkShift.objects.filter(pk=self.shift.pk).delete()
+        models.ChangeLogEntry.objects.filter(action=models.ChangeLogEntry.Action.DELETE).update(changed_at=self.at(3))
+
+    def test_log(self):
+        entries = models.ChangeLogEntry.objects.filter(model='django_org.Department')
+        self.assertEqual(entries.count(), 3)
+        entry = entries.last()
+        self.assertEqual((entry.enterprise_id, entry.object_id, entry.data['parent_id']),
+                         (self.enterprise.pk, self.shop.pk, self.plant.pk))
+        with self.assertRaises(ChangeLogError):
+            entry.save()
+        with self.assertRaises(ChangeLogError):
+            entry.delete()
+
+    def test_state_as_of(self):
+        self.reorg()
+        state = history.state_as_of(self.enterprise, self.at(1))
+        self.assertEqual(state.get(models.Department, self.shop.pk).parent_id, self.plant.pk)
+        self.assertEqual(state.get(models.WorkShift, self.shift.pk).end, 72000)
+
+        state = history.state_as_of(self.enterprise, self.at(2))
+        self.assertEqual(state.get(models.Department, self.shop.pk).parent_id, self.office.pk)
+        self.assertEqual([s.end for s in state.objects(models.WorkShift)], [64800])
+
+        with self.assertNumQueries(2):
+            state = history.state_as_of(self.enterprise, self.at(3))
+        self.assertEqual(state.objects(models.WorkShift), [])
+        self.assertEqual([d.name for d in state.objects('django_org.Department')], ['Plant', 'Office', 'Shop1'])
+
+    def test_snapshots(self):
+        self.reorg()
+        self.assertEqual(len(self.snapshot.data['django_org.Department']), 3)
+        snapshot = history.take_snapshot(self.enterprise)
+        self.assertEqual(snapshot.taken_at, self.at(3))
+        self.assertNotIn(str(self.shift.pk), snapshot.data['django_org.WorkShift'])
+        self.assertEqual(history.take_snapshot(self.enterprise), snapshot)
+
+        models.ChangeLogEntry.objects.filter(id__lte=snapshot.last_change_id).update(data=None)
+        state = history.state_as_of(self.enterprise, self.at(4))
+        self.assertEqual(state.get(models.Department, self.shop.pk).parent_id, self.office.pk)
+
+    def test_change_while_first_snapshot(self):
+        data = history._data
+
+        def concurrent(obj):
+            # Another transaction commits a change while the tables are read
+            if obj.pk == self.plant.pk and isinstance(obj, models.Department):
+                models.Department.objects.get(pk=self.shop.pk).save()
+            return data(obj)
+
+        with mock.patch('django_org.history._data', concurrent):
+            models.Department.objects.filter(pk=self.shop.pk).update(name='Shop2')
+            snapshot = history.take_snapshot(self.enterprise)
+        self.assertLess(snapshot.last_change_id, models.ChangeLogEntry.objects.last().id)
+        state = history.state_as_of(self.enterprise, timezone.now() + datetime.timedelta(minutes=1))
+        self.assertEqual(state.get(models.Department, self.shop.pk).name, 'Shop2')
+
+    def test_gap(self):
+        snapshot = history.take_snapshot(self.enterprise)
+        last = models.ChangeLogEntry.objects.last()
+        # A transaction holding the next id has not committed yet
+        models.ChangeLogEntry.objects.create(
+            id=last.id + 2, enterprise=self.enterprise, model='django_org.Department', object_id=self.shop.pk,
+            action=models.ChangeLogEntry.Action.UPDATE, data={**history._data(self.shop), 'name': 'Shop2'})
+        self.assertEqual(history.take_snapshot(self.enterprise), snapshot)
+
+        models.ChangeLogEntry.objects.create(
+            id=last.id + 1, enterprise=self.enterprise, model='django_org.Department', object_id=self.office.pk,
+            action=models.ChangeLogEntry.Action.DELETE)
+        snapshot = history.take_snapshot(self.enterprise)
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.last_change_id, last.id + 2)
+        self.assertEqual(snapshot.data['django_org.Department'][str(self.shop.pk)]['name'], 'Shop2')
+        self.assertNotIn(str(self.office.pk), snapshot.data['django_org.Department'])
+
+        # A gap older than the lag is a rolled back transaction
+        models.ChangeLogEntry.objects.create(
+            id=last.id + 4, enterprise=self.enterprise, model='django_org.Department', object_id=self.plant.pk,
+            action=models.ChangeLogEntry.Action.DELETE, changed_at=timezone.now() - datetime.timedelta(minutes=5))
+        self.assertEqual(history.take_snapshot(self.enterprise).last_change_id, last.id + 4)
+
+    def test_command(self):
+        call_command('take_org_snapshots', stdout=io.StringIO())
+        call_command('take_org_snapshots', str(self.enterprise.pk), stdout=io.StringIO())
+        self.assertEqual(models.ChangeLogSnapshot.objects.count(), 1)
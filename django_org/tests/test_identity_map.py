@@ -0,0 +1,64 @@
+import datetime
+
+from django.test import RequestFactory, TestCase
+
+from django_org import models
+from django_org.identity_map import IdentityMapMiddleware, _map, identity_map, is_active, remember
+
+
+class IdentityMapTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Berlin')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        for i in range(3):
+            models.Department.objects.create(department_type=dt, name=f'Shop{i}')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=8 * 3600, end=20 * 3600)
+
+    def test_queries(self):
+        departments = list(models.Department.objects.all())
+        with self.assertNumQueries(6):
+            [str(d) for d in departments]
+
+        departments = list(models.Department.objects.all())
+        # The enterprise and the department type once, then the post with the mapped enterprise
+        with identity_map(), self.assertNumQueries(3):
+            [str(d) for d in departments]
+            with identity_map():
+                self.assertEqual(models.Post.objects.get(pk=self.post.pk).enterprise.name, 'Enterprise1')
+        self.assertFalse(is_active())
+
+    def test_remember(self):
+        shift_time = datetime.datetime(2024, 3, 1, 12, tzinfo=datetime.timezone.utc)
+        with identity_map():
+            remember(models.Enterprise.objects.get(pk=self.enterprise.pk))
+            shift = models.WorkShift.objects.get()
+            # The work mode and its calendar, the enterprise is mapped
+            with self.assertNumQueries(2):
+                self.assertEqual(shift.work_shift(shift_time).start_time.hour, 8)
+                self.assertIs(shift.enterprise, shift.work_mode.enterprise)
+
+    def test_eviction(self):
+        departments = list(models.Department.objects.all())
+        with identity_map():
+            self.assertEqual(departments[0].enterprise.name, 'Enterprise1')
+            enterprise = models.Enterprise.objects.get()
+            enterprise.name = 'Renamed'
+            enterprise.save()
+            self.assertEqual(departments[1].enterprise.name, 'Renamed')
+
+            post = models.Post.objects.create(enterprise=self.enterprise, name='Fitter')
+            remember(post)
+            rows = _map.get()
+            self.assertIn((models.Post, 'default', post.pk), rows)
+            post.delete()
+            self.assertNotIn((models.Post, 'default', post.pk), rows)
+
+    def test_middleware(self):
+        def view(request):
+            self.assertTrue(is_active())
+            return 'response'
+
+        self.assertEqual(IdentityMapMiddleware(view)(RequestFactory().get('/')), 'response')
+        self.assertFalse(is_active())
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from django_org import instrumentation, models
+from django_org.signals import measured
+
+
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=8 * 3600, end=20 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm, name='Night', number=2, start=20 * 3600, end=8 * 3600)
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled(self):
+        collector = instrumentation.enable(instrumentation.Collector())
+        instrumentation.disable()
+        self.assertFalse(instrumentation.is_enabled())
+        self.wm.get_shift(timezone.now())
+        self.assertFalse(collector.counters)
+
+    def test_collector(self):
+        collector = instrumentation.enable(instrumentation.Collector())
+        shift = self.wm.get_shift(timezone.now())
+        shift.next()
+
+        self.assertEqual(collector.counters['django_org.work_mode.get_shift.calls'], 1)
+        self.assertGreater(collector.counters['django_org.work_mode.get_shift.queries'], 0)
+        self.assertEqual(collector.counters['django_org.work_shift.step.calls'], 1)
+        self.assertGreaterEqual(collector.counters['django_org.work_shift.borders.calls'], 2)
+        self.assertEqual(len(collector.timings['django_org.work_mode.get_shift.duration']), 1)
+
+        models.WorkShift.objects.create(work_mode=self.wm, name='Extra', number=3, start=0, end=3600)
+        self.assertEqual(collector.counters['django_org.work_shift.save.calls'], 1)
+
+    def test_signal(self):
+        instrumentation.enable()
+        received = []
+
+        def receiver(sender, name, duration, queries, **kwargs):
+            received.append((name, queries))
+
+        measured.connect(receiver)
+        try:
+            self.enterprise.get_shifts(timezone.now())
+        finally:
+            measured.disconnect(receiver)
+
+        names = [name for name, _ in received]
+        self.assertIn('enterprise.get_shifts', names)
+        self.assertIn('work_mode.get_shift', names)
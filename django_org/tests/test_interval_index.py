@@ -0,0 +1,52 @@
+import datetime
+import pickle
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from django_org import models
+from django_org.interval_index import IntervalIndex
+from django_org.schedule import Occurrence
+from django_org.utils import _datetime
+
+
+class IntervalIndexTest(SimpleTestCase):
+    def setUp(self):
+        rnd = random.Random(7)
+        self.occurrences = []
+        for i in range(500):
+            start = rnd.randrange(0, 100000)
+            self.occurrences.append(Occurrence(start, start + rnd.randrange(1, 3000), datetime.date(2024, 1, 1), i, 1, 1))
+        self.index = IntervalIndex(self.occurrences)
+
+    def test_queries(self):
+        rnd = random.Random(11)
+        for _ in range(200):
+            a = rnd.randrange(-1000, 101000)
+            b = a + rnd.randrange(1, 5000)
+            expected = sorted(o for o in self.occurrences if o.start < b and o.end > a)
+            self.assertEqual(self.index.overlapping(a, b), expected)
+            expected = sorted(o for o in self.occurrences if o.start <= a < o.end)
+            self.assertEqual(self.index.at(a), expected)
+        self.assertEqual(self.index.overlapping(5, 5), [])
+
+    def test_pickle(self):
+        index = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(len(index), len(self.index))
+        self.assertEqual(index.overlapping(0, 50000), self.index.overlapping(0, 50000))
+
+
+class EnterpriseIntervalIndexTest(TestCase):
+    def test_for_enterprise(self):
+        enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Moscow')
+        for i in range(3):
+            wm = models.WorkMode.objects.create(enterprise=enterprise, name=f'WorkMode{i}')
+            models.WorkShift.objects.create(work_mode=wm, name='Night', number=1, start=72000, end=28800)
+            models.WorkShift.objects.create(work_mode=wm, name='Day', number=2, start=28800, end=72000)
+
+        day = datetime.date(2024, 3, 1)
+        index = IntervalIndex.for_enterprise(enterprise.pk, day, day + datetime.timedelta(days=7))
+        noon = _datetime(day, tzinfo=enterprise.tz) + datetime.timedelta(hours=12)
+        self.assertTrue(index.covers(noon, noon + datetime.timedelta(days=1)))
+        self.assertEqual([o.number for o in index.at(noon)], [2, 2, 2])
+        self.assertEqual(len(index.overlapping(noon, noon + datetime.timedelta(hours=9))), 6)
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase
+
+from django_org import models
+from django_org.ordering import DISPLAY_ORDERING, display_order, join_free_order
+
+
+class OrderingTest(SimpleTestCase):
+    def django_org_models(self):
+        return [model for model in apps.get_app_config('django_org').get_models()]
+
+    @mock.patch('django_org.sharding.DJANGO_ORG_JOIN_FREE_ORDERING', False)
+    def test_default_ordering(self):
+        self.assertEqual(models.Department._meta.ordering, DISPLAY_ORDERING['AbstractDepartment'])
+        self.assertEqual(str(models.Department.objects.all().query),
+                         str(display_order(models.Department.objects.all()).query))
+
+    @mock.patch('django_org.sharding.DJANGO_ORG_JOIN_FREE_ORDERING', True)
+    def test_join_free_default_ordering(self):
+        # The setting does not touch `Meta.ordering`, so the migrations are the same
+        self.assertEqual(models.Department._meta.ordering, DISPLAY_ORDERING['AbstractDepartment'])
+        for model in self.django_org_models():
+            sql = str(model.objects.all().query)
+            self.assertNotIn('JOIN', sql, model.__name__)
+            self.assertIn('ORDER BY', sql, model.__name__)
+
+        self.assertTrue(str(models.Department.objects.all().query).endswith(
+            'ORDER BY "django_org_department"."enterprise_id" ASC, "django_org_department"."parent_id" ASC, '
+            '"django_org_department"."id" ASC'
+        ))
+        self.assertTrue(str(models.WorkShift.objects.all().query).endswith(
+            'ORDER BY "django_org_workshift"."work_mode_id" ASC, "django_org_workshift"."number" ASC'
+        ))
+
+    def test_join_free_order(self):
+        for model in self.django_org_models():
+            self.assertNotIn('JOIN', str(join_free_order(model.objects.all()).query), model.__name__)
+
+    def test_display_order(self):
+        sql = str(display_order(models.Department.objects.all()).query)
+        self.assertEqual(sql.count('JOIN'), 3)
+        self.assertEqual(str(display_order(models.Person.objects.all()).query),
+                         str(models.Person.objects.all().query))
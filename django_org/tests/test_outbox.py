@@ -0,0 +1,112 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from django_org import dedup, models, outbox
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        outbox.connect()
+        self.addCleanup(outbox.disconnect)
+
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.department = models.Department.objects.create(department_type=dt, name='Plant')
+        self.person = models.Person.objects.create(first_name='Ivan', last_name='Petrov')
+        self.employee = models.Employee.objects.create(department=self.department, post=self.post, person=self.person)
+
+    def test_messages(self):
+        self.person.middle_name = 'Ivanovich'
+        self.person.save()
+        models.Employee.objects.filter(pk=self.employee.pk).delete()
+
+        messages = list(models.OutboxMessage.objects.filter(model__in=('django_org.Person', 'django_org.Employee')))
+        self.assertEqual([m.get_action_display() for m in messages], ['Create', 'Create', 'Update', 'Delete'])
+        self.assertEqual(messages[1].data['enterprise_id'], self.enterprise.pk)
+        self.assertEqual(messages[2].data['full_name'], 'Petrov Ivan Ivanovich')
+        self.assertEqual(messages[3].enterprise_id, self.enterprise.pk)
+
+    def test_rollback(self):
+        count = models.OutboxMessage.objects.count()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                models.Post.objects.create(enterprise=self.enterprise, name='Chief')
+                raise ValueError
+        self.assertEqual(models.OutboxMessage.objects.count(), count)
+
+    def test_bulk_writes(self):
+        start = models.OutboxMessage.objects.last().id
+        plant = models.Department.objects.create(department_type=self.department.department_type, name='Plant2')
+        self.department.move_subtree(plant)
+        other = models.Person.objects.create(first_name='Ivan', last_name='Petrov')
+        dedup.merge([[other.pk, self.person.pk]])
+
+        messages = models.OutboxMessage.objects.filter(id__gt=start).values_list('model', 'action', 'data')
+        updates = [(model, data) for model, action, data in messages if action == models.OutboxMessage.Action.UPDATE]
+        self.assertEqual([model for model, _ in updates], ['django_org.Department', 'django_org.Employee'])
+        self.assertEqual(updates[0][1]['parent_id'], plant.pk)
+        self.assertEqual(updates[1][1]['person_id'], other.pk)
+
+    def test_relay(self):
+        sink = outbox.QueueSink()
+        relay = outbox.Relay(sink, batch_size=2)
+        self.assertEqual(relay.run(once=True), 6)
+        self.assertEqual(relay.position(), models.OutboxMessage.objects.last().id)
+        self.assertEqual(sink.queue.get()['model'], 'django_org.Enterprise')
+        self.assertEqual(relay.deliver(), 0)
+
+        # A failing sink keeps the offset, the batch is delivered again
+        def fail(messages):
+            raise ConnectionError
+
+        models.Post.objects.create(enterprise=self.enterprise, name='Chief')
+        with self.assertRaises(ConnectionError):
+            outbox.Relay(fail).deliver()
+        self.assertEqual(relay.deliver(), 1)
+
+        self.assertEqual(outbox.purge(), 7)
+        self.assertFalse(models.OutboxMessage.objects.exists())
+
+    def test_gap(self):
+        relay = outbox.Relay(outbox.QueueSink(), lag=60)
+        relay.run(once=True)
+        last = models.OutboxMessage.objects.last()
+        # A message after a gap waits until the gap is older than the lag
+        message = models.OutboxMessage.objects.create(id=last.id + 2, model='django_org.Post', object_id=1, action=1)
+        self.assertEqual(relay.deliver(), 0)
+        models.OutboxMessage.objects.filter(pk=message.pk).update(
+            created_at=timezone.now() - datetime.timedelta(minutes=2))
+        with self.assertLogs('django_org', 'WARNING') as logs:
+            self.assertEqual(relay.deliver(), 1)
+        self.assertIn(f'ids {last.id + 1}-{last.id + 1}', logs.output[0])
+
+    def test_new_consumer_gap(self):
+        # The ids below the first message of a new consumer may be still uncommitted
+        first = models.OutboxMessage.objects.first().id
+        models.OutboxMessage.objects.filter(pk=first).delete()
+        relay = outbox.Relay(outbox.QueueSink(), consumer='new', lag=60)
+        self.assertEqual(relay.deliver(), 0)
+
+        # Unless another consumer is past them
+        models.OutboxOffset.objects.create(consumer='other', position=first)
+        self.assertEqual(relay.run(once=True), 5)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'outbox.jsonl')
+            out = io.StringIO()
+            call_command('relay_org_outbox', file=path, once=True, database='default', stdout=out)
+            with open(path, encoding='utf-8') as f:
+                messages = [json.loads(line) for line in f]
+        self.assertEqual(len(messages), 6)
+        self.assertEqual(messages[-1]['action'], 'create')
+        self.assertIn('delivered 6 messages', out.getvalue())
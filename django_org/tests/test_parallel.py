@@ -0,0 +1,71 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+
+from django_org import models
+from django_org.parallel import AttributePunches, jobs, recompute
+from django_org.schedule import ShiftTable
+from django_org.utils import _datetime
+
+
+def punches(work_mode_id, start, end):
+    # Around the clock for ten days from the first of January
+    day = _datetime(datetime.date(2024, 1, 1), tzinfo=start.tzinfo)
+    return [(work_mode_id, day, day + datetime.timedelta(days=10))]
+
+
+class RecomputeMixin:
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Moscow')
+        self.work_modes = []
+        for i in range(3):
+            wm = models.WorkMode.objects.create(enterprise=self.enterprise, name=f'WorkMode{i}')
+            models.WorkShift.objects.create(work_mode=wm, name='Night', number=1, start=72000, end=28800)
+            models.WorkShift.objects.create(work_mode=wm, name='Day', number=2, start=28800, end=72000)
+            self.work_modes.append(wm)
+        self.start = datetime.date(2024, 1, 1)
+        self.end = datetime.date(2024, 1, 11)
+
+
+class RecomputeTest(RecomputeMixin, TestCase):
+
+    def test_jobs(self):
+        result = jobs([1, 2, 3], self.start, self.end, work_modes_per_job=2, days_per_job=4)
+        self.assertEqual(len(result), 6)
+        self.assertEqual(result[0], ((1, 2), self.start, datetime.date(2024, 1, 5)))
+        self.assertEqual(result[-1], ((3,), datetime.date(2024, 1, 9), self.end))
+
+    def test_occurrences(self):
+        result = recompute(self.work_modes, self.start, self.end, processes=0, work_modes_per_job=2, days_per_job=3)
+        self.assertEqual((result.jobs, result.rows), (8, 3 * 10 * 2))
+        expected = ShiftTable.for_work_mode(self.work_modes[0]).between(
+            _datetime(self.start, tzinfo=self.enterprise.tz) + datetime.timedelta(hours=-4),
+            _datetime(self.end, tzinfo=self.enterprise.tz) + datetime.timedelta(hours=-4))
+        self.assertEqual(sorted(o for o in result.results if o.work_mode_id == self.work_modes[0].pk), expected)
+
+    def test_punches_and_sink(self):
+        sink = mock.Mock()
+        result = recompute(self.work_modes, self.start, self.end, task=AttributePunches(punches), sink=sink,
+                           processes=0, days_per_job=3, chunk_size=7)
+        self.assertEqual(result.results, [])
+        rows = [row for call in sink.call_args_list for row in call.args[0]]
+        self.assertTrue(all(len(call.args[0]) <= 7 for call in sink.call_args_list))
+        self.assertEqual(len(rows), result.rows)
+        # The first night shift of the range starts on 31 December, before the punches
+        self.assertEqual(sum(row.seconds for row in rows), 3 * (10 * 86400 - 4 * 3600))
+
+    def test_in_transaction(self):
+        # The test runs in a transaction, the jobs stay in the current process
+        with mock.patch('django_org.parallel.ProcessPoolExecutor') as executor, \
+                self.assertLogs('django_org', 'WARNING') as logs:
+            result = recompute(self.work_modes, self.start, self.end, processes=2, days_per_job=5)
+        executor.assert_not_called()
+        self.assertIn('inside a transaction', logs.output[0])
+        self.assertEqual((result.jobs, result.rows), (2, 60))
+
+
+class ProcessPoolTest(RecomputeMixin, TransactionTestCase):
+    def test_process_pool(self):
+        result = recompute(self.work_modes, self.start, self.end, processes=2, days_per_job=5)
+        self.assertEqual((result.jobs, result.rows), (2, 60))
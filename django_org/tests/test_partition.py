@@ -0,0 +1,55 @@
+import datetime
+
+from django.test import TestCase
+
+from django_org import models
+from django_org.const import HOUR1
+from django_org.partition import ShiftPartitioner
+from django_org.schedule import ShiftTable
+from django_org.utils import _datetime
+
+
+class ShiftPartitionerTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm1 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.wm2 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode2')
+        models.WorkShift.objects.create(work_mode=self.wm1, name='Night', number=1, start=20 * 3600, end=8 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm1, name='Day', number=2, start=8 * 3600, end=20 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm2, name='Day', number=1, start=9 * 3600, end=18 * 3600)
+        self.tables = ShiftTable.for_work_modes([self.wm1, self.wm2])
+        self.day = datetime.date(2024, 6, 3)
+        self.midnight = _datetime(self.day, tzinfo=self.enterprise.tz)
+
+    def test_streaming(self):
+        partitioner = ShiftPartitioner(self.tables)
+        t = self.midnight
+        self.assertEqual(partitioner.add(self.wm1.id, t + HOUR1), [])
+        self.assertEqual(partitioner.add(self.wm1.id, t + 2 * HOUR1), [])
+        self.assertEqual(partitioner.add(self.wm2.id, t + 3 * HOUR1), [])
+        self.assertEqual(partitioner.unassigned, 1)
+        self.assertEqual(len(partitioner), 1)
+
+        closed = partitioner.add(self.wm1.id, t + 9 * HOUR1)
+        self.assertEqual([(b.key, b.value) for b in closed], [((self.wm1.id, self.day, 1), 2)])
+        self.assertEqual(partitioner.add(self.wm2.id, t + 10 * HOUR1), [])
+        self.assertEqual(len(partitioner), 2)
+
+        partitioner.add(self.wm1.id, t + 7 * HOUR1)
+        self.assertEqual(partitioner.late, 1)
+
+        closed = partitioner.add(self.wm1.id, t + 21 * HOUR1)
+        self.assertEqual(sorted((b.key, b.value) for b in closed), sorted([
+            ((self.wm2.id, self.day, 1), 1),
+            ((self.wm1.id, self.day, 2), 1),
+        ]))
+        closed = partitioner.flush()
+        self.assertEqual([(b.key, b.value) for b in closed],
+                         [((self.wm1.id, self.day + datetime.timedelta(days=1), 1), 1)])
+
+    def test_partition(self):
+        events = [(self.wm1.id, self.midnight + i * HOUR1, i) for i in range(48)]
+        partitioner = ShiftPartitioner(self.tables, initial=list, reducer=lambda acc, e: acc + [e])
+        buckets = list(partitioner.partition(events))
+        self.assertEqual([len(b.value) for b in buckets], [8, 12, 12, 12, 4])
+        self.assertEqual(sum((b.value for b in buckets), []), list(range(48)))
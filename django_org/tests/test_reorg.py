@@ -0,0 +1,114 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_org import history, models
+from django_org.exceptions import DepartmentCycleError, IDMismatchError
+
+
+class MoveSubtreeTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        self.dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.plant = models.Department.objects.create(department_type=self.dt, name='Plant')
+        self.office = models.Department.objects.create(department_type=self.dt, name='Office')
+        self.shop = models.Department.objects.create(department_type=self.dt, parent=self.plant, name='Shop1')
+        self.areas = [
+            models.Department.objects.create(department_type=self.dt, parent=self.shop, name=f'Area{i}')
+            for i in range(5)
+        ]
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.employees = []
+        for i, department in enumerate([self.shop] + self.areas):
+            person = models.Person.objects.create(first_name=f'Name{i}', last_name=f'Last{i}')
+            employee = models.Employee.objects.create(department=department, post=self.post, person=person)
+            models.WorkModeAssignment.objects.create(employee=employee, work_mode=self.wm,
+                                                     date_from=datetime.date(2024, 1, 1))
+            self.employees.append(employee)
+
+    def test_move(self):
+        with CaptureQueriesContext(connection) as queries:
+            ids = self.shop.move_subtree(self.office)
+        self.assertEqual(set(ids), {self.shop.pk} | {d.pk for d in self.areas})
+        self.assertEqual(self.shop.parent_id, self.office.pk)
+        self.assertEqual(models.Department.objects.get(pk=self.shop.pk).parent_id, self.office.pk)
+        self.assertLess(len(queries), 10)
+
+        self.shop.move_subtree()
+        self.assertIsNone(models.Department.objects.get(pk=self.shop.pk).parent_id)
+
+    def test_cycle(self):
+        for parent in (self.shop, self.areas[2]):
+            with self.assertRaises(DepartmentCycleError):
+                self.shop.move_subtree(parent)
+        self.assertEqual(models.Department.objects.get(pk=self.shop.pk).parent_id, self.plant.pk)
+
+    def test_move_to_enterprise(self):
+        enterprise = models.Enterprise.objects.create(name='Enterprise2')
+        parent = models.Department.objects.create(
+            department_type=models.DepartmentType.objects.create(enterprise=enterprise, name='Plant'), name='Plant')
+        with self.assertRaises(IDMismatchError):
+            self.shop.move_subtree(parent)
+        self.assertEqual(models.Department.objects.filter(enterprise=enterprise).count(), 1)
+
+        wm = models.WorkMode.objects.create(enterprise=enterprise, name='WorkMode1')
+        with CaptureQueriesContext(connection) as queries:
+            self.shop.move_subtree(parent)
+        self.assertLess(len(queries), 25)
+        self.assertEqual(self.shop.enterprise_id, enterprise.pk)
+
+        dt = models.DepartmentType.objects.get(enterprise=enterprise, name='Shop')
+        post = models.Post.objects.get(enterprise=enterprise, name='Operator')
+        self.assertEqual(set(models.Department.objects.filter(enterprise=enterprise).exclude(
+            pk=parent.pk).values_list('department_type_id', flat=True)), {dt.pk})
+        self.assertEqual(set(models.Employee.objects.filter(pk__in=[e.pk for e in self.employees]).values_list(
+            'enterprise_id', 'post_id')), {(enterprise.pk, post.pk)})
+        self.assertEqual(set(models.WorkModeAssignment.objects.filter(employee__in=self.employees).values_list(
+            'enterprise_id', 'work_mode_id')), {(enterprise.pk, wm.pk)})
+
+    def test_change_log(self):
+        history.connect()
+        self.addCleanup(history.disconnect)
+        self.shop.move_subtree(self.office)
+        entry = models.ChangeLogEntry.objects.filter(model='django_org.Department', object_id=self.shop.pk).last()
+        self.assertEqual(entry.data['parent_id'], self.office.pk)
+        self.assertEqual(models.ChangeLogEntry.objects.filter(model='django_org.Department').count(), 6)
+
+        # The department types and posts created in the target enterprise are logged
+        enterprise = models.Enterprise.objects.create(name='Enterprise2')
+        models.WorkMode.objects.create(enterprise=enterprise, name='WorkMode1')
+        self.shop.move_subtree(models.Department.objects.create(
+            department_type=models.DepartmentType.objects.create(enterprise=enterprise, name='Plant'), name='Plant'))
+        created = models.ChangeLogEntry.objects.filter(
+            enterprise_id=enterprise.pk, action=models.ChangeLogEntry.Action.CREATE)
+        self.assertEqual(
+            {(e.model, e.data['name']) for e in created.filter(model__in=['django_org.DepartmentType', 'django_org.Post'])},
+            {('django_org.DepartmentType', 'Plant'), ('django_org.DepartmentType', 'Shop'), ('django_org.Post', 'Operator')})
+
+    def test_change_log_across_enterprises(self):
+        history.connect()
+        self.addCleanup(history.disconnect)
+        history.take_snapshot(self.enterprise)
+        enterprise = models.Enterprise.objects.create(name='Enterprise2')
+        models.WorkMode.objects.create(enterprise=enterprise, name='WorkMode1')
+        self.shop.move_subtree(models.Department.objects.create(
+            department_type=models.DepartmentType.objects.create(enterprise=enterprise, name='Plant'), name='Plant'))
+        moved = {self.shop.pk} | {d.pk for d in self.areas}
+        employees = {e.pk for e in self.employees}
+
+        # The moved rows leave the source states, the snapshots after the move included
+        when = timezone.now() + datetime.timedelta(minutes=1)
+        for state in (history.state_as_of(self.enterprise, when),
+                      history.OrgState(history._load(history.take_snapshot(self.enterprise)))):
+            self.assertEqual(set(state.rows(models.Department)), {self.plant.pk, self.office.pk})
+            self.assertFalse(set(state.rows(models.Employee)) & employees)
+            self.assertFalse(state.rows(models.WorkModeAssignment))
+
+        state = history.state_as_of(enterprise, when)
+        self.assertLessEqual(moved, set(state.rows(models.Department)))
+        self.assertEqual(set(state.rows(models.Employee)), employees)
+        self.assertEqual(len(state.rows(models.WorkModeAssignment)), len(employees))
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from django_org import models
+from django_org.replicas import ReplicaMiddleware, _pin_on_write, is_pinned, sticky_scope, use_primary
+
+
+class ReplicaTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch('django_org.replicas.DJANGO_ORG_READ_REPLICAS', {'default': ['replica']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for signal in (post_save, post_delete):
+            signal.connect(_pin_on_write, dispatch_uid='test_pin_on_write')
+            self.addCleanup(signal.disconnect, dispatch_uid='test_pin_on_write')
+
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        models.WorkShift.objects.create(work_mode=self.wm, name='Day', number=1, start=0, end=43200)
+        models.WorkShift.objects.create(work_mode=self.wm, name='Night', number=2, start=43200, end=0)
+
+        scope = sticky_scope()
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def test_reads(self):
+        self.assertEqual(models.WorkMode.objects.all().db, 'replica')
+        self.assertEqual(models.Department.objects.for_enterprise(self.enterprise).db, 'replica')
+        self.assertEqual(models.WorkMode.objects.on_shards()[0].db, 'replica')
+        self.assertEqual(self.wm.shift_set.all().db, 'replica')
+        self.assertEqual(models.WorkMode.objects.all().db, 'replica')
+        with use_primary():
+            self.assertEqual(models.WorkMode.objects.all().db, 'default')
+
+    def test_sticky(self):
+        with use_primary():
+            wm = models.WorkMode.objects.get()
+        wm._state.db = 'replica'
+        self.assertEqual(wm.shift_set.all().db, 'replica')
+        wm.name = 'WorkMode2'
+        wm.save()
+        self.assertEqual(wm._state.db, 'default')
+        self.assertTrue(is_pinned())
+        self.assertEqual(models.WorkMode.objects.all().db, 'default')
+        self.assertEqual(wm.shift_set.all().db, 'default')
+
+    def test_write_alias(self):
+        # Asked for by related managers and get_or_create, no write follows
+        self.assertEqual(router.db_for_write(models.WorkMode), 'default')
+        self.assertEqual(self.wm.shift_set.all().db, 'replica')
+        self.assertFalse(is_pinned())
+
+    def test_middleware(self):
+        def view(request):
+            self.assertEqual(models.WorkMode.objects.all().db, 'replica')
+            models.Post.objects.create(enterprise=self.enterprise, name=request.GET['name'])
+            self.assertEqual(models.WorkMode.objects.all().db, 'default')
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(view)
+        middleware(RequestFactory().get('/', {'name': 'Operator'}))
+        self.assertFalse(is_pinned())
+        middleware(RequestFactory().get('/', {'name': 'Fitter'}))
@@ -0,0 +1,61 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_org import models
+from django_org.exceptions import IDMismatchError
+
+
+class WorkModeAssignmentTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.root = models.Department.objects.create(department_type=dt, name='Plant')
+        self.child = models.Department.objects.create(department_type=dt, parent=self.root, name='Shop1')
+        self.other = models.Department.objects.create(department_type=dt, name='Office')
+
+        self.wm1 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.wm2 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode2')
+        for wm in (self.wm1, self.wm2):
+            models.WorkShift.objects.create(work_mode=wm, name='Day', number=1, start=8 * 3600, end=20 * 3600)
+            models.WorkShift.objects.create(work_mode=wm, name='Night', number=2, start=20 * 3600, end=8 * 3600)
+
+        self.now = timezone.now()
+        self.today = self.now.astimezone(self.enterprise.tz).date()
+        self.employees = []
+        for i, (department, wm) in enumerate([
+            (self.root, self.wm1), (self.child, self.wm1), (self.child, self.wm2), (self.other, self.wm2)
+        ]):
+            person = models.Person.objects.create(first_name=f'Name{i}', last_name=f'Last{i}')
+            employee = models.Employee.objects.create(department=department, post=self.post, person=person)
+            models.WorkModeAssignment.objects.create(
+                employee=employee, work_mode=wm, date_from=self.today - datetime.timedelta(days=30))
+            self.employees.append(employee)
+
+    def test_enterprise_mismatch(self):
+        enterprise = models.Enterprise.objects.create(name='Enterprise2')
+        wm = models.WorkMode.objects.create(enterprise=enterprise, name='WorkMode1')
+        with self.assertRaises(IDMismatchError):
+            models.WorkModeAssignment.objects.create(employee=self.employees[0], work_mode=wm, date_from=self.today)
+
+    def test_subtree_ids(self):
+        self.assertEqual(sorted(self.root.subtree_ids()), sorted([self.root.id, self.child.id]))
+
+    def test_on_shift_enterprise(self):
+        with self.assertNumQueries(2 + 2):
+            on_shift = models.WorkModeAssignment.on_shift(self.now, enterprise=self.enterprise)
+        self.assertEqual(sorted(e.id for e, _ in on_shift), sorted(e.id for e in self.employees))
+        for employee, shift in on_shift:
+            self.assertTrue(shift.start_time <= self.now < shift.end_time)
+
+    def test_on_shift_department(self):
+        on_shift = models.WorkModeAssignment.on_shift(self.now, department=self.root)
+        self.assertEqual(sorted(e.id for e, _ in on_shift), sorted(e.id for e in self.employees[:3]))
+
+    def test_effective_dates(self):
+        models.WorkModeAssignment.objects.filter(employee=self.employees[0]).update(
+            date_to=self.today - datetime.timedelta(days=3))
+        on_shift = models.WorkModeAssignment.on_shift(self.now, department=self.root)
+        self.assertEqual(sorted(e.id for e, _ in on_shift), sorted(e.id for e in self.employees[1:3]))
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+
+from django_org import models
+from django_org.scope import id_ranges
+
+
+class ScopeTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.operator = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        self.chief = models.Post.objects.create(enterprise=self.enterprise, name='Chief')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        self.plant = models.Department.objects.create(department_type=dt, name='Plant')
+        self.shop = models.Department.objects.create(department_type=dt, parent=self.plant, name='Shop1')
+        self.office = models.Department.objects.create(department_type=dt, parent=self.plant, name='Office')
+        self.area = models.Department.objects.create(department_type=dt, parent=self.shop, name='Area1')
+
+        User = get_user_model()
+        self.manager = User.objects.create_user('manager')
+        self.employees = {}
+        for i, (department, post) in enumerate([
+            (self.shop, self.chief), (self.area, self.operator), (self.office, self.operator), (self.plant, self.chief)
+        ]):
+            person = models.Person.objects.create(first_name=f'Name{i}', user=self.manager if i == 0 else None)
+            self.employees[department.name] = models.Employee.objects.create(
+                department=department, post=post, person=person)
+
+    def test_id_ranges(self):
+        self.assertEqual(id_ranges([7, 3, 4, 5, 9, 10, 3]), [(3, 5), (7, 7), (9, 10)])
+        self.assertEqual(id_ranges([]), [])
+
+    def test_visible_to(self):
+        self.assertEqual(set(models.Department.objects.visible_to(self.manager)), {self.shop, self.area})
+        self.assertEqual(set(models.Employee.objects.visible_to(self.manager)),
+                         {self.employees['Shop1'], self.employees['Area1']})
+        self.assertEqual(set(models.Post.objects.visible_to(self.manager)), {self.chief, self.operator})
+        self.assertEqual(models.Person.objects.visible_to(self.manager).count(), 2)
+        with self.assertRaises(TypeError):
+            models.WorkMode.objects.visible_to(self.manager)
+
+    def test_queries(self):
+        # The employee of the user, the department tree, then once per user object
+        with self.assertNumQueries(3):
+            list(models.Employee.objects.visible_to(self.manager))
+        with self.assertNumQueries(1):
+            list(models.Department.objects.visible_to(self.manager))
+
+    def test_cached(self):
+        caches['default'].clear()
+        with mock.patch('django_org.cache.DJANGO_ORG_CACHE', 'default'):
+            models.Department.objects.visible_to(self.manager).count()
+            user = get_user_model().objects.get(pk=self.manager.pk)
+            with self.assertNumQueries(2):
+                self.assertEqual(models.Department.objects.visible_to(user).count(), 2)
+
+    def test_superuser_and_stranger(self):
+        admin = get_user_model().objects.create_superuser('admin')
+        stranger = get_user_model().objects.create_user('stranger')
+        self.assertEqual(models.Department.objects.visible_to(admin).count(), 4)
+        self.assertEqual(models.Department.objects.visible_to(stranger).count(), 0)
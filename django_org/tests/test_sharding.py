@@ -0,0 +1,84 @@
+import io
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_org import models, snapshot
+from django_org.exceptions import IDMismatchError, ShardingError
+
+
+class ShardingTest(TestCase):
+    databases = {'default', 'shard1'}
+
+    def setUp(self):
+        patcher = mock.patch('django_org.sharding.DJANGO_ORG_SHARDS', ['default', 'shard1'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.e0 = models.Enterprise(id=2, name='Enterprise0')
+        self.e0.save()
+        self.e1 = models.Enterprise(id=3, name='Enterprise1')
+        self.e1.save()
+        for enterprise in (self.e0, self.e1):
+            wm = models.WorkMode.objects.create(enterprise=enterprise, name='WorkMode1')
+            models.WorkShift.objects.create(work_mode=wm, name='Day', number=1, start=0, end=43200)
+            models.WorkShift.objects.create(work_mode=wm, name='Night', number=2, start=43200, end=0)
+
+    def test_routing(self):
+        self.assertEqual(self.e0._state.db, 'default')
+        self.assertEqual(self.e1._state.db, 'shard1')
+        self.assertFalse(models.Enterprise.objects.filter(pk=self.e1.pk).exists())
+        self.assertEqual(models.Enterprise.objects.using('shard1').get().name, 'Enterprise1')
+        self.assertEqual(models.WorkShift.objects.for_enterprise(self.e1).count(), 2)
+        self.assertEqual(models.WorkShift.objects.using('shard1').count(), 2)
+        self.assertEqual(models.WorkMode.objects.for_enterprise(self.e1.pk).get().shift_set.count(), 2)
+
+    def test_enterprise_without_id(self):
+        with self.assertRaises(ShardingError):
+            models.Enterprise.objects.create(name='Enterprise2')
+        self.assertEqual(models.Enterprise.objects.create(id=5, name='Enterprise2')._state.db, 'shard1')
+
+    def test_snapshot_import(self):
+        stream = io.BytesIO()
+        snapshot.dump(self.e1, stream)
+        for model in (models.WorkShift, models.WorkMode, models.Enterprise):
+            model.objects.using('shard1').all().delete()
+
+        stream.seek(0)
+        self.assertEqual(snapshot.load(stream), 4)
+        self.assertEqual(models.WorkShift.objects.for_enterprise(self.e1).count(), 2)
+        self.assertEqual(models.Enterprise.objects.using('shard1').get().pk, self.e1.pk)
+        self.assertFalse(models.Enterprise.objects.using('default').filter(pk=self.e1.pk).exists())
+
+    def test_save_overrides(self):
+        post = models.Post.objects.create(enterprise=self.e1, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.e1, name='Shop')
+        department = models.Department(department_type_id=dt.pk, name='Shop1')
+        department.save(using='shard1')
+        self.assertEqual(department.enterprise_id, self.e1.pk)
+
+        person = models.Person.objects.for_enterprise(self.e1).create(first_name='Ivan')
+        self.assertEqual(person._state.db, 'shard1')
+        employee = models.Employee(department_id=department.pk, post_id=post.pk, person=person)
+        employee.save(using='shard1')
+        self.assertEqual(models.Employee.objects.for_enterprise(self.e1).get(), employee)
+        self.assertFalse(models.Employee.objects.using('default').exists())
+
+    def test_person_on_another_shard(self):
+        post = models.Post.objects.create(enterprise=self.e1, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.e1, name='Shop')
+        department = models.Department.objects.create(department_type=dt, name='Shop1')
+        person = models.Person.objects.create(first_name='Ivan')
+        self.assertEqual(person._state.db, 'default')
+        # The router refuses the relation between objects, the save refuses the id
+        with self.assertRaises(ValueError):
+            models.Employee.objects.create(department=department, post=post, person=person)
+        with self.assertRaises(IDMismatchError):
+            models.Employee.objects.create(department=department, post=post, person_id=person.pk)
+
+    def test_get_shifts(self):
+        now = timezone.now()
+        shifts = models.WorkMode.get_shifts(now)
+        self.assertEqual(sorted(s.enterprise_id for s in shifts), [self.e0.pk, self.e1.pk])
+        self.assertEqual(self.e1.get_shifts(now)[0].enterprise_id, self.e1.pk)
@@ -0,0 +1,107 @@
+import datetime
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from django_org import models, outbox
+from django_org.snapshot import _decode, _encode
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Moscow')
+        post = models.Post.objects.create(enterprise=self.enterprise, name='Operator')
+        dt = models.DepartmentType.objects.create(enterprise=self.enterprise, name='Shop')
+        # The child gets a lower id than its parent
+        other = models.Department.objects.create(department_type=dt, name='Other')
+        child = models.Department.objects.create(department_type=dt, parent=other, name='Child')
+        root = models.Department.objects.create(department_type=dt, name='Root')
+        child.parent = root
+        child.save()
+        other.delete()
+
+        wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1', cycle_length=2)
+        shift = models.WorkShift.objects.create(work_mode=wm, name='Day', number=1, day=1, start=28800, end=72000)
+        user = get_user_model().objects.create(username='user')
+        person = models.Person.objects.create(user=user, first_name='Ivan', last_name='Ivanov')
+        employee = models.Employee.objects.create(department=child, post=post, person=person)
+        models.WorkModeAssignment.objects.create(employee=employee, work_mode=wm, date_from=datetime.date(2024, 1, 1))
+        models.CalendarException.objects.create(work_shift=shift, day=datetime.date(2024, 5, 1), name='Holiday')
+
+        models.Enterprise.objects.create(name='Enterprise2')
+
+    def dump(self):
+        def rows(model):
+            return list(model.objects.order_by('pk').values())
+        return {model: rows(model) for model in (
+            models.Enterprise, models.Post, models.DepartmentType, models.Department, models.WorkMode,
+            models.WorkShift, models.Person, models.Employee, models.WorkModeAssignment, models.CalendarException
+        )}
+
+    def clear(self):
+        models.CalendarException.objects.all().delete()
+        models.WorkModeAssignment.objects.all().delete()
+        models.Employee.objects.all().delete()
+        models.Person.objects.all().delete()
+        models.WorkShift.objects.all().delete()
+        models.WorkMode.objects.all().delete()
+        models.Department.objects.filter(parent__isnull=False).delete()
+        models.Department.objects.all().delete()
+        models.DepartmentType.objects.all().delete()
+        models.Post.objects.all().delete()
+        models.Enterprise.objects.all().delete()
+
+    def test_codec(self):
+        value = [None, True, False, 0, -1, 2 ** 70, -300, 1.5, 'Иван', b'\x00', datetime.date(2024, 2, 29), []]
+        buf = bytearray()
+        _encode(buf, value)
+        self.assertEqual(_decode(bytes(buf)), (value, len(buf)))
+
+    def test_round_trip(self):
+        expected = self.dump()
+        expected[models.Enterprise] = expected[models.Enterprise][:1]
+        expected[models.Person][0]['user_id'] = None
+
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, 'snapshot.bin')
+            call_command('export_enterprise', 'Enterprise1', output=path, chunk_size=1, stderr=io.StringIO())
+            self.clear()
+            outbox.connect()
+            self.addCleanup(outbox.disconnect)
+            call_command('import_enterprise', path, batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(self.dump(), expected)
+        # The imported rows are in the outbox
+        self.assertEqual(models.OutboxMessage.objects.filter(action=models.OutboxMessage.Action.CREATE).count(),
+                         sum(len(rows) for rows in expected.values()))
+        models.Post.objects.create(enterprise=models.Enterprise.objects.get(), name='Fitter')
+
+    def test_existing_rows(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, 'snapshot.bin')
+            call_command('export_enterprise', 'Enterprise1', output=path, stderr=io.StringIO())
+            with self.assertRaisesMessage(CommandError, 'django_org.Enterprise rows already exist'):
+                call_command('import_enterprise', path, stdout=io.StringIO())
+
+            # The enterprise is gone, its people are not
+            models.Person.objects.update(user=None)
+            person = models.Person.objects.get()
+            self.clear()
+            models.Person.objects.create(pk=person.pk, first_name='Petr', last_name='Petrov')
+            with self.assertRaisesMessage(CommandError, f'django_org.Person rows already exist: {person.pk}'):
+                call_command('import_enterprise', path, stdout=io.StringIO())
+        self.assertFalse(models.Enterprise.objects.exists())
+
+    def test_bad_input(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b'garbage')
+            f.flush()
+            with self.assertRaises(CommandError):
+                call_command('import_enterprise', f.name, stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command('export_enterprise', 'Nope', stderr=io.StringIO())
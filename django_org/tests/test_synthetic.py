@@ -0,0 +1,59 @@
+import datetime
+import io
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from django_org import models, synthetic
+
+
+class SyntheticTest(TestCase):
+    shape = synthetic.Shape(enterprises=2, departments=30, depth=5, people=25, work_modes=6, posts=3, overnight=0.5)
+
+    def tree(self, enterprise):
+        return sorted(models.Department.objects.filter(enterprise=enterprise).values_list(
+            'name', 'parent__name', 'department_type__name'))
+
+    def test_generate(self):
+        counts = synthetic.generate(self.shape, seed=7, batch_size=10)
+        self.assertEqual(counts['django_org.Department'], 60)
+        self.assertEqual(counts['django_org.Employee'], 50)
+        self.assertEqual(models.WorkModeAssignment.objects.count(), 50)
+
+        enterprise = models.Enterprise.objects.get(name='Synthetic7-1')
+        departments = models.Department.objects.filter(enterprise=enterprise)
+        self.assertTrue(departments.filter(department_type__name='Level5').exists())
+        self.assertFalse(departments.filter(parent__parent__parent__parent__parent__isnull=False).exists())
+        self.assertEqual(models.Person.objects.first().full_name, str(models.Person.objects.first()))
+
+        # Shifts of the generated work modes resolve as the saved ones do
+        wm = models.WorkMode.objects.filter(enterprise=enterprise).first()
+        now = datetime.datetime(2024, 3, 1, 12, tzinfo=enterprise.tz)
+        self.assertEqual(len(wm.get_shift(now, limit=3)), 3)
+
+        other = synthetic.generate(self.shape, seed=7, prefix='Copy')
+        self.assertEqual(other, counts)
+        self.assertEqual(self.tree(enterprise), self.tree(models.Enterprise.objects.get(name='Copy7-1')))
+
+    def test_overnight(self):
+        synthetic.generate(self.shape._replace(enterprises=1, overnight=1), seed=1)
+        work_modes = models.WorkMode.objects.all()
+        self.assertTrue(all(wm.shift_set.filter(start__gt=F('end')).exists() for wm in work_modes))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('generate_org_data', enterprises=1, departments=5, depth=3, people=4, work_modes=2, posts=1,
+                     stdout=out)
+        self.assertIn('django_org.Person: 4', out.getvalue())
+        self.assertEqual(models.Employee.objects.create(
+            department=models.Department.objects.first(), post=models.Post.objects.first(),
+            person=models.Person.objects.create(first_name='New')).pk, 5)
+
+    def test_names_taken(self):
+        options = dict(enterprises=2, departments=2, depth=1, people=1, work_modes=1, posts=1, stdout=io.StringIO())
+        call_command('generate_org_data', **options)
+        with self.assertRaisesMessage(CommandError, 'Synthetic0-1, Synthetic0-2 already exist'):
+            call_command('generate_org_data', **options)
+        call_command('generate_org_data', prefix='More', **options)
+        self.assertEqual(models.Enterprise.objects.count(), 4)
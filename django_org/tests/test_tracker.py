@@ -0,0 +1,47 @@
+import datetime
+
+from django.test import TestCase
+
+from django_org import models
+from django_org.const import HOUR1
+from django_org.tracker import ShiftTracker
+from django_org.utils import _datetime
+
+
+class ShiftTrackerTest(TestCase):
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1')
+        self.wm1 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.wm2 = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode2')
+        models.WorkShift.objects.create(work_mode=self.wm1, name='Night', number=1, start=20 * 3600, end=8 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm1, name='Day', number=2, start=8 * 3600, end=20 * 3600)
+        models.WorkShift.objects.create(work_mode=self.wm2, name='Day', number=1, start=9 * 3600, end=18 * 3600)
+        self.midnight = _datetime(datetime.date(2024, 6, 3), tzinfo=self.enterprise.tz)
+
+    def names(self, shifts):
+        return [shift and shift.name for shift in shifts]
+
+    def test_boundaries(self):
+        now = self.midnight + HOUR1
+        tracker = ShiftTracker(self.enterprise, now)
+        self.assertEqual(self.names(tracker.get_shifts(now)), ['Night', None])
+        self.assertEqual(tracker.next_boundary, self.midnight + 8 * HOUR1)
+
+        with self.assertNumQueries(0):
+            shifts = tracker.get_shifts(now + 6 * HOUR1)
+        self.assertEqual(self.names(shifts), ['Night', None])
+        self.assertTrue(shifts[0].is_current)
+
+        self.assertEqual(tracker.refresh(self.midnight + 8 * HOUR1), [self.wm1.id])
+        self.assertEqual(self.names(tracker.get_shifts(self.midnight + 8 * HOUR1)), ['Day', None])
+        self.assertEqual(tracker.refresh(self.midnight + 10 * HOUR1), [self.wm2.id])
+        self.assertEqual(tracker.get_shift(self.wm2, self.midnight + 10 * HOUR1).name, 'Day')
+
+        now = self.midnight + 19 * HOUR1
+        self.assertEqual(self.names(tracker.get_shifts(now)), self.names(self.enterprise.get_shifts(now)))
+
+    def test_reset(self):
+        now = self.midnight + 12 * HOUR1
+        tracker = ShiftTracker(self.enterprise, now)
+        self.assertEqual(self.names(tracker.get_shifts(now - 6 * HOUR1)), ['Night', None])
+        self.assertEqual(tracker.now, now - 6 * HOUR1)
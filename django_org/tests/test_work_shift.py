@@ -7,7 +7,8 @@ from django.utils import timezone
 
 from django_org import models
 from django_org.const import SEC1, HOUR1, SECONDS_IN_DAY
-from django_org.utils import _day_start
+from django_org.exceptions import CycleDayError
+from django_org.utils import _day_start, _datetime
 
 
 class WorkShiftTest(TestCase):
@@ -260,3 +261,105 @@ class WorkShiftTest(TestCase):
         self.assertTrue(shift.id == shift22.id)
         self.assertTrue(shift.name == shift22.name)
         self.assertTrue(shift.work_mode == shift22.work_mode)
+
+    def test_get_shift_limit(self):
+        shift21 = models.WorkShift.objects.create(
+            work_mode=self.wm2, name='TestWorkShift1', number=1, start=self.N20, end=self.N08)
+        shift22 = models.WorkShift.objects.create(
+            work_mode=self.wm2, name='TestWorkShift2', number=2, start=self.N08, end=self.N20)
+
+        shifts = self.wm2.get_shift(self.curr_day + self.H08, limit=4)
+        self.assertEqual([s.id for s in shifts], [shift22.id, shift21.id, shift22.id, shift21.id])
+        self.assertEqual(shifts[-1].start_time, self.next_day + self.H20)
+        self.assertEqual(shifts[1].shift_day, (self.next_day + self.H08).date())
+
+        shifts = self.wm2.get_shift(self.curr_day + self.H08, limit=-3)
+        self.assertEqual([s.start_time for s in shifts],
+                         [self.curr_day + self.H08, self.prev_day + self.H20, self.prev_day + self.H08])
+
+        shifts = self.wm2.get_shift(self.curr_day + self.H08, limit=self.next_day + self.H08)
+        self.assertEqual(len(shifts), 3)
+        self.assertTrue(shifts[-1].start_time <= self.next_day + self.H08 < shifts[-1].end_time)
+
+        shifts = self.wm2.get_shift(self.curr_day + self.H08, limit=self.prev_day)
+        self.assertEqual(len(shifts), 4)
+        self.assertTrue(shifts[-1].start_time <= self.prev_day < shifts[-1].end_time)
+
+
+class RotatingWorkShiftTest(TestCase):
+    N01 = HOUR1.total_seconds()
+    N08 = 8 * N01
+    N20 = 20 * N01
+    H08 = datetime.timedelta(seconds=N08)
+    H20 = datetime.timedelta(seconds=N20)
+    DAY = SECONDS_IN_DAY
+
+    def setUp(self):
+        self.enterprise1 = models.Enterprise.objects.create(name='Enterprise1')
+        self.cycle_start = datetime.date(2023, 1, 2)
+        self.day0 = _datetime(self.cycle_start, tzinfo=self.enterprise1.tz)
+
+        # 2 days, 2 nights, 4 days off
+        self.wm = models.WorkMode.objects.create(
+            enterprise=self.enterprise1, name='Crew A', cycle_length=8, cycle_start=self.cycle_start)
+        self.d1 = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Day1', number=1, day=0, start=self.N08, end=self.N20)
+        self.d2 = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Day2', number=2, day=1, start=self.N08, end=self.N20)
+        self.n1 = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Night1', number=3, day=2, start=self.N20, end=self.N08)
+        self.n2 = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Night2', number=4, day=3, start=self.N20, end=self.N08)
+
+    def test_cycle_day_validation(self):
+        with self.assertRaises(CycleDayError):
+            models.WorkShift.objects.create(work_mode=self.wm, name='Bad', number=5, day=8)
+
+    def test_get_shift(self):
+        cycle = 8 * self.DAY
+        for offset in (-100 * cycle, 0 * cycle, cycle, 1000 * cycle):
+            base = self.day0 + offset
+            shift = self.wm.get_shift(base + self.H08 + HOUR1)
+            self.assertEqual(shift.id, self.d1.id)
+            self.assertEqual((shift.start_time, shift.end_time), (base + self.H08, base + self.H20))
+            self.assertEqual(shift.shift_day, (base + HOUR1).date())
+
+            shift = self.wm.get_shift(base + self.DAY + self.H20)
+            self.assertIsNone(shift)
+
+            shift = self.wm.get_shift(base + 3 * self.DAY + HOUR1)
+            self.assertEqual(shift.id, self.n1.id)
+            self.assertEqual(shift.start_time, base + 2 * self.DAY + self.H20)
+            self.assertEqual(shift.shift_day, (base + 2 * self.DAY + HOUR1).date())
+
+            shift = self.wm.get_shift(base + 4 * self.DAY + HOUR1)
+            self.assertEqual(shift.id, self.n2.id)
+
+            self.assertIsNone(self.wm.get_shift(base + 5 * self.DAY + self.H08 + HOUR1))
+
+    def test_next_prev(self):
+        shift = self.wm.get_shift(self.day0 + self.H08)
+        expected = [
+            (self.d2, self.day0 + self.DAY + self.H08),
+            (self.n1, self.day0 + 2 * self.DAY + self.H20),
+            (self.n2, self.day0 + 3 * self.DAY + self.H20),
+            (self.d1, self.day0 + 8 * self.DAY + self.H08),
+        ]
+        for s, start in expected:
+            shift = shift.next()
+            self.assertEqual((shift.id, shift.start_time), (s.id, start))
+
+        for s, start in reversed(expected[:-1]):
+            shift = shift.prev()
+            self.assertEqual((shift.id, shift.start_time), (s.id, start))
+
+    def test_limit(self):
+        shifts = self.wm.get_shift(self.day0 + 5 * self.DAY, limit=3)
+        self.assertEqual([s.id for s in shifts], [self.d1.id, self.d2.id, self.n1.id])
+        self.assertEqual(shifts[0].start_time, self.day0 + 8 * self.DAY + self.H08)
+
+        shifts = self.wm.get_shift(self.day0 + 5 * self.DAY, limit=-2)
+        self.assertEqual([s.id for s in shifts], [self.n2.id, self.n1.id])
+
+        shifts = self.wm.get_shift(self.day0 + self.H08, limit=self.day0 + 3 * self.DAY)
+        self.assertEqual([s.id for s in shifts], [self.d1.id, self.d2.id, self.n1.id])
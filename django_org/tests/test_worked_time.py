@@ -0,0 +1,76 @@
+import datetime
+import pickle
+
+from django.test import TestCase
+
+from django_org import models
+from django_org.const import HOUR1, SECONDS_IN_DAY
+from django_org.schedule import ShiftTable
+from django_org.utils import _datetime
+from django_org.worked_time import worked_time, worked_times
+
+
+class ScheduleTestCase(TestCase):
+    N08 = 8 * HOUR1.total_seconds()
+    N20 = 20 * HOUR1.total_seconds()
+
+    def setUp(self):
+        self.enterprise = models.Enterprise.objects.create(name='Enterprise1', time_zone='Europe/Berlin')
+        self.wm = models.WorkMode.objects.create(enterprise=self.enterprise, name='WorkMode1')
+        self.night = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Night', number=1, start=self.N20, end=self.N08)
+        self.day = models.WorkShift.objects.create(
+            work_mode=self.wm, name='Day', number=2, start=self.N08, end=self.N20)
+        self.start = _datetime(datetime.date(2024, 3, 25), tzinfo=self.enterprise.tz)
+
+
+class ShiftTableTest(ScheduleTestCase):
+    def test_matches_model(self):
+        table = ShiftTable.for_work_mode(self.wm)
+        shift = self.wm.get_shift(self.start)
+        occurrences = table.between(self.start, self.start + 10 * SECONDS_IN_DAY)
+        self.assertEqual(len(occurrences), 21)
+        for occurrence in occurrences:
+            self.assertEqual(occurrence.shift_id, shift.id)
+            self.assertEqual(table.to_datetime(occurrence.start), shift.start_time)
+            self.assertEqual(table.to_datetime(occurrence.end), shift.end_time)
+            self.assertEqual(occurrence.shift_day, shift.shift_day)
+            self.assertEqual(table.at(occurrence.start + 60), occurrence)
+            shift = shift.next()
+
+    def test_pickle(self):
+        table = ShiftTable.for_work_mode(self.wm)
+        copy = pickle.loads(pickle.dumps(table))
+        end = self.start + 3 * SECONDS_IN_DAY
+        self.assertEqual(copy.between(self.start, end), table.between(self.start, end))
+
+
+class WorkedTimeTest(ScheduleTestCase):
+    def test_dst(self):
+        table = ShiftTable.for_work_mode(self.wm)
+        # Clocks go forward on the night to 2024-03-31
+        night_start = _datetime(datetime.date(2024, 3, 30), tzinfo=self.enterprise.tz) + 20 * HOUR1
+        night_end = _datetime(datetime.date(2024, 3, 31), tzinfo=self.enterprise.tz) + 8 * HOUR1
+        rows = worked_time(table, [(night_start - HOUR1, night_end + HOUR1)], key=7)
+
+        totals = {(r.shift_id, r.shift_day): r.seconds for r in rows}
+        self.assertEqual(totals[(self.night.id, datetime.date(2024, 3, 31))], 11 * 3600)
+        self.assertEqual(totals[(self.day.id, datetime.date(2024, 3, 30))], 3600)
+        self.assertEqual(totals[(self.day.id, datetime.date(2024, 3, 31))], 3600)
+        self.assertTrue(all(r.key == 7 and r.work_mode_id == self.wm.id for r in rows))
+
+    def test_partial_and_overlapping_punches(self):
+        table = ShiftTable.for_work_mode(self.wm)
+        day = self.start + 8 * HOUR1
+        rows = worked_times({1: table, 2: table}, [
+            (1, day, day + 2 * HOUR1),
+            (1, day + HOUR1, day + 3 * HOUR1),
+            (1, day + 11 * HOUR1, day + 13 * HOUR1),
+            (2, day - 2 * HOUR1, day - HOUR1),
+        ])
+        totals = {(r.key, r.shift_id, r.shift_day): r.seconds for r in rows}
+        self.assertEqual(totals, {
+            (1, self.day.id, self.start.date()): 4 * 3600,
+            (1, self.night.id, self.start.date() + datetime.timedelta(days=1)): 3600,
+            (2, self.night.id, self.start.date()): 3600,
+        })
@@ -0,0 +1,107 @@
+from datetime import datetime
+from heapq import heappop, heappush
+from typing import Dict, List, ForwardRef, Optional
+
+from django.apps import apps
+from django.utils import timezone
+
+from django_org import clock
+from django_org.calendar_index import CalendarIndex
+from django_org.exceptions import NaiveTimeSettingError
+from django_org.instrumentation import instrument
+from django_org.settings import DJANGO_ORG_WORK_MODE
+
+
+__all__ = (
+    'ShiftTracker',
+)
+
+
+class ShiftTracker:
+    """Current shift of every work mode of an enterprise, kept up to date incrementally.
+
+    Each work mode has one boundary in a heap: the end of its current shift or the start of its next
+    one. A refresh recomputes only the work modes whose boundary has passed, so reads between
+    boundaries do not query the database. Call `reset` after shifts or calendars are changed.
+    """
+
+    def __init__(self, enterprise: ForwardRef('Enterprise'), now: Optional[datetime] = None):
+        self.enterprise = enterprise
+        self.now: Optional[datetime] = None
+        self.work_modes: Dict[int, ForwardRef('WorkMode')] = {}
+        self._shifts: Dict[int, Optional[ForwardRef('WorkShift')]] = {}
+        self._boundaries = []
+        self.reset(now)
+
+    @staticmethod
+    def _now(now: Optional[datetime]) -> datetime:
+        now = now or clock.now()
+        if timezone.is_naive(now):
+            raise NaiveTimeSettingError('The time must be specified with a time zone')
+        return now
+
+    @property
+    def next_boundary(self) -> Optional[datetime]:
+        return self._boundaries[0][0] if self._boundaries else None
+
+    def reset(self, now: Optional[datetime] = None):
+        """Reload the work modes and recompute all of them."""
+        WorkMode = apps.get_model(DJANGO_ORG_WORK_MODE)
+        now = self._now(now)
+        self.work_modes = {wm.pk: wm for wm in WorkMode.objects.for_enterprise(self.enterprise)}
+        for wm in self.work_modes.values():
+            wm.enterprise = self.enterprise
+        CalendarIndex.prefetch(self.work_modes.values())
+        self._shifts = {}
+        self._boundaries = []
+        for work_mode_id in self.work_modes:
+            self._compute(work_mode_id, now)
+        self.now = now
+
+    def _compute(self, work_mode_id: int, now: datetime):
+        with clock.frozen(now):
+            # Up to `now`: the current shift, else only the next one
+            shifts = self.work_modes[work_mode_id].get_shift(now, limit=now)
+        shift = shifts[0] if shifts else None
+        if shift is not None and shift.start_time <= now < shift.end_time:
+            self._shifts[work_mode_id] = shift
+            boundary = shift.end_time
+        else:
+            self._shifts[work_mode_id] = None
+            boundary = shift.start_time if shift is not None else None
+
+        if boundary is not None:
+            heappush(self._boundaries, (boundary, work_mode_id))
+
+    @instrument('shift_tracker.refresh')
+    def refresh(self, now: Optional[datetime] = None) -> List[int]:
+        """Recompute the work modes whose boundary has passed, return their ids."""
+        now = self._now(now)
+        if self.now is not None and now < self.now:
+            self.reset(now)
+            return list(self.work_modes)
+
+        refreshed = []
+        while self._boundaries and self._boundaries[0][0] <= now:
+            _, work_mode_id = heappop(self._boundaries)
+            self._compute(work_mode_id, now)
+            refreshed.append(work_mode_id)
+        self.now = now
+        return refreshed
+
+    def _current(self, work_mode_id: int) -> Optional[ForwardRef('WorkShift')]:
+        shift = self._shifts[work_mode_id]
+        if shift is not None:
+            shift.now = self.now
+            shift.is_current = shift.start_time <= self.now < shift.end_time
+        return shift
+
+    def get_shift(self, work_mode: ForwardRef('WorkMode'), now: Optional[datetime] = None
+                  ) -> Optional[ForwardRef('WorkShift')]:
+        self.refresh(now)
+        return self._current(getattr(work_mode, 'pk', work_mode))
+
+    def get_shifts(self, now: Optional[datetime] = None) -> List[Optional[ForwardRef('WorkShift')]]:
+        """The same as `Enterprise.get_shifts(now)` while no boundary has passed."""
+        self.refresh(now)
+        return [self._current(work_mode_id) for work_mode_id in self.work_modes]
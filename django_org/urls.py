@@ -1,6 +1,8 @@
 from django.urls import path
 
+from django_org import views
 
-urlpatterns = [
 
+urlpatterns = [
+    path('employees.<str:format>', views.export_employees, name='django_org_export_employees'),
 ]
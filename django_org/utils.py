@@ -1,8 +1,19 @@
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Tuple, Union
 from zoneinfo import ZoneInfo
 
+from django.db import models
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 
+from django_org.const import SECONDS_IN_DAY
+from django_org.exceptions import NaiveTimeSettingError
+
+
+Instant = Union[datetime, int, float]
+
+_DAY = int(SECONDS_IN_DAY.total_seconds())
+
 
 def _day_start(t: datetime) -> datetime:
     return t.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -10,3 +21,40 @@ def _day_start(t: datetime) -> datetime:
 
 def _datetime(day: date, tzinfo: ZoneInfo) -> datetime:
     return timezone.make_aware(datetime.combine(day, time.min), timezone=tzinfo)
+
+
+def _epoch(t: Instant) -> int:
+    if isinstance(t, datetime):
+        if timezone.is_naive(t):
+            raise NaiveTimeSettingError('The time must be specified with a time zone')
+        return int(t.timestamp())
+    return int(t)
+
+
+def _shift_offsets(number: int, start: int, end: int) -> Tuple[int, int]:
+    """Start and end of a shift occurrence relative to its shift day start, sec.
+
+    An overnight first shift belongs to the day it ends, other overnight shifts to the day they start.
+    """
+    if start < end:
+        return start, end
+    if number > 1:
+        return start, end + _DAY
+    return start - _DAY, end
+
+
+def _cycle_day(day: date, cycle_start: date, cycle_length: int) -> int:
+    return (day - cycle_start).days % cycle_length
+
+
+def _nearest_cycle_day(day: date, cycle_day: int, cycle_start: date, cycle_length: int) -> date:
+    delta = (cycle_day - _cycle_day(day, cycle_start, cycle_length)) % cycle_length
+    if delta > cycle_length // 2:
+        delta -= cycle_length
+    return day + timedelta(days=delta)
+
+
+def _case(field: str, mapping: Dict[int, int]) -> Case:
+    """`field` mapped old -> new in an `update()`, the values not in the mapping are kept."""
+    whens = [When(**{field: old}, then=Value(new)) for old, new in mapping.items()]
+    return Case(*whens, default=F(field), output_field=models.IntegerField())
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+
+from django_org import export
+from django_org.exceptions import DepartmentCycleError
+from django_org.settings import DJANGO_ORG_DEPARTMENT, DJANGO_ORG_EMPLOYEE
+
+
+@login_required
+def export_employees(request, format: str):
+    """The employees visible to the user as a streamed CSV or JSON Lines file."""
+    Department = apps.get_model(DJANGO_ORG_DEPARTMENT)
+    Employee = apps.get_model(DJANGO_ORG_EMPLOYEE)
+    if not request.user.has_perm(f'{Employee._meta.app_label}.view_{Employee._meta.model_name}'):
+        raise PermissionDenied
+    if format not in export.FORMATS:
+        raise Http404(f'Unknown format "{format}"')
+
+    # The paths are read before the streaming starts, a broken tree is an error response, not a cut file
+    try:
+        rows = export.employee_rows(Employee.objects.visible_to(request.user),
+                                    departments=Department.objects.visible_to(request.user))
+    except DepartmentCycleError as e:
+        return HttpResponse(str(e), status=409, content_type='text/plain')
+    response = StreamingHttpResponse(export.export(rows, format), content_type=export.CONTENT_TYPES[format])
+    response['Content-Disposition'] = f'attachment; filename="employees.{format}"'
+    return response
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Tuple
+
+from django_org.instrumentation import instrument
+from django_org.schedule import ShiftTable
+from django_org.utils import Instant, _epoch
+
+
+__all__ = (
+    'ShiftTime',
+    'worked_time',
+    'worked_times',
+)
+
+
+class ShiftTime(NamedTuple):
+    """Seconds worked within a shift occurrence, ready for `Model(**row._asdict())`."""
+    key: Any
+    work_mode_id: int
+    shift_id: int
+    shift_day: date
+    seconds: int
+
+
+def _merge(punches: Iterable[Tuple[Instant, Instant]]) -> List[List[int]]:
+    intervals = sorted((_epoch(start), _epoch(end)) for start, end in punches)
+    merged = []
+    for start, end in intervals:
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+@instrument('worked_time')
+def worked_time(table: ShiftTable, punches: Iterable[Tuple[Instant, Instant]], key: Any = None) -> List[ShiftTime]:
+    """Overlap of punch intervals with the shift occurrences of the table.
+
+    Overlapping punches are merged first, then both sorted sequences are swept once.
+    All the arithmetic is done in epoch seconds.
+    """
+    intervals = _merge(punches)
+    if not intervals:
+        return []
+
+    totals: Dict[Tuple[int, date], int] = defaultdict(int)
+    i, count = 0, len(intervals)
+    for occurrence in table.occurrences(intervals[0][0], intervals[-1][1]):
+        while i < count and intervals[i][1] <= occurrence.start:
+            i += 1
+        j = i
+        while j < count and intervals[j][0] < occurrence.end:
+            overlap = min(occurrence.end, intervals[j][1]) - max(occurrence.start, intervals[j][0])
+            if overlap > 0:
+                totals[(occurrence.shift_id, occurrence.shift_day)] += overlap
+            j += 1
+
+    return [
+        ShiftTime(key, table.work_mode_id, shift_id, shift_day, seconds)
+        for (shift_id, shift_day), seconds in totals.items()
+    ]
+
+
+def worked_times(
+        tables: Mapping[Hashable, ShiftTable],
+        punches: Iterable[Tuple[Hashable, Instant, Instant]]
+) -> List[ShiftTime]:
+    """`worked_time` for many keys (e.g. employees) at once, `tables` maps a key to its shift table."""
+    grouped = defaultdict(list)
+    for key, start, end in punches:
+        grouped[key].append((start, end))
+
+    result = []
+    for key, intervals in grouped.items():
+        result.extend(worked_time(tables[key], intervals, key=key))
+    return result